@@ -60,7 +60,7 @@ puts ""
 # dt = 0.001 s, NPTS = 32233, Duration = 32.232 s
 # ============================================================================
 
-set gmDir "C:/Users/lenovo/Desktop/DASK_NEW/ground_motion_dask"
+set gmDir "../../ground_motion_dask"
 
 set gmList {
     {KYH1  KYH1.txt  0.335}
@@ -342,12 +342,41 @@ foreach gm $gmList {
         -ele {*}$elemSample localForce
     puts "  (OK) Element local forces (every 100th element, [llength $elemSample] elements)"
 
+    # --- Element forces (all elements, joint_demand.py) ---
+    # Frame elements give 12 localForce values; truss-type elements give a
+    # narrower response, so they are recorded separately by axial force.
+    # The tag order of each file is written next to it.
+    set frameElems {}
+    set trussElems {}
+    foreach e [getEleTags] {
+        if {[llength [eleResponse $e localForce]] == 12} {
+            lappend frameElems $e
+        } else {
+            lappend trussElems $e
+        }
+    }
+    recorder Element -file ${outDir}/element_forces/all_forces.txt \
+        -ele {*}$frameElems localForce
+    set fp [open ${outDir}/element_forces/frame_elements.txt w]
+    puts $fp [join $frameElems "\n"]
+    close $fp
+    set fp [open ${outDir}/element_forces/truss_elements.txt w]
+    if {[llength $trussElems] > 0} {
+        recorder Element -file ${outDir}/element_forces/truss_forces.txt \
+            -ele {*}$trussElems axialForce
+        puts $fp [join $trussElems "\n"]
+    }
+    close $fp
+    puts "  (OK) All element forces ([llength $frameElems] frame localForce, [llength $trussElems] truss axialForce)"
+
     puts ""
 
     # Count total recorders
     # 25 T1 disp + 25 T2 disp + 1 bridge + 4 roof vel/accel + 2 center vel
     # + 2 base reaction + 25 T1 drift + 25 T2 drift + 25 T1 env + 25 T2 env + 1 elem
-    set nRecorders [expr 25 + 25 + 1 + 4 + 2 + 2 + 25 + 25 + 25 + 25 + 1]
+    # + all-element frame (+ truss) forces
+    set nRecorders [expr 25 + 25 + 1 + 4 + 2 + 2 + 25 + 25 + 25 + 25 + 1 + 1 \
+                    + ([llength $trussElems] > 0)]
     puts ">>> Total recorders: $nRecorders"
     puts ""
 
@@ -662,6 +691,7 @@ foreach gm $gmList {
     puts $sumFile "Interstory drift: ${outDir}/drift/ (T1_drift_floor\[1-25\].txt, T2_drift_floor\[1-25\].txt)"
     puts $sumFile "Envelopes:        ${outDir}/envelope/ (T1_floor\[1-25\]_env.txt, T2_floor\[1-25\]_env.txt)"
     puts $sumFile "Element forces:   ${outDir}/element_forces/sample_forces.txt"
+    puts $sumFile "All elements:     ${outDir}/element_forces/all_forces.txt (+ truss_forces.txt)"
     puts $sumFile "Analysis log:     ${outDir}/analysis_log.txt"
     puts $sumFile ""
     puts $sumFile "Completed: [clock seconds]"
@@ -702,7 +732,7 @@ puts "    node_accel/    - Acceleration records"
 puts "    node_reaction/ - Base reactions"
 puts "    drift/         - Interstory drift (all floors)"
 puts "    envelope/      - Min/max envelopes"
-puts "    element_forces/- Sample element local forces"
+puts "    element_forces/- Sample and all-element local forces"
 puts "    summary.txt    - Peak responses"
 puts "    analysis_log.txt - Step-by-step progress log"
 puts ""
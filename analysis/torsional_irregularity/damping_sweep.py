@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Damping Parametric Study from One Modal Decomposition — DASK 2026 V9
+====================================================================
+Python replacement for damping_parametric_study.tcl.
+
+The Tcl study re-runs the full V9 transient analysis once per ξ. The
+model is linear, so with Rayleigh damping (classical) the response is
+an exact modal superposition:
+
+    u(t) = Σ_n φ_n Γ_n q_n(t),   q_n'' + 2ξ_nω_n q_n' + ω_n² q_n = -a_g
+    ξ_n  = a0 / (2ω_n) + a1·ω_n / 2
+
+The model is decomposed once; the modal oscillators for every damping
+ratio × Rayleigh variant × mode are then integrated as one batched
+oscillator bank (exact piecewise-linear step map, sdof_response.py).
+
+Rayleigh variants (anchor frequencies of the fit):
+    'w1_3.5w1'  ω1 and 3.5·ω1   (damping_parametric_study.tcl, full_analysis_v10)
+    'w1_w2'     ω1 and ω2       (first two modes, run_advanced_simulation.py)
+
+Model: V9 Tcl model (tbdy2018_torsion_analysis_trimmed.tcl) — all
+members elasticBeamColumn, E = 170×240 kN/cm², floor weights 1.6 kN
+(2.22 kN roof) as nodal masses. T1 = 0.1999 s, same as the Tcl run.
+
+Outputs (same files/columns as the Tcl study, for pgfplots):
+    results/damping_study/peak_response.csv
+    results/damping_study/rayleigh_curve.csv
+    results/damping_study/eta_b_curve.csv
+    results/damping_study/time_history_xiXXX.csv
+The 'w1_w2' variant writes peak_response_w1_w2.csv and
+time_history_w1_w2_xiXXX.csv alongside.
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import sys
+import time as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'scripts'))
+import frame_model as fm
+from sdof_response import oscillator_response
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GM_FILE = os.path.join(HERE, '..', '..', 'ground_motion_dask', 'KYH1.txt')
+OUT_DIR = os.path.join(HERE, 'results', 'damping_study')
+
+# Same parameters as damping_parametric_study.tcl
+XI_LIST = [0.005, 0.010, 0.020, 0.030, 0.050, 0.070, 0.100, 0.150, 0.200]
+ROOF_NODE_T1 = 809
+ROOF_NODE_T2 = 1641
+DT_GM = 0.001
+DT_OUT = 0.02          # Tcl: every 4 steps of 0.005 s
+T_VALS = [0.020, 0.025, 0.030, 0.035, 0.040, 0.050, 0.060, 0.070, 0.080, 0.090,
+          0.100, 0.110, 0.120, 0.130, 0.135, 0.140, 0.147, 0.150, 0.160, 0.170,
+          0.180, 0.190, 0.200, 0.220, 0.240, 0.260, 0.280, 0.300, 0.350, 0.400,
+          0.450, 0.500, 0.600, 0.700, 0.800, 0.900, 1.000]
+ETA_XI_PCT = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0,
+              6.0, 7.0, 8.0, 9.0, 10.0, 12.0, 15.0, 20.0]
+
+# V9 Tcl model material (stiffScale = 240)
+E_TCL = 170.0 * 240 * 1e4      # kN/cm² -> kPa
+G_TCL = 65.385 * 240 * 1e4
+
+
+def tcl_v9_model():
+    """FrameModel equivalent of the V9 Tcl torsion model."""
+    pos = pd.read_csv(os.path.join(HERE, 'twin_position_matrix_v9.csv'))
+    conn = pd.read_csv(os.path.join(HERE, 'twin_connectivity_matrix_v9.csv'))
+    floors = sorted(int(f) for f in pos['floor'].unique() if f > 0)
+    top = max(floors)
+    # Tcl: mass = W / g with W = 1.6 kN per floor (2.22 kN roof)
+    floor_mass_kg = {f: (2.22 if f == top else 1.6) / 9.81 * 1000 for f in floors}
+    return fm.from_frames(pos, conn, version='v9_tcl', E=E_TCL, G=G_TCL,
+                          self_kg=0.0, pin_types=(), floor_mass_kg=floor_mass_kg)
+
+
+def rayleigh_variants(omega):
+    """Anchor frequency pairs of the Rayleigh fits."""
+    return {
+        'w1_3.5w1': (omega[0], 3.5 * omega[0]),
+        'w1_w2': (omega[0], omega[1]),
+    }
+
+
+def damping_sweep(model, acc_g, dt, xi_list=XI_LIST, n_modes=40,
+                  direction='X', out_nodes=(ROOF_NODE_T1, ROOF_NODE_T2)):
+    """
+    Roof responses for every ξ and Rayleigh variant from one eigen solve.
+
+    Returns dict with modal data, per-variant (a0, a1) arrays and
+    histories u[variant] of shape (n_xi, 2 dirs, n_nodes, npts) in m.
+    """
+    modes = fm.modal(model, n_modes)
+    om, phi, free = modes['omega'], modes['phi'], modes['free']
+    gamma = modes['gamma'][:, 'XY'.index(direction)]
+
+    # output rows: (X, Y) × out_nodes
+    pos = pd.Series(np.arange(len(free)), index=free)
+    idx = pd.Series(np.arange(model.n_nodes), index=model.node_ids)
+    rows = [pos[idx[n] * fm.NDF + d] for d in (0, 1) for n in out_nodes]
+    phi_out = phi[rows] * gamma[None, :]                      # (2·n_nodes, n_modes)
+
+    variants = rayleigh_variants(om)
+    xi_arr = np.asarray(xi_list)
+    coeffs, xi_modal = {}, []
+    for name, (wa, wb) in variants.items():
+        a0, a1 = fm.rayleigh_coeffs(wa, wb, xi_arr)
+        coeffs[name] = (a0, a1)
+        xi_modal.append(fm.rayleigh_modal_damping(om[None, :], a0[:, None],
+                                                  a1[:, None]))
+    xi_modal = np.stack(xi_modal)                             # (n_var, n_xi, n_modes)
+
+    # one batched bank: variant × ξ × mode oscillators
+    omega_bank = np.broadcast_to(om, xi_modal.shape).ravel()
+    q = oscillator_response(np.asarray(acc_g) * 9.81, dt, omega_bank,
+                            xi_modal.ravel())
+    q = q.reshape(xi_modal.shape + (-1,))                     # (n_var, n_xi, n_modes, npts)
+    u = np.einsum('om,vxmt->vxot', phi_out, q, optimize=True)
+    u = u.reshape(u.shape[:2] + (2, len(out_nodes), -1))
+
+    return {'modes': modes, 'coeffs': coeffs, 'xi_modal': xi_modal,
+            'u': dict(zip(variants, u)), 'variants': variants}
+
+
+def rayleigh_curve(omega1, omega2, xi_list=XI_LIST, T_vals=T_VALS):
+    """Effective ξ(T) of the Rayleigh fit for every target ξ."""
+    T = np.asarray(T_vals)
+    w = 2 * np.pi / T
+    df = pd.DataFrame({'T': T, 'f': 1 / T})
+    for xi in xi_list:
+        a0, a1 = fm.rayleigh_coeffs(omega1, omega2, xi)
+        df[f'xi_{xi:.3f}'] = fm.rayleigh_modal_damping(w, a0, a1)
+    return df
+
+
+def eta_b_curve(xi_pct=ETA_XI_PCT):
+    """TBDY spectral damping correction η = sqrt(10 / (5 + ξ%))."""
+    xp = np.asarray(xi_pct)
+    return pd.DataFrame({'xi_pct': xp, 'xi': xp / 100,
+                         'eta_b': np.sqrt(10 / (5 + xp))})
+
+
+def _write_csv(path, df, fmts):
+    """CSV with per-column number formats (matches the Tcl `format` calls)."""
+    cols = [df[c].map(lambda v, f=f: f % v) for c, f in zip(df.columns, fmts)]
+    pd.concat(cols, axis=1).to_csv(path, index=False)
+
+
+def write_outputs(res, dt, xi_list=XI_LIST, out_dir=OUT_DIR):
+    """Write the damping_parametric_study.tcl CSV set."""
+    os.makedirs(out_dir, exist_ok=True)
+    om = res['modes']['omega']
+    wa, wb = res['variants']['w1_3.5w1']
+    ray = rayleigh_curve(wa, wb, xi_list)
+    _write_csv(os.path.join(out_dir, 'rayleigh_curve.csv'), ray,
+               ['%.4f', '%.4f'] + ['%.6f'] * len(xi_list))
+    _write_csv(os.path.join(out_dir, 'eta_b_curve.csv'), eta_b_curve(),
+               ['%.1f', '%.4f', '%.4f'])
+
+    step = int(round(DT_OUT / dt))
+    for name, u in res['u'].items():
+        sfx = '' if name == 'w1_3.5w1' else '_w1_w2'
+        a0, a1 = res['coeffs'][name]
+        peak = np.abs(u).max(axis=-1) * 100                   # (n_xi, 2, 2) cm
+        _write_csv(os.path.join(out_dir, f'peak_response{sfx}.csv'), pd.DataFrame({
+            'xi': xi_list, 'a0': a0, 'a1': a1,
+            'maxUx_T1_cm': peak[:, 0, 0], 'maxUx_T2_cm': peak[:, 0, 1],
+            'maxUy_T1_cm': peak[:, 1, 0], 'maxUy_T2_cm': peak[:, 1, 1],
+            'failed_steps': 0,
+        }), ['%.4f', '%.6f', '%.10f'] + ['%.8f'] * 4 + ['%d'])
+
+        k = np.arange(step, u.shape[-1], step)
+        for i, xi in enumerate(xi_list):
+            fn = f'time_history{sfx}_xi{int(round(xi*1000)):03d}.csv'
+            _write_csv(os.path.join(out_dir, fn), pd.DataFrame({
+                't_s': k * dt,
+                'Ux_T1_cm': u[i, 0, 0, k] * 100, 'Ux_T2_cm': u[i, 0, 1, k] * 100,
+                'Uy_T1_cm': u[i, 1, 0, k] * 100, 'Uy_T2_cm': u[i, 1, 1, k] * 100,
+            }), ['%.4f'] + ['%.8f'] * 4)
+    return om
+
+
+def main():
+    print("=" * 64)
+    print("  DAMPING PARAMETRIC STUDY (modal, all ξ in one pass)")
+    print("  DASK 2026 - V9 Twin Towers")
+    print("=" * 64)
+    t0 = timer.time()
+
+    acc = pd.read_csv(GM_FILE, sep=r'\s+', skiprows=1, header=None)[1].to_numpy()
+    model = tcl_v9_model()
+    res = damping_sweep(model, acc, DT_GM)
+    om = res['modes']['omega']
+    print(f">>> T1 = {2*np.pi/om[0]:.5f} s, omega1 = {om[0]:.4f} rad/s, "
+          f"{len(om)} modes, X mass = {res['modes']['mass_ratio'][:, 0].sum()*100:.1f}%")
+
+    write_outputs(res, DT_GM)
+
+    print(f"\n  {'variant':<10} {'xi':<7} {'a0':<11} {'a1':<13} "
+          f"{'maxUx_T1(cm)':<14} {'maxUx_T2(cm)':<14}")
+    for name, u in res['u'].items():
+        a0, a1 = res['coeffs'][name]
+        peak = np.abs(u).max(axis=-1) * 100
+        for i, xi in enumerate(XI_LIST):
+            print(f"  {name:<10} {xi:<7.3f} {a0[i]:<11.6f} {a1[i]:<13.10f} "
+                  f"{peak[i, 0, 0]:<14.6f} {peak[i, 0, 1]:<14.6f}")
+
+    print(f"\n>>> Results written to {OUT_DIR}")
+    print(f">>> Total elapsed: {timer.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Joint (Connection) Demand Aggregation — DASK 2026 V9 Twin Towers
+================================================================
+Treats every model node as a glued PVA joint shared by the members
+framing into it, instead of checking element ends one at a time.
+
+- Sparse node–element-end incidence matrix built from the connectivity CSV
+- End moments / shears / axial forces from the all-element recorders of
+  advanced_time_history_dask.tcl: `localForce` of the frame elements
+  (all_forces.txt) and `axialForce` of truss-type elements
+  (truss_forces.txt, expanded to 12-column end-force blocks), reshaped
+  to (time, element, 12) and streamed in time chunks
+- Scatter-add (incidence @ forces) for joint totals, segment max
+  (np.maximum.reduceat on node-sorted ends) for governing end values
+- Per-joint demand envelopes + joint DCR time series (M / M_joint)
+
+Capacities follow fragility_advanced.py (η_joint = 0.35, 6mm × 6mm).
+Units: kN, cm (same as the Tcl recorder output).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import os
+
+# =====================================================================
+# 1. JOINT CAPACITY (same basis as fragility_advanced.py)
+# =====================================================================
+f_b_real = 3.5         # kN/cm² (unscaled balsa bending strength)
+scale_factor = 240     # model scaling for stiffness
+f_b = f_b_real * scale_factor
+eta_joint = 0.35       # PVA glue joint efficiency
+f_joint = eta_joint * f_b
+
+b = 0.6   # cm
+h = 0.6   # cm
+A = b * h
+Wel = b * h**2 / 6
+
+M_joint = f_joint * Wel               # kN·cm — governing glue-line moment
+V_joint = 0.6 * f_joint * A * 0.5     # kN — glue-line shear (same form as V_member)
+
+# Column layout of one element block in the `localForce` recorder
+# Fx_i Vy_i Vz_i T_i My_i Mz_i | Fx_j Vy_j Vz_j T_j My_j Mz_j
+N_COLS = 12
+
+
+# =====================================================================
+# 2. INCIDENCE
+# =====================================================================
+
+def recorded_elements(force_dir):
+    """(frame tags, truss tags) in the column order of the all-element recorders."""
+    def read(name):
+        fp = os.path.join(force_dir, name)
+        if not os.path.exists(fp):
+            return np.zeros(0, dtype=int)
+        return np.loadtxt(fp, dtype=int, ndmin=1)
+    return read("frame_elements.txt"), read("truss_elements.txt")
+
+
+def truss_end_forces(N):
+    """Truss axial forces (n_steps, n_truss) as localForce blocks: Fx_i = −N, Fx_j = N."""
+    F = np.zeros(N.shape + (N_COLS,))
+    F[:, :, 0] = -N
+    F[:, :, 6] = N
+    return F.reshape(len(N), -1)
+
+
+def read_force_chunks(force_dir, n_frame, n_truss, chunk=500):
+    """
+    Time chunks (n_steps, 12·(n_frame + n_truss)) of the all-element
+    recorders, frame blocks first; the files are never loaded whole.
+    """
+    def rows(name):
+        return (c.to_numpy(float) for c in pd.read_csv(
+            os.path.join(force_dir, name), sep=r'\s+', header=None, chunksize=chunk))
+    frame = rows("all_forces.txt")
+    truss = rows("truss_forces.txt") if n_truss else None
+    for F in frame:
+        if F.shape[1] != N_COLS * n_frame:
+            raise ValueError(f"all_forces.txt: {F.shape[1]} columns, expected "
+                             f"{N_COLS * n_frame} — recorder/element list mismatch")
+        if truss is not None:
+            F = np.hstack([F, truss_end_forces(next(truss)[:, :n_truss])])
+        yield F
+
+
+def build_incidence(conn_df, pos_df, element_ids=None):
+    """
+    Build the sparse node × element-end incidence matrix.
+
+    Element ends are ordered [i-ends of all elements, j-ends of all
+    elements], matching the layout produced by `end_forces`.
+    Returns (B, node_ids, end_node_idx) where B is CSR (n_nodes, 2*n_elem).
+    """
+    conn = conn_df.set_index('element_id')
+    if element_ids is None:
+        element_ids = conn.index.values
+    element_ids = np.asarray(element_ids, dtype=int)
+    sub = conn.loc[element_ids]
+
+    node_ids = pos_df['node_id'].values.astype(int)
+    lookup = pd.Series(np.arange(len(node_ids)), index=node_ids)
+
+    ni = lookup.loc[sub['node_i'].values.astype(int)].values
+    nj = lookup.loc[sub['node_j'].values.astype(int)].values
+    end_node_idx = np.concatenate([ni, nj])
+
+    n_ends = len(end_node_idx)
+    B = sparse.csr_matrix(
+        (np.ones(n_ends), (end_node_idx, np.arange(n_ends))),
+        shape=(len(node_ids), n_ends))
+    return B, node_ids, end_node_idx
+
+
+# =====================================================================
+# 3. END FORCES & AGGREGATION
+# =====================================================================
+
+def end_forces(data):
+    """
+    Split recorder data (n_steps, 12*n_elem) into per-end resultants.
+
+    Returns dict of (n_steps, 2*n_elem) arrays: 'M' (biaxial SRSS moment),
+    'V' (biaxial SRSS shear) and 'N' (|axial|).
+    """
+    n_steps = data.shape[0]
+    F = data.reshape(n_steps, -1, N_COLS)
+    M = np.concatenate([np.hypot(F[:, :, 4], F[:, :, 5]),
+                        np.hypot(F[:, :, 10], F[:, :, 11])], axis=1)
+    V = np.concatenate([np.hypot(F[:, :, 1], F[:, :, 2]),
+                        np.hypot(F[:, :, 7], F[:, :, 8])], axis=1)
+    N = np.abs(np.concatenate([F[:, :, 0], F[:, :, 6]], axis=1))
+    return {'M': M, 'V': V, 'N': N}
+
+
+def _segment_max(values, order, starts):
+    """Per-joint max over node-sorted ends (values: n_steps × n_ends)."""
+    if len(starts) == 0:
+        return np.zeros((values.shape[0], 0))
+    return np.maximum.reduceat(values[:, order], starts, axis=1)
+
+
+def aggregate_joint_demand(data, B, end_node_idx, chunk=2000):
+    """
+    Aggregate element-end forces to joints over the full time history.
+
+    Per joint and time step:
+      M_max   governing (largest) end moment at the joint
+      M_sum   transfer moment 0.5·Σ|M_end| (balanced through the joint)
+      V_max   governing end shear
+      N_max   governing end axial force
+      DCR     M_max / M_joint (glue line in bending governs)
+
+    Time is processed in chunks so full-element recordings stay bounded
+    in memory. Returns dict of (n_steps, n_active) arrays plus the
+    indices of the joints that have at least one recorded member.
+    """
+    order = np.argsort(end_node_idx, kind='stable')
+    active, starts = np.unique(end_node_idx[order], return_index=True)
+    B_active = B[active]
+
+    n_steps = data.shape[0]
+    out = {k: np.empty((n_steps, len(active)))
+           for k in ('M_max', 'M_sum', 'V_max', 'N_max')}
+
+    for s in range(0, n_steps, chunk):
+        e = min(s + chunk, n_steps)
+        ef = end_forces(data[s:e])
+        out['M_max'][s:e] = _segment_max(ef['M'], order, starts)
+        out['V_max'][s:e] = _segment_max(ef['V'], order, starts)
+        out['N_max'][s:e] = _segment_max(ef['N'], order, starts)
+        out['M_sum'][s:e] = 0.5 * (B_active @ ef['M'].T).T
+
+    out['DCR'] = out['M_max'] / M_joint
+    out['DCR_V'] = out['V_max'] / V_joint
+    out['active'] = active
+    out['n_members'] = np.diff(np.append(starts, len(order)))
+    return out
+
+
+def joint_envelope(demand, pos_df, dt=None):
+    """Per-joint peak demand table, sorted by joint DCR."""
+    active = demand['active']
+    k_peak = np.argmax(demand['DCR'], axis=0)
+    t_peak = k_peak * dt if dt else k_peak
+
+    env = pd.DataFrame({
+        'node_id': pos_df['node_id'].values[active].astype(int),
+        'floor': pos_df['floor'].values[active].astype(int),
+        'tower': pos_df['tower'].values[active] if 'tower' in pos_df else 0,
+        'n_members': demand['n_members'],
+        'M_max': demand['M_max'].max(axis=0),
+        'M_transfer_max': demand['M_sum'].max(axis=0),
+        'V_max': demand['V_max'].max(axis=0),
+        'N_max': demand['N_max'].max(axis=0),
+        'DCR_joint': demand['DCR'].max(axis=0),
+        'DCR_shear': demand['DCR_V'].max(axis=0),
+        't_peak': t_peak,
+    })
+    return env.sort_values('DCR_joint', ascending=False).reset_index(drop=True)
+
+
+# =====================================================================
+# 4. MAIN
+# =====================================================================
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    pos_df = pd.read_csv(os.path.join(here, "twin_position_matrix_v9.csv"))
+    conn_df = pd.read_csv(os.path.join(here, "twin_connectivity_matrix_v9.csv"))
+
+    dt_analysis = 0.005   # advanced_time_history_dask.tcl
+    out_dir = os.path.join(here, "results", "joint_demand")
+
+    for gm in ['KYH1', 'KYH2', 'KYH3']:
+        force_dir = os.path.join(here, "results", f"th_{gm}", "element_forces")
+        if not os.path.exists(os.path.join(force_dir, "all_forces.txt")):
+            print(f"  {gm}: {force_dir}/all_forces.txt not found, skipping")
+            continue
+
+        frame, truss = recorded_elements(force_dir)
+        elem_ids = np.concatenate([frame, truss])
+        B, node_ids, end_node_idx = build_incidence(conn_df, pos_df, elem_ids)
+        print(f"\n  {gm}: incidence {B.shape[0]} joints × {B.shape[1]} element ends "
+              f"({len(frame)} frame + {len(truss)} truss elements of {len(conn_df)})")
+
+        try:
+            parts = [aggregate_joint_demand(F, B, end_node_idx)
+                     for F in read_force_chunks(force_dir, len(frame), len(truss))]
+        except ValueError as e:
+            print(f"  {gm}: {e}")
+            continue
+        demand = {k: np.concatenate([p[k] for p in parts])
+                  for k in ('M_max', 'M_sum', 'V_max', 'N_max', 'DCR', 'DCR_V')}
+        demand.update(active=parts[0]['active'], n_members=parts[0]['n_members'])
+        n_steps = len(demand['DCR'])
+        env = joint_envelope(demand, pos_df, dt=dt_analysis)
+
+        os.makedirs(out_dir, exist_ok=True)
+        env.to_csv(os.path.join(out_dir, f"joint_envelope_{gm}.csv"), index=False)
+
+        top = env['node_id'].values[:20]
+        cols = pd.Index(node_ids[demand['active']]).get_indexer(top)
+        t = np.arange(n_steps) * dt_analysis
+        ts = pd.DataFrame(demand['DCR'][:, cols], columns=[f"n{n}" for n in top])
+        ts.insert(0, 'time', t)
+        ts.to_csv(os.path.join(out_dir, f"joint_dcr_timeseries_{gm}.csv"),
+                  index=False, float_format='%.5g')
+
+        print(f"  {gm}: {n_steps} steps, {len(env)} joints with recorded members")
+        print(f"  {'Node':<8}{'Floor':<7}{'n':<4}{'M_max':<12}{'M_trans':<12}"
+              f"{'V_max':<10}{'DCR':<8}")
+        for _, r in env.head(10).iterrows():
+            print(f"  {r['node_id']:<8}{r['floor']:<7}{r['n_members']:<4}"
+                  f"{r['M_max']:<12.4f}{r['M_transfer_max']:<12.4f}"
+                  f"{r['V_max']:<10.4f}{r['DCR_joint']:<8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+DASK 2026 ANALYSIS LIBRARY
+==========================
+Importable entry point to the analysis modules in scripts/. Nothing
+heavy is imported here: every name below resolves on first access
+(PEP 562), so `import dask26` costs milliseconds and only the modules a
+caller actually touches get loaded.
+
+    import dask26
+    model = dask26.load_model('v10')          # imports frame_model here
+    modes = dask26.modal(model, 12)
+    eng = dask26.ModalEngine(model)
+    dask26.opensees.run_pushover('X')         # full_analysis_v10, openseespy on use
+
+Modules are reachable as attributes too (dask26.frame_model, ...).
+
+Command line:
+    python -m dask26 {modal,th,pushover,torsion,fragility,export} ...
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+_SCRIPTS = str(ROOT / 'scripts')
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+# attribute -> module in scripts/
+_MODULES = {
+    'frame_model': 'frame_model',
+    'frequency_response': 'frequency_response',
+    'ground_motion_im': 'ground_motion_im',
+    'sdof_response': 'sdof_response',
+    'rotd_spectra': 'rotd_spectra',
+    'geometry_engine': 'geometry_engine',
+    'model_store': 'model_store',
+    'topology_check': 'topology_check',
+    'tex_export': 'tex_export',
+    'pipeline': 'pipeline',
+    'fragility': 'fragility',
+    'static_checks': 'static_checks',
+    'analysis_service': 'analysis_service',
+    'sensitivity': 'sensitivity',
+    'opensees': 'full_analysis_v10',
+}
+
+# public name -> module holding it
+_EXPORTS = {
+    'FrameModel': 'frame_model', 'load_model': 'frame_model',
+    'from_frames': 'frame_model', 'model_files': 'frame_model',
+    'system_matrices': 'frame_model', 'modal': 'frame_model',
+    'ModalEngine': 'frequency_response',
+    'load_dask_record': 'ground_motion_im', 'intensity_measures': 'ground_motion_im',
+    'trim_record': 'ground_motion_im',
+    'oscillator_response': 'sdof_response', 'response_spectrum': 'sdof_response',
+    'generate': 'geometry_engine', 'load_spec': 'geometry_engine',
+    'ModelStore': 'model_store',
+    'TopologyError': 'topology_check', 'validate': 'topology_check',
+    'check_model': 'topology_check',
+    'export_version': 'tex_export', 'torsion_table': 'tex_export',
+    'record_fragility': 'fragility', 'linear_fragility': 'fragility',
+    'drift_check': 'static_checks', 'member_weight_kg': 'static_checks',
+    'AnalysisService': 'analysis_service',
+}
+
+__all__ = sorted(_MODULES) + sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        mod = importlib.import_module(_MODULES[name])
+        globals()[name] = mod
+        return mod
+    if name in _EXPORTS:
+        obj = getattr(__getattr__(_EXPORTS[name]), name)
+        globals()[name] = obj
+        return obj
+    raise AttributeError(f"module 'dask26' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
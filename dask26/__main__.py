@@ -0,0 +1,4 @@
+from dask26.cli import main
+
+if __name__ == "__main__":
+    main()
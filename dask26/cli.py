@@ -0,0 +1,214 @@
+"""
+DASK 2026 COMMAND LINE
+======================
+One entry point for the common analyses. Argument parsing needs only
+argparse; each subcommand imports its analysis modules when it runs, so
+`python -m dask26 --help` (or a typo) returns immediately.
+
+    python -m dask26 modal v10 -n 12
+    python -m dask26 th v10 -r KYH1 KYH2          # FRF screening (linear)
+    python -m dask26 th --opensees -r KYH1        # Newmark, full_analysis_v10
+    python -m dask26 pushover X --drift 3
+    python -m dask26 torsion v10
+    python -m dask26 fragility
+    python -m dask26 export v9 -o tex/data/v9
+"""
+
+import argparse
+import sys
+import time as timer
+
+import dask26
+
+RECORDS = ['KYH1', 'KYH2', 'KYH3']
+
+
+def _records(names):
+    """Stacked records (n_rec, npts) [g] trimmed to a common length, and dt."""
+    import numpy as np
+    from ground_motion_im import load_dask_record
+    recs, dt = [], None
+    for nm in names:
+        _, a, dt = load_dask_record(dask26.ROOT / 'ground_motion_dask' / f'{nm}.txt')
+        recs.append(a)
+    n = min(len(r) for r in recs)
+    return np.stack([r[:n] for r in recs]), dt
+
+
+# ============================================================
+# SUBCOMMANDS
+# ============================================================
+
+def cmd_modal(args):
+    if args.opensees:
+        fa = dask26.opensees
+        fa.build_model()
+        T = fa.run_modal(args.modes)
+        for i, t in enumerate(T, 1):
+            print(f"  Mode {i:>2}: T = {t:.4f} s  ({1/t:.2f} Hz)")
+        return
+    model = dask26.load_model(args.version)
+    modes = dask26.modal(model, args.modes)
+    print(f"  {args.version}: {model.n_nodes} nodes, {model.n_elem} elements, "
+          f"{model.mass.sum()*1000:.3f} kg")
+    print(f"  {'Mode':>4} {'T (s)':>8} {'f (Hz)':>8} {'Mx %':>7} {'My %':>7}")
+    for i, (t, (mx, my)) in enumerate(zip(modes['T'], modes['mass_ratio']), 1):
+        print(f"  {i:>4} {t:>8.4f} {1/t:>8.2f} {mx*100:>7.2f} {my*100:>7.2f}")
+    mx, my = modes['mass_ratio'].sum(axis=0) * 100
+    print(f"  {'sum':>4} {'':>8} {'':>8} {mx:>7.2f} {my:>7.2f}")
+
+
+def cmd_th(args):
+    acc, dt = _records(args.records)
+    if args.opensees:
+        import numpy as np
+        fa = dask26.opensees
+        for nm, a in zip(args.records, acc):
+            for d in args.directions:
+                res = fa.run_time_history(nm, np.arange(len(a)) * dt, a, dt,
+                                          direction=d, integrator_dt=args.dt or 0.0005)
+                print(f"  {nm}_{d}: u_max={res['u_max_cm']:.3f}cm, "
+                      f"a_max={res['a_max_g']:.3f}g, drift={res['max_drift_pct']:.3f}% "
+                      f"(floor {res['max_drift_floor']})")
+        return
+    eng = dask26.ModalEngine(dask26.load_model(args.version), n_modes=args.modes)
+    print(f"  {args.version}: T1 = {eng.modes['T'][0]:.4f} s, {args.modes} modes, "
+          f"xi = 5%")
+    print(f"  {'case':<10} {'u_roof (cm)':>12} {'drift (%)':>10} {'floor':>6}")
+    for d in args.directions:
+        res = eng.run(acc, dt, direction=d)
+        for i, nm in enumerate(args.records):
+            j = int(res['drift'][i].argmax())
+            print(f"  {nm + '_' + d:<10} {res['disp'][i, -1]*100:>12.4f} "
+                  f"{res['drift'][i, j]*100:>10.4f} {int(eng.floors[j + 1]):>6}")
+
+
+def cmd_pushover(args):
+    fa = dask26.opensees
+    for d in args.directions:
+        res = fa.run_pushover(direction=d, target_drift_pct=args.drift,
+                              n_steps=args.steps)
+        if res:
+            print(f"  Pushover {d}: V_base_max={res['v_base_max_N']:.1f}N, "
+                  f"u_max={res['u_max_cm']:.2f}cm, k0={res['k_initial_kN_m']:.1f}kN/m")
+
+
+def cmd_torsion(args):
+    sc = dask26.static_checks
+    model = dask26.load_model(args.version)
+    K, m_diag, free = dask26.system_matrices(model)
+    solve = sc.factorize(K)
+    V = sc.base_shear(model, dask26.modal(model, 1, K, m_diag, free)['T'][0])
+    print(f"  {args.version}: TBDY A1a η_bi = Δmax/Δavg, ESL with ±{sc.ECC * 100:.0f}% "
+          f"accidental eccentricity")
+    for d in 'XY':
+        r = sc.drift_check(model, solve, free, d, V=V)
+        j = int(r['eta_bi'].argmax())
+        eta = r['eta_bi'][j]
+        print(f"  {d}: max η_bi = {eta:.3f} at floor {int(r['floor'][j])}  "
+              f"({'A1a irregular' if eta > sc.ETA_LIMIT else 'regular'}, "
+              f"limit {sc.ETA_LIMIT})")
+        if args.verbose:
+            for f, e, dr in zip(r['floor'], r['eta_bi'], r['drift_ratio']):
+                print(f"     floor {int(f):>2}: η={e:.3f}  drift={dr * 100:.4f}%")
+
+    if not args.records:
+        return
+    acc, dt = _records(args.records)
+    eng = dask26.ModalEngine(model, n_modes=args.modes)
+    print(f"  Dynamic edge-drift ratio, envelope of {', '.join(args.records)} "
+          f"(no accidental eccentricity, not the A1a check):")
+    for d in 'XY':
+        tab = dask26.torsion_table(eng, acc, dt, direction=d)
+        j = int(tab['edge_ratio'].argmax())
+        print(f"  {d}: max Δmax/Δavg = {tab['edge_ratio'][j]:.3f} at floor "
+              f"{int(tab['floor'][j])}")
+        if args.verbose:
+            for f, dm, da, e in zip(tab['floor'], tab['delta_max'], tab['delta_avg'],
+                                    tab['edge_ratio']):
+                print(f"     floor {int(f):>2}: Δmax={dm:.4f}cm  Δavg={da:.4f}cm  ratio={e:.3f}")
+
+
+def cmd_fragility(args):
+    fr = dask26.fragility
+    try:
+        demands, fit = fr.record_fragility(beta_u=args.beta_u)
+    except FileNotFoundError as e:
+        print(f"  {e}")
+        return 1
+    for (nm, d), k in zip(demands.items(), fit['k']):
+        print(f"  {nm}: DCR_max = {d['DCR'].max():.4f}, k = {k:.5f}")
+    print(f"  k_mean = {fit['k_mean']:.5f}, beta_total = {fit['beta_total']:.4f}")
+    for ds, theta in fit['theta'].items():
+        print(f"  {ds:<6} theta = {theta:.2f} g")
+
+
+def cmd_export(args):
+    out = args.out or dask26.ROOT / 'tex' / 'data' / args.version
+    for p in dask26.tex_export.export_version(args.version, out):
+        print(f"  Exported: {p}")
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+def build_parser():
+    p = argparse.ArgumentParser(prog='python -m dask26',
+                                description='DASK 2026 twin-tower analyses')
+    sub = p.add_subparsers(dest='command', required=True)
+
+    def versioned(name, help_, default='v10'):
+        s = sub.add_parser(name, help=help_)
+        s.add_argument('version', nargs='?', default=default)
+        s.add_argument('-n', '--modes', type=int, default=24)
+        return s
+
+    s = versioned('modal', 'eigen analysis (sparse frame model)')
+    s.add_argument('--opensees', action='store_true', help='V10 OpenSees model instead')
+    s.set_defaults(func=cmd_modal, modes=12)
+
+    s = versioned('th', 'time histories (modal FRF screening)')
+    s.add_argument('-r', '--records', nargs='+', default=RECORDS, choices=RECORDS)
+    s.add_argument('-d', '--directions', nargs='+', default=['X', 'Y'], choices=['X', 'Y'])
+    s.add_argument('--opensees', action='store_true', help='Newmark, V10 OpenSees model')
+    s.add_argument('--dt', type=float, help='OpenSees integrator step')
+    s.set_defaults(func=cmd_th)
+
+    s = sub.add_parser('pushover', help='V10 OpenSees pushover')
+    s.add_argument('directions', nargs='*', default=['X', 'Y'], choices=['X', 'Y'])
+    s.add_argument('--drift', type=float, default=3.0, help='target roof drift %%')
+    s.add_argument('--steps', type=int, default=300)
+    s.set_defaults(func=cmd_pushover)
+
+    s = versioned('torsion', 'TBDY A1a torsional irregularity (η_bi, ESL ±5%% ecc.)')
+    s.add_argument('-r', '--records', nargs='*', default=RECORDS, choices=RECORDS,
+                   help='records for the dynamic edge-drift ratio (none: skip)')
+    s.add_argument('-v', '--verbose', action='store_true', help='per-floor table')
+    s.set_defaults(func=cmd_torsion)
+
+    s = sub.add_parser('fragility', help='lognormal fragility from Tcl TH forces')
+    s.add_argument('--beta-u', type=float, default=0.30)
+    s.set_defaults(func=cmd_fragility)
+
+    s = sub.add_parser('export', help='tex/data tables for a model version')
+    s.add_argument('version', nargs='?', default='v9')
+    s.add_argument('-o', '--out', help='output directory (default tex/data/<version>)')
+    s.set_defaults(func=cmd_export)
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    t0 = timer.time()
+    try:
+        code = args.func(args)
+    except ImportError as e:            # optional dependency (openseespy, ...)
+        print(f"  {e}")
+        code = 2
+    print(f"  ({timer.time() - t0:.2f}s)")
+    sys.exit(code or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+RESIDENT ANALYSIS SERVICE (LOCAL HTTP)
+======================================
+Keeps models, element matrices, stiffness factorizations and modal
+bases in memory, so design-meeting what-ifs ("T1 without the floor-10
+braces?", "η_bi with E = 200 MPa?") answer in milliseconds instead of
+a script run:
+
+- per version, the element matrices are computed once; a session =
+  (version, calibrated, dropped members): reduced K, its banded Cholesky
+  factor, and modes computed on demand (reusing the factor as the
+  shift-invert operator); n ≤ already-computed modes is free
+- an E what-if is answered from the session at the model's E (G/E held
+  fixed, as in uncertainty.py and stiffness_calibration.py): K ∝ E, so
+  periods scale by √(E_ref/E) and displacements and drifts by E_ref/E
+- a drop is a low-rank (Woodbury) update of the undropped factor, as in
+  member_removal.py: K⁻¹ columns of the dropped members' stiffness
+  eigenvectors (one per pinned brace, six per frame member), cached per
+  element; a drop needing more than WOODBURY_MAX_RANK new columns, or
+  leaving a mechanism, falls back to re-assembly and refactorization
+- sessions live in an LRU cache with a memory budget (factor, K⁻¹
+  columns and modes bytes); the least recently used ones are evicted first
+- a drop that leaves a zero-energy mode (topology_check.py level check
+  on the fallback) is refused with 400 instead of answering from a
+  round-off factor
+- drops use static_checks.element_mask syntax: 'brace_xz@10',
+  'brace_xz,brace_yz', '@10,11', parts joined with ';'
+
+- calibrated=1 loads the version with its stiffness_calibration.py
+  factors (frame_model.load_model(version, calibrated=True)); E then
+  replaces the calibrated modulus
+
+Endpoints (GET, JSON; common params version, calibrated, E [MPa], drop):
+    /periods?n=12            T, f, mass ratios
+    /drift?direction=X       ESL story drift ratios, η_bi (±5% ecc.)
+    /eta                     η_bi envelope, both directions
+    /weight                  member weight vs limit
+    /spectrum                T1, Sae(T1), base shear, spectrum branch
+    /status                  cached sessions and memory use
+
+Usage:
+    python scripts/analysis_service.py [--port=8765] [--max-mb=512]
+    python scripts/analysis_service.py query periods version=v10 drop=brace_xz@10
+"""
+
+import json
+import sys
+import threading
+import time as timer
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import LinearOperator
+
+import frame_model as fm
+import static_checks as sc
+from tex_export import design_spectrum, spectrum_params
+from topology_check import TopologyError, level_mechanisms
+
+PORT = 8765
+MAX_MB = 512
+WOODBURY_MAX_RANK = 96     # new K⁻¹ columns a drop may cost before refactorizing
+COND_MECHANISM = 1e10      # as member_removal.py
+ORPHAN_TOL = 1e-9
+RANK_TOL = 1e-9
+
+
+# ============================================================
+# SESSIONS
+# ============================================================
+
+class Session:
+    """One (version, calibrated, drop) variant at the model's E: reduced K, factor, modes on demand."""
+
+    def __init__(self, model, ke, E_ref, drop=None):
+        self.model, self.ke = model, ke
+        self.active = ~sc.element_mask(model, drop)
+        factors = self.active.astype(float)
+        if drop:
+            issues = level_mechanisms(model, ke * factors[:, None, None])
+            if issues:
+                raise TopologyError(f"mechanism: dropping '{drop}' leaves "
+                                    + '; '.join(i.message for i in issues))
+        K_full = fm.assemble(model, ke, factors)
+        self.free = fm.free_dofs(model)
+        self.K = K_full[self.free][:, self.free].tocsc()
+        self.m_diag = fm.mass_diagonal(model)[self.free]
+        self.op = fm.banded_inverse(self.K)
+        self.solve = self.op.dot if self.op is not None else sc.factorize(self.K)
+        self.modes = None
+        self.columns = {}          # element -> (free DOFs, eigenvectors, eigenvalues, K⁻¹W)
+        self.lock = threading.Lock()
+
+    def modal(self, n):
+        with self.lock:
+            if self.modes is None or len(self.modes['T']) < n:
+                self.modes = fm.modal(self.model, n, self.K, self.m_diag, self.free,
+                                      OPinv=self.op)
+            return self.modes
+
+    def element_columns(self, elems, max_new=None):
+        """
+        Stiffness eigenpairs of elements on the free DOFs (rank 1 for a
+        pinned brace, 6 for a frame member) and their K⁻¹ columns, cached
+        per element. None if the uncached columns would exceed max_new.
+        """
+        new = [e for e in elems if e not in self.columns]
+        if new:
+            pos = np.full(self.model.ndof, -1)
+            pos[self.free] = np.arange(len(self.free))
+            edof = pos[self.model.elem_dofs[new]]                          # (k, 12)
+            ok = (edof >= 0).astype(float)
+            lam, V = np.linalg.eigh(self.ke[new] * ok[:, :, None] * ok[:, None, :])
+            keep = lam > RANK_TOL * lam[:, -1:]
+            if max_new is not None and keep.sum() > max_new:
+                return None
+            W = np.zeros((len(self.free), int(keep.sum())))
+            c = 0
+            parts = []
+            for e, d, v, l, k in zip(new, edof, V, lam, keep):
+                v = v[:, k][d >= 0]
+                W[d[d >= 0], c:c + len(l[k])] = v
+                parts.append((e, d[d >= 0], v, l[k], slice(c, c + len(l[k]))))
+                c += len(l[k])
+            Z = self.solve(W)
+            for e, d, v, l, sl in parts:
+                self.columns[e] = (d, v, l, Z[:, sl])
+        return [self.columns[e] for e in elems]
+
+    @property
+    def nbytes(self):
+        b = self.K.data.nbytes * 2
+        if self.op is not None:
+            b += self.op.factor_bytes
+        if self.modes is not None:
+            b += self.modes['phi'].nbytes
+        return b + sum(c[3].nbytes for c in self.columns.values())
+
+
+class DropSession(Session):
+    """
+    A member drop answered from a base session's factor by a low-rank
+    update (as member_removal.py): K' = K − W Λ Wᵀ over the stiffness
+    eigenvectors W of the dropped members, and by Woodbury
+        K'⁻¹b = u + Z (I − Λ F)⁻¹ Λ Wᵀu,   u = K⁻¹b, Z = K⁻¹W, F = WᵀZ
+    DOFs the drop leaves without stiffness are grounded on their original
+    diagonal (rotations that only trusses touch); a translation left
+    without stiffness or a singular I − Λ F is a mechanism, answered by
+    the refactorizing Session and its level check.
+    """
+
+    @classmethod
+    def update(cls, base, drop, max_new=WOODBURY_MAX_RANK):
+        """DropSession of base without the drop's members, or None to refactorize."""
+        mask = sc.element_mask(base.model, drop) & base.active
+        if not mask.any():
+            return base
+        elems = np.flatnonzero(mask)
+        cols = base.element_columns(elems, max_new)
+        if cols is None:
+            return None
+
+        # stiffness left on the touched DOFs; ground the ones left with none
+        n = len(base.free)
+        Kdiag = base.K.diagonal()
+        removed = np.zeros(n)
+        for d, v, l, _ in cols:
+            np.add.at(removed, d, (v**2) @ l)
+        touched = np.unique(np.concatenate([c[0] for c in cols]))
+        orphan = touched[Kdiag[touched] - removed[touched] < ORPHAN_TOL * Kdiag[touched]]
+        if (base.free[orphan] % fm.NDF < 3).any():
+            return None
+        G = sparse.csc_matrix((np.ones(len(orphan)), (orphan, np.arange(len(orphan)))),
+                              shape=(n, len(orphan)))
+
+        rows = np.concatenate([np.repeat(d, v.shape[1]) for d, v, _, _ in cols] + [orphan])
+        ncol = np.cumsum([0] + [v.shape[1] for _, v, _, _ in cols])
+        cidx = np.concatenate([np.tile(np.arange(a, b), len(d))
+                               for (d, _, _, _), a, b in zip(cols, ncol[:-1], ncol[1:])]
+                              + [ncol[-1] + np.arange(len(orphan))])
+        vals = np.concatenate([v.ravel() for _, v, _, _ in cols] + [np.ones(len(orphan))])
+        W = sparse.csc_matrix((vals, (rows, cidx)), shape=(n, ncol[-1] + len(orphan)))
+        lam = np.concatenate([l for _, _, l, _ in cols] + [-Kdiag[orphan]])
+        Z = np.hstack([z for _, _, _, z in cols] + [base.solve(G.toarray())])
+
+        S = np.eye(len(lam)) - lam[:, None] * (W.T @ Z)
+        if np.linalg.cond(S) > COND_MECHANISM:
+            return None
+        return cls(base, mask, W, lam, Z, S)
+
+    def __init__(self, base, mask, W, lam, Z, S):
+        self.base, self.model, self.ke = base, base.model, base.ke
+        self.active = base.active & ~mask
+        self.free, self.m_diag = base.free, base.m_diag
+        self.W, self.lam, self.Z = W.tocsr(), lam, Z
+        self.S = lu_factor(S)
+        self.K = (base.K - self.W @ sparse.diags(lam) @ self.W.T).tocsc()
+        n = len(self.free)
+        self.op = LinearOperator((n, n), matvec=self.solve, matmat=self.solve, dtype=float)
+        self.modes = None
+        self.columns = {}
+        self.lock = threading.Lock()
+
+    def solve(self, b):
+        u = self.base.solve(b)
+        u2 = u.reshape(len(u), -1)
+        y = lu_solve(self.S, self.lam[:, None] * (self.W.T @ u2))
+        return (u2 + self.Z @ y).reshape(u.shape)
+
+    @property
+    def nbytes(self):
+        b = self.K.data.nbytes * 2 + self.Z.nbytes
+        if self.modes is not None:
+            b += self.modes['phi'].nbytes
+        return b
+
+
+class ScaledSession:
+    """
+    A session at another E (G/E held fixed, as in uncertainty.py and
+    stiffness_calibration.py): K ∝ E, so periods scale by √(E_ref/E) and
+    displacements by E_ref/E — no re-assembly or factorization.
+    """
+
+    def __init__(self, session, scale):
+        self.session, self.scale = session, scale
+        self.model, self.active, self.free = session.model, session.active, session.free
+
+    def solve(self, b):
+        return self.session.solve(b) / self.scale
+
+    def modal(self, n):
+        md = self.session.modal(n)
+        r = np.sqrt(self.scale)
+        return dict(md, omega=md['omega'] * r, T=md['T'] / r)
+
+
+class AnalysisService:
+    """Model and session caches; thread-safe, LRU-evicted by memory budget."""
+
+    def __init__(self, max_mb=MAX_MB):
+        self.max_bytes = max_mb * 1e6
+        self.models = {}
+        self.sessions = OrderedDict()
+        self.lock = threading.RLock()
+        self.hits = self.misses = 0
+
+    def base(self, version, calibrated=False):
+        """Model, element matrices and the model's frame-member E [kPa]."""
+        key = (version, calibrated)
+        with self.lock:
+            if key not in self.models:
+                model = fm.load_model(version, calibrated=calibrated)
+                E_ref = fm.E_LONG * fm.load_calibration(version).get('E_factor', 1.0) \
+                    if calibrated else fm.E_LONG
+                self.models[key] = (model, fm.element_stiffness(model), E_ref)
+            return self.models[key]
+
+    def session(self, version='v10', E=None, drop=None, calibrated=False):
+        """Session for a query; an E what-if scales the (version, calibrated, drop) one."""
+        calibrated = bool(calibrated)
+        with self.lock:
+            s, cached = self._variant((version, calibrated, drop or ''))
+            if E is not None:
+                s = ScaledSession(s, float(E) * 1000.0 / self.base(version, calibrated)[2])
+            return s, cached                                                  # MPa -> kPa
+
+    def _variant(self, key):
+        version, calibrated, drop = key
+        if key in self.sessions:
+            self.hits += 1
+            if drop and (version, calibrated, '') in self.sessions:
+                self.sessions.move_to_end((version, calibrated, ''))      # keep its base warm
+            self.sessions.move_to_end(key)
+            return self.sessions[key], True
+        self.misses += 1
+        s = None
+        if drop:
+            s = DropSession.update(self._variant((version, calibrated, ''))[0], drop)
+        if s is None:
+            s = Session(*self.base(version, calibrated), drop=drop)
+        self.sessions[key] = s
+        self._evict()
+        return s, False
+
+    def _evict(self):
+        while len(self.sessions) > 1 and \
+                sum(s.nbytes for s in self.sessions.values()) > self.max_bytes:
+            self.sessions.popitem(last=False)
+
+    # ---- queries ----
+
+    def periods(self, s, n=12):
+        md = s.modal(int(n))
+        n = int(n)
+        return {'T': md['T'][:n], 'f': 1 / md['T'][:n],
+                'mass_ratio_x': md['mass_ratio'][:n, 0], 'mass_ratio_y': md['mass_ratio'][:n, 1]}
+
+    def drift(self, s, direction='X', ecc=sc.ECC):
+        T1 = s.modal(1)['T'][0]
+        V = sc.base_shear(s.model, T1)
+        r = sc.drift_check(s.model, s.solve, s.free, direction, float(ecc), V)
+        i = int(r['drift_ratio'].argmax())
+        return dict(r, V_kN=V, max_drift=r['drift_ratio'][i], max_drift_floor=r['floor'][i],
+                    drift_ok=bool(r['drift_ratio'][i] <= sc.DRIFT_LIMIT))
+
+    def eta(self, s, ecc=sc.ECC):
+        out = {}
+        for d in 'XY':
+            r = self.drift(s, d, ecc)
+            j = int(r['eta_bi'].argmax())
+            out[d] = {'eta_bi': r['eta_bi'][j], 'floor': r['floor'][j],
+                      'irregular': bool(r['eta_bi'][j] > sc.ETA_LIMIT)}
+        return out
+
+    def weight(self, s):
+        w = sc.member_weight_kg(s.model, s.active)
+        return {'weight_kg': w, 'limit_kg': sc.WEIGHT_LIMIT_KG,
+                'ok': w <= sc.WEIGHT_LIMIT_KG, 'n_members': int(s.active.sum())}
+
+    def spectrum(self, s):
+        sds, sd1, ta, tb, tl = spectrum_params()
+        T1 = s.modal(1)['T'][0]
+        branch = 'rising' if T1 < ta else 'plateau' if T1 <= tb else 'descending'
+        return {'T1': T1, 'Sae_g': design_spectrum([T1])[0], 'SDS': sds, 'SD1': sd1,
+                'TA': ta, 'TB': tb, 'branch': branch, 'V_kN': sc.base_shear(s.model, T1)}
+
+    def status(self):
+        with self.lock:
+            return {'sessions': [{'version': v, 'calibrated': c, 'drop': d,
+                                  'low_rank': isinstance(s, DropSession),
+                                  'MB': s.nbytes / 1e6,
+                                  'modes': 0 if s.modes is None else len(s.modes['T'])}
+                                 for (v, c, d), s in self.sessions.items()],
+                    'hits': self.hits, 'misses': self.misses,
+                    'MB': sum(s.nbytes for s in self.sessions.values()) / 1e6}
+
+    def query(self, endpoint, params):
+        """Dispatch one request; returns a JSON-ready dict."""
+        if endpoint == 'status':
+            return self.status()
+        if endpoint not in ('periods', 'drift', 'eta', 'weight', 'spectrum'):
+            raise KeyError(endpoint)
+        params = dict(params)
+        t0 = timer.perf_counter()
+        E = params.pop('E', None)
+        calibrated = params.pop('calibrated', '0').lower() in ('1', 'true', 'yes')
+        s, cached = self.session(params.pop('version', 'v10'),
+                                 None if E is None else float(E), params.pop('drop', None),
+                                 calibrated)
+        out = getattr(self, endpoint)(s, **params)
+        out.update(cached=cached, ms=(timer.perf_counter() - t0) * 1000)
+        return out
+
+
+# ============================================================
+# HTTP
+# ============================================================
+
+def _jsonable(o):
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(type(o).__name__)
+
+
+class Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            body, code = self.service.query(url.path.strip('/'), parse_qsl(url.query)), 200
+        except KeyError as e:
+            body, code = {'error': f'unknown endpoint or parameter {e}'}, 404
+        except FileNotFoundError as e:
+            body, code = {'error': f'no model files: {e.filename}'}, 404
+        except (TypeError, ValueError) as e:
+            body, code = {'error': str(e)}, 400
+        data = json.dumps(body, default=_jsonable).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(port=PORT, max_mb=MAX_MB):
+    Handler.service = AnalysisService(max_mb)
+    httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f"  Serving on http://127.0.0.1:{httpd.server_address[1]}/  (Ctrl-C to stop)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    httpd.server_close()
+
+
+def query(endpoint, port=PORT, **params):
+    """Client helper: GET one endpoint, returns the decoded JSON."""
+    url = f'http://127.0.0.1:{port}/{endpoint}?{urlencode(params)}'
+    try:
+        with urlopen(url) as r:
+            return json.loads(r.read())
+    except HTTPError as e:
+        return json.loads(e.read())
+
+
+def main():
+    args = sys.argv[1:]
+    opts = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    port = int(opts.get('port', PORT))
+    if args and args[0] == 'query':
+        params = dict(a.split('=', 1) for a in args[2:] if not a.startswith('--'))
+        print(json.dumps(query(args[1], port, **params), indent=1))
+        return
+    print("=" * 70)
+    print("ANALYSIS SERVICE — resident models, factors and modal bases")
+    print("=" * 70)
+    serve(port, float(opts.get('max-mb', MAX_MB)))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ import os
 # ==============================================================================
 # 1) VERi OKUMA - V10e pozisyon matrisi
 # ==============================================================================
-BASE_DIR = Path(r"c:\Users\lenovo\Desktop\DASK_NEW")
+BASE_DIR = Path(__file__).resolve().parent.parent
 CSV_PATH = BASE_DIR / "data" / "twin_position_matrix_v10e.csv"
 
 nodes = []
@@ -0,0 +1,277 @@
+"""
+NSGA-II BRACE LAYOUT OPTIMIZER
+==============================
+Multi-objective search over brace on/off layouts of a model version,
+replacing the hand-picked option tables of design_optimization.py and
+stiffening_analysis.py:
+
+- genes = brace groups: (type, bay, face, floor group) of the base
+  model's brace_xz / brace_yz members — one gene switches e.g. the
+  tower-1 south-face, second-bay X braces of floors 6-10
+- objectives (minimized): member weight, T1, max ESL story drift ratio,
+  max η_bi (static_checks.py, ±5% eccentricity)
+- constraints: weight ≤ 1.40 kg, η_bi < 1.4, drift ≤ 0.8%; Deb's
+  constrained domination (feasible first, then smaller violation);
+  a layout that forms a mechanism (singular K: neither the banded
+  Cholesky nor the SuperLU fallback factorizes it) is infeasible
+- fitness evaluations run in a process pool; each worker keeps the
+  model and element matrices resident and only re-assembles K with
+  zero factors for the switched-off braces
+- results are memoized by layout bitmask, so repeated genomes (elites,
+  duplicate offspring) cost nothing
+
+Output: results/brace_pareto_<version>.csv (non-dominated feasible
+layouts, objectives and the layout bitmask in hex).
+
+Usage:
+    python scripts/brace_optimizer.py [version] [--pop=40] [--gen=25] [-jN]
+"""
+
+import os
+import sys
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.sparse.linalg import LinearOperator
+
+import frame_model as fm
+import static_checks as sc
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+BRACE_TYPES = ('brace_xz', 'brace_yz')
+FLOOR_GROUP = 5
+OBJECTIVES = ('weight_kg', 'T1', 'max_drift', 'max_eta')
+INFEASIBLE = 1e3          # violation of a singular (mechanism) layout
+
+
+# ============================================================
+# GENES
+# ============================================================
+
+def brace_genes(model, floor_group=FLOOR_GROUP):
+    """
+    Group brace elements into genes. Returns (gene_of_element, labels):
+    gene index per element (−1 = not a brace) and one label per gene.
+    """
+    mid = (model.xyz[model.ei] + model.xyz[model.ej]) / 2 / fm.S     # cm
+    fl = sc.element_floor(model)
+    gene = np.full(model.n_elem, -1)
+    idx = np.flatnonzero(np.isin(model.etype, BRACE_TYPES))
+    k = (model.etype[idx] == 'brace_yz').astype(int)                 # in-plane axis
+    bay = np.round(mid[idx, k], 1)
+    face = np.round(mid[idx, 1 - k], 1)
+    grp = (fl[idx] - 1) // floor_group
+    keys = pd.DataFrame({'type': model.etype[idx], 'bay': bay, 'face': face, 'group': grp})
+    codes, uniq = pd.factorize(pd.MultiIndex.from_frame(keys), sort=True)
+    gene[idx] = codes
+    labels = [f"{t}@{'xy'[t == 'brace_yz']}={b:g},face={f:g},"
+              f"floors {g * floor_group + 1}-{(g + 1) * floor_group}" for t, b, f, g in uniq]
+    return gene, labels
+
+
+# ============================================================
+# FITNESS (worker side)
+# ============================================================
+
+_W = {}
+
+
+def _init_worker(version, floor_group):
+    model = fm.load_model(version)
+    gene, _ = brace_genes(model, floor_group)
+    free = fm.free_dofs(model)
+    _W.update(model=model, gene=gene, ke=fm.element_stiffness(model), free=free,
+              m_diag=fm.mass_diagonal(model)[free])
+
+
+def evaluate(genome):
+    """Objectives and constraint violation of one layout (bool genome)."""
+    m, gene = _W['model'], _W['gene']
+    active = (gene < 0) | np.asarray(genome, dtype=bool)[np.maximum(gene, 0)]
+    weight = sc.member_weight_kg(m, active)
+    free = _W['free']
+    K = fm.assemble(m, _W['ke'], active.astype(float))[free][:, free].tocsc()
+    op = fm.banded_inverse(K)
+    if op is None:                     # band over max_bytes, or not positive definite
+        try:
+            solve = sc.factorize(K)
+        except ValueError:             # singular: a mechanism
+            return {'weight_kg': weight, 'T1': np.inf, 'max_drift': np.inf,
+                    'max_eta': np.inf, 'violation': INFEASIBLE}
+        op = LinearOperator(K.shape, matvec=solve, matmat=solve, dtype=float)
+    T1 = fm.modal(m, 1, K, _W['m_diag'], free, OPinv=op)['T'][0]
+    V = sc.base_shear(m, T1)
+    checks = [sc.drift_check(m, op.matvec, free, d, V=V) for d in 'XY']
+    drift = max(c['drift_ratio'].max() for c in checks)
+    eta = max(c['eta_bi'].max() for c in checks)
+    violation = (max(0.0, weight / sc.WEIGHT_LIMIT_KG - 1) + max(0.0, eta / sc.ETA_MAX - 1)
+                 + max(0.0, drift / sc.DRIFT_LIMIT - 1))
+    return {'weight_kg': weight, 'T1': T1, 'max_drift': drift, 'max_eta': eta,
+            'violation': violation}
+
+
+# ============================================================
+# NSGA-II
+# ============================================================
+
+def dominates(F, V):
+    """D[i, j] = i constrained-dominates j."""
+    feas = V <= 0
+    better = (F[:, None, :] <= F[None, :, :]).all(-1) & (F[:, None, :] < F[None, :, :]).any(-1)
+    D = np.where(feas[:, None] & feas[None, :], better, False)
+    D |= feas[:, None] & ~feas[None, :]
+    D |= ~feas[:, None] & ~feas[None, :] & (V[:, None] < V[None, :])
+    return D
+
+
+def non_dominated_sort(F, V):
+    """Front index per individual (0 = best)."""
+    D = dominates(F, V)
+    n_dom = D.sum(axis=0)
+    rank = np.full(len(F), -1)
+    front, r = np.flatnonzero(n_dom == 0), 0
+    while len(front):
+        rank[front] = r
+        n_dom = n_dom - D[front].sum(axis=0)
+        n_dom[rank >= 0] = -1
+        front, r = np.flatnonzero(n_dom == 0), r + 1
+    return rank
+
+
+def crowding(F, rank):
+    """Crowding distance within each front."""
+    cd = np.zeros(len(F))
+    for r in np.unique(rank):
+        idx = np.flatnonzero(rank == r)
+        if len(idx) <= 2:
+            cd[idx] = np.inf
+            continue
+        for k in range(F.shape[1]):
+            f = F[idx, k]
+            o = np.argsort(f)
+            span = f[o[-1]] - f[o[0]]
+            cd[idx[o[[0, -1]]]] = np.inf
+            if span > 0 and np.isfinite(span):
+                cd[idx[o[1:-1]]] += (f[o[2:]] - f[o[:-2]]) / span
+    return cd
+
+
+class BraceOptimizer:
+    """NSGA-II with a bitmask fitness cache and a process pool."""
+
+    def __init__(self, version='v10', pop=40, floor_group=FLOOR_GROUP, n_jobs=None,
+                 objectives=OBJECTIVES, seed=0):
+        self.version, self.pop, self.floor_group = version, pop, floor_group
+        self.objectives = list(objectives)
+        model = fm.load_model(version)
+        self.gene, self.labels = brace_genes(model, floor_group)
+        self.n_genes = len(self.labels)
+        self.rng = np.random.default_rng(seed)
+        self.cache = {}
+        self.evaluated = self.requested = 0
+        self.n_jobs = n_jobs or os.cpu_count()
+        self.pool = ProcessPoolExecutor(self.n_jobs, initializer=_init_worker,
+                                        initargs=(version, floor_group))
+
+    def fitness(self, P):
+        """(F, V) for a population of genomes; only uncached bitmasks are evaluated."""
+        keys = [np.packbits(g).tobytes() for g in P]
+        todo = {k: g for k, g in zip(keys, P) if k not in self.cache}
+        self.requested += len(P)
+        self.evaluated += len(todo)
+        chunk = max(1, len(todo) // (4 * self.n_jobs))
+        for k, r in zip(todo, self.pool.map(evaluate, todo.values(), chunksize=chunk)):
+            self.cache[k] = r
+        F = np.array([[self.cache[k][o] for o in self.objectives] for k in keys])
+        V = np.array([self.cache[k]['violation'] for k in keys])
+        return F, V
+
+    def initial(self):
+        """Base layout plus random layouts of 30-100% brace density."""
+        p = self.rng.uniform(0.3, 1.0, (self.pop, 1))
+        P = self.rng.random((self.pop, self.n_genes)) < p
+        P[0] = True
+        return P
+
+    def offspring(self, P, rank, cd):
+        n = len(P)
+        a, b = self.rng.integers(n, size=(2, n))
+        better = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (cd[a] > cd[b]))
+        parents = P[np.where(better, a, b)]
+        mates = parents[self.rng.permutation(n)]
+        C = np.where(self.rng.random(P.shape) < 0.5, parents, mates)      # uniform crossover
+        return C ^ (self.rng.random(P.shape) < 1.0 / self.n_genes)       # bit-flip mutation
+
+    def run(self, generations=25, log=print):
+        t0 = timer.time()
+        P = self.initial()
+        F, V = self.fitness(P)
+        for g in range(generations):
+            rank = non_dominated_sort(F, V)
+            C = self.offspring(P, rank, crowding(F, rank))
+            FC, VC = self.fitness(C)
+            P, F, V = np.vstack([P, C]), np.vstack([F, FC]), np.concatenate([V, VC])
+            rank = non_dominated_sort(F, V)
+            cd = crowding(F, rank)
+            keep = np.lexsort((-cd, rank))[:self.pop]
+            P, F, V = P[keep], F[keep], V[keep]
+            if log:
+                feas = V <= 0
+                log(f"  gen {g + 1:>3}: {feas.sum():>3} feasible, front {int((rank[keep] == 0).sum()):>3}, "
+                    f"min W {F[feas, 0].min() if feas.any() else np.nan:.3f} kg, "
+                    f"{self.evaluated}/{self.requested} evaluated, "
+                    f"{self.evaluated / (timer.time() - t0 + 1e-9):.1f} eval/s")
+        self.pool.shutdown()
+        return P, F, V
+
+    def pareto(self, P, F, V):
+        """Feasible non-dominated layouts as a DataFrame."""
+        feas = np.flatnonzero(V <= 0)
+        if not len(feas):
+            return pd.DataFrame(columns=self.objectives)
+        rank = non_dominated_sort(F[feas], V[feas])
+        sel = feas[rank == 0]
+        keys = {np.packbits(g).tobytes() for g in P[sel]}
+        rows = []
+        for k in keys:
+            g = np.unpackbits(np.frombuffer(k, np.uint8))[:self.n_genes].astype(bool)
+            rows.append(dict({o: self.cache[k][o] for o in OBJECTIVES},
+                             n_genes_on=int(g.sum()),
+                             layout=np.packbits(g).tobytes().hex()))
+        return pd.DataFrame(rows).sort_values('weight_kg').reset_index(drop=True)
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    n_jobs = next((int(a[2:]) for a in args if a.startswith('-j') and a[2:]), None)
+
+    print("=" * 70)
+    print(f"NSGA-II BRACE LAYOUT OPTIMIZATION — {version}")
+    print("=" * 70)
+    bo = BraceOptimizer(version, pop=int(opt.get('pop', 40)), n_jobs=n_jobs,
+                        floor_group=int(opt.get('floor-group', FLOOR_GROUP)))
+    print(f"  {bo.n_genes} genes (brace groups), population {bo.pop}, "
+          f"{bo.n_jobs} workers")
+    t0 = timer.time()
+    P, F, V = bo.run(int(opt.get('gen', 25)))
+    front = bo.pareto(P, F, V)
+    print(f"\n  {bo.evaluated} evaluations ({bo.requested - bo.evaluated} cache hits) "
+          f"in {timer.time() - t0:.1f}s")
+    print(f"  Pareto front: {len(front)} feasible layouts")
+    if len(front):
+        print(front.drop(columns='layout').to_string(index=False, float_format='%.4f'))
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f'brace_pareto_{version}.csv'
+    front.to_csv(out, index=False)
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+DISTRIBUTED CAMPAIGN EXECUTOR (TCP)
+===================================
+Scheduler/worker pair for FRF campaigns across several machines:
+
+- the scheduler listens on a TCP port; workers (any host) dial in, so
+  scaling out is running the worker command on another lab machine
+- every message is one binary envelope: frame header (type, length),
+  JSON header, then raw numpy buffers — no pickling over the wire
+- the model is shipped as its position/connectivity CSV bytes, records
+  as float64 arrays, both keyed by content hash. Workers keep them in
+  a disk cache and list the keys they hold when they connect
+- locality-aware scheduling: a free worker gets the pending job whose
+  model and record it already holds (model hits weigh more — they save
+  an eigen solve, record hits only the transfer); anything missing is
+  shipped once, right before the job
+- results come back as compact envelopes (peaks + float32 drift
+  profile); jobs of a dropped worker are re-queued elsewhere
+
+Local cluster stand-in: `serve --local=N` starts N worker processes on
+127.0.0.1; remote workers can join the same campaign at any time.
+
+Usage:
+    python scripts/distributed.py serve [--port=P] [--local=N] [versions...]
+    python scripts/distributed.py worker HOST:PORT [--procs=N]
+"""
+
+import hashlib
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time as timer
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+GM_DASK = ROOT / 'ground_motion_dask'
+RESULTS = ROOT / 'results'
+CACHE_DIR = Path(os.environ.get('DASK26_CACHE', Path.home() / '.cache' / 'dask26'))
+STALE_TMP_S = 600          # temp files older than this are crashed stores
+
+PORT = 47026
+MAX_RETRY = 2
+
+HELLO, MODEL, RECORD, JOB, RESULT, ERROR, BYE = range(1, 8)
+_FRAME = struct.Struct('!BI')
+_HLEN = struct.Struct('!I')
+
+
+# ============================================================
+# ENVELOPES
+# ============================================================
+
+def pack(kind, header, arrays=None):
+    """Frame = (type, length) + JSON header + raw array buffers."""
+    arrays = {k: np.ascontiguousarray(v) for k, v in (arrays or {}).items()}
+    header = dict(header, arrays=[[k, v.dtype.str, v.shape] for k, v in arrays.items()])
+    h = json.dumps(header, separators=(',', ':')).encode()
+    body = b''.join([_HLEN.pack(len(h)), h] + [v.tobytes() for v in arrays.values()])
+    return _FRAME.pack(kind, len(body)) + body
+
+
+def unpack(body):
+    """Inverse of pack() for one frame body -> (header, arrays)."""
+    n = _HLEN.unpack_from(body)[0]
+    header = json.loads(body[4:4 + n])
+    arrays, off = {}, 4 + n
+    for name, dtype, shape in header.pop('arrays'):
+        dt = np.dtype(dtype)
+        size = dt.itemsize * int(np.prod(shape))
+        arrays[name] = np.frombuffer(body, dt, int(np.prod(shape)), off).reshape(shape)
+        off += size
+    return header, arrays
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view, got = memoryview(buf), 0
+    while got < n:
+        k = sock.recv_into(view[got:])
+        if k == 0:
+            raise ConnectionError("peer closed")
+        got += k
+    return bytes(buf)
+
+
+def recv(sock):
+    kind, n = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    return (kind,) + unpack(_recv_exact(sock, n))
+
+
+def _key(*parts):
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(p)
+    return h.hexdigest()[:16]
+
+
+def model_payload(version):
+    """(key, header, arrays) of a model version's CSV description."""
+    import frame_model as fm
+    pos, conn = (np.frombuffer(p.read_bytes(), np.uint8) for p in fm.model_files(version))
+    return _key(pos, conn), {'version': version}, {'pos': pos, 'conn': conn}
+
+
+def record_payload(name):
+    from ground_motion_im import load_dask_record
+    _, a, dt = load_dask_record(GM_DASK / f'{name}.txt')
+    return _key(a.tobytes(), struct.pack('d', dt)), {'name': name, 'dt': dt}, {'acc': a}
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class Scheduler:
+    """
+    Serves one campaign: jobs = [{'version', 'record', 'direction', 'xi',
+    'scale'}, ...]. Blocks in run() until every job has a result or has
+    failed MAX_RETRY + 1 times.
+    """
+
+    def __init__(self, jobs, host='0.0.0.0', port=PORT):
+        self.models, self.records = {}, {}
+        self.jobs = []
+        for i, j in enumerate(jobs):
+            if j['version'] not in self.models:
+                self.models[j['version']] = model_payload(j['version'])
+            if j['record'] not in self.records:
+                self.records[j['record']] = record_payload(j['record'])
+            self.jobs.append(dict(j, id=i, model=self.models[j['version']][0],
+                                  rec=self.records[j['record']][0]))
+        self.pending = list(range(len(self.jobs)))
+        self.results, self.errors, self.tries = {}, {}, {}
+        self.shipped = 0
+        self.cv = threading.Condition()
+        self.sock = socket.create_server((host, port))
+        self.port = self.sock.getsockname()[1]
+
+    def _finished(self):
+        return len(self.results) + len(self.errors) == len(self.jobs)
+
+    def _pick(self, held):
+        """Pending job with the best cache score for this worker."""
+        best, score = None, -1
+        for pos, i in enumerate(self.pending):
+            j = self.jobs[i]
+            s = 2 * (j['model'] in held) + (j['rec'] in held)
+            if s > score:
+                best, score = pos, s
+                if s == 3:
+                    break
+        return self.pending.pop(best)
+
+    def _serve(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        job = None
+        try:
+            kind, hello, _ = recv(conn)
+            held = set(hello.get('have', []))
+            while True:
+                with self.cv:
+                    while not self.pending and not self._finished():
+                        self.cv.wait()
+                    if self._finished():
+                        break
+                    job = self.jobs[self._pick(held)]
+                for key, (k, h, a), typ in (
+                        (job['model'], self.models[job['version']], MODEL),
+                        (job['rec'], self.records[job['record']], RECORD)):
+                    if key not in held:
+                        conn.sendall(pack(typ, dict(h, key=k), a))
+                        held.add(key)
+                        self.shipped += 1
+                conn.sendall(pack(JOB, {k: job[k] for k in
+                                        ('id', 'model', 'rec', 'direction', 'xi', 'scale')}))
+                kind, h, arrays = recv(conn)
+                with self.cv:
+                    if kind == RESULT:
+                        self.results[job['id']] = (dict(h, worker=hello['name']), arrays)
+                    else:
+                        self._retry(job, h.get('error', '?'))
+                    job = None
+                    self.cv.notify_all()
+            conn.sendall(pack(BYE, {}))
+        except (ConnectionError, OSError, struct.error) as e:
+            if job is not None:
+                with self.cv:
+                    self._retry(job, f'worker lost: {e}')
+                    self.cv.notify_all()
+        finally:
+            conn.close()
+
+    def _retry(self, job, error):
+        n = self.tries[job['id']] = self.tries.get(job['id'], 0) + 1
+        if n > MAX_RETRY:
+            self.errors[job['id']] = error
+        else:
+            self.pending.append(job['id'])
+
+    def run(self, timeout=None):
+        """Accept workers until the campaign is done; returns results by job id."""
+        def accept():
+            while True:
+                try:
+                    conn, _ = self.sock.accept()
+                except OSError:
+                    return
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+        threading.Thread(target=accept, daemon=True).start()
+        with self.cv:
+            self.cv.wait_for(self._finished, timeout)
+        self.sock.close()
+        return self.results
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+class Worker:
+    """One connection, one job at a time; models and records cached on disk."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache = Path(cache_dir)
+        self.cache.mkdir(parents=True, exist_ok=True)
+        self.engines = {}
+        self.clear_stale()
+
+    def clear_stale(self, age=STALE_TMP_S):
+        """Remove temp files of stores that never finished (crashed workers)."""
+        now = timer.time()
+        for p in [*self.cache.glob('*.tmp'), *self.cache.glob('*.tmp.npz')]:
+            try:
+                if now - p.stat().st_mtime > age:
+                    p.unlink()
+            except FileNotFoundError:
+                pass
+
+    def held(self):
+        return sorted(p.stem for p in self.cache.glob('*.npz') if '.' not in p.stem)
+
+    def store(self, key, header, arrays):
+        tmp = self.cache / f'{key}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, header=json.dumps(header), **arrays)
+        os.replace(tmp, self.cache / f'{key}.npz')
+
+    def engine(self, key, xi):
+        if (key, xi) not in self.engines:
+            import io
+            import pandas as pd
+            import frame_model as fm
+            from frequency_response import ModalEngine
+            z = np.load(self.cache / f'{key}.npz')
+            pos, conn = (pd.read_csv(io.BytesIO(z[k].tobytes())) for k in ('pos', 'conn'))
+            model = fm.from_frames(pos, conn, version=json.loads(str(z['header']))['version'])
+            self.engines[key, xi] = ModalEngine(model, xi=xi)
+        return self.engines[key, xi]
+
+    def run_job(self, job):
+        t0 = timer.time()
+        eng = self.engine(job['model'], job['xi'])
+        z = np.load(self.cache / f"{job['rec']}.npz")
+        dt = json.loads(str(z['header']))['dt']
+        res = eng.run(z['acc'] * job['scale'], dt, direction=job['direction'])
+        drift = res['drift'][0] * 100
+        j = int(drift.argmax())
+        return ({'id': job['id'], 'u_roof_cm': float(res['disp'][0, -1] * 100),
+                 'max_drift_pct': float(drift[j]), 'max_drift_floor': int(eng.floors[j + 1]),
+                 'T1': float(eng.modes['T'][0]), 'elapsed': timer.time() - t0},
+                {'drift_pct': drift.astype(np.float32),
+                 'disp_cm': (res['disp'][0] * 100).astype(np.float32)})
+
+    def serve(self, host, port, name=None):
+        name = name or f'{socket.gethostname()}:{os.getpid()}'
+        with socket.create_connection((host, port)) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.sendall(pack(HELLO, {'name': name, 'have': self.held()}))
+            n = 0
+            while True:
+                kind, h, arrays = recv(sock)
+                if kind in (MODEL, RECORD):
+                    self.store(h.pop('key'), h, arrays)
+                elif kind == JOB:
+                    try:
+                        sock.sendall(pack(RESULT, *self.run_job(h)))
+                    except Exception as e:
+                        sock.sendall(pack(ERROR, {'id': h['id'],
+                                                  'error': f'{type(e).__name__}: {e}'}))
+                    n += 1
+                else:
+                    return n
+
+
+def start_workers(address, n, cache_dir=None):
+    """Worker subprocesses dialing `address` (local cluster stand-in)."""
+    env = dict(os.environ)
+    if cache_dir:
+        env['DASK26_CACHE'] = str(cache_dir)
+    return [subprocess.Popen([sys.executable, __file__, 'worker', address], env=env)
+            for _ in range(n)]
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def _opt(args, name, default):
+    return next((type(default)(a.split('=', 1)[1]) for a in args
+                 if a.startswith(f'--{name}=')), default)
+
+
+def main():
+    args = sys.argv[1:] or ['serve']
+    if args[0] == 'worker':
+        host, port = args[1].rsplit(':', 1)
+        procs = _opt(args, 'procs', 1)
+        if procs > 1:
+            for p in start_workers(args[1], procs):
+                p.wait()
+        else:
+            Worker().serve(host, int(port))
+        return
+
+    from job_queue import frf_campaign
+    versions = [a for a in args[1:] if not a.startswith('--')] or ['v9', 'v10', 'v11']
+    jobs = frf_campaign(versions=versions)
+    sched = Scheduler(jobs, port=_opt(args, 'port', PORT))
+    n_local = _opt(args, 'local', os.cpu_count())
+
+    print("=" * 70)
+    print(f"DISTRIBUTED FRF CAMPAIGN — {len(jobs)} jobs, port {sched.port}")
+    print("=" * 70)
+    print(f"  Remote workers: python scripts/distributed.py worker "
+          f"{socket.gethostname()}:{sched.port}")
+    t0 = timer.time()
+    procs = start_workers(f'127.0.0.1:{sched.port}', n_local)
+    results = sched.run()
+    for p in procs:
+        p.wait()
+    wall = timer.time() - t0
+
+    import pandas as pd
+    rows = [dict({k: v for k, v in jobs[i].items()},
+                 **{k: h[k] for k in ('u_roof_cm', 'max_drift_pct', 'max_drift_floor',
+                                      'T1', 'worker', 'elapsed')})
+            for i, (h, _) in sorted(results.items())]
+    df = pd.DataFrame(rows)
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / 'distributed_campaign.csv'
+    df.to_csv(out, index=False)
+    print(f"  {len(results)}/{len(jobs)} jobs in {wall:.1f}s on "
+          f"{df['worker'].nunique() if len(df) else 0} workers, "
+          f"{sched.shipped} model/record transfers, {len(sched.errors)} failed")
+    for i, e in sched.errors.items():
+        print(f"  job {i}: {e}")
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+ELEMENT IMPORTANCE RANKING (STRAIN-ENERGY PERTURBATION)
+=======================================================
+First-order effect of removing (or doubling) each member on T1, T2,
+the torsional period and the static ELF compliance, from one eigen
+solve and one static factorization — instead of picking the critical
+element after full time-history post-processing (fragility_advanced.py)
+or switching braces by hand (design_optimization.py):
+
+- member multiplicity p_e (K = Σ p_e K_e): removal Δp = −1, doubling
+  Δp = +1; first order, so doubling is the sign flip of removal
+- modal strain energy of mode n in member e, ε_ne = φ_eᵀ K_e φ_e
+  (mass-normalized): Δλ_n = Δp ε_ne, ΔT_n = −T_n/(2λ_n) Δλ_n
+- ELF compliance C = Pᵀu (static_checks.lateral_loads, V(T1), no
+  eccentricity): ΔC = −Δp u_eᵀ K_e u_e
+- torsional mode: largest rotational mass participation about the
+  plan centre of mass among the computed modes
+- all energies in one einsum over (member, 12, 12) × (member, 12,
+  5 vectors); members are ranked by their largest relative change
+
+First order underestimates removals that open a mechanism; the top
+member is checked against a re-analysis.
+
+Output: results/element_importance_<version>.csv (ordered list).
+
+Usage:
+    python scripts/element_importance.py [version] [--double] [--top=20]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import frame_model as fm
+import static_checks as sc
+from sensitivity import element_vectors
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+N_MODES = 12
+METRICS = ('T1', 'T2', 'T_torsion', 'C_X', 'C_Y')
+
+
+def torsional_mode(model, modes):
+    """Index of the mode with the largest rotational (about Z) mass participation."""
+    free, m = modes['free'], modes['m_diag']
+    node, dof = free // fm.NDF, free % fm.NDF
+    c = (model.mass[:, None] * model.xyz[:, :2]).sum(axis=0) / model.mass.sum()
+    r = np.where(dof == 0, -(model.xyz[node, 1] - c[1]),
+                 np.where(dof == 1, model.xyz[node, 0] - c[0], 0.0))
+    g = modes['phi'].T @ (m * r)
+    ratio = g**2 / (m * r**2).sum()
+    return int(np.argmax(ratio - modes['mass_ratio'].max(axis=1)))
+
+
+def element_importance(model, action='remove', n_modes=N_MODES):
+    """
+    Member table (CSV order) with first-order ΔT1, ΔT2, ΔT_torsion [s]
+    and ΔC_X, ΔC_Y [%], plus attrs holding the base values.
+    """
+    dp = {'remove': -1.0, 'double': 1.0}[action]
+    ke = fm.element_stiffness(model)
+    K, m_diag, free = fm.system_matrices(model)
+    op = fm.banded_inverse(K)
+    solve = op.matvec if op is not None else sc.factorize(K)
+    modes = fm.modal(model, n_modes, K, m_diag, free, OPinv=op)
+    t = torsional_mode(model, modes)
+    idx = [0, 1, t]
+
+    V = sc.base_shear(model, modes['T'][0])
+    P = np.column_stack([sc.lateral_loads(model, free, d, 0.0, V) for d in 'XY'])
+    u = np.column_stack([solve(p) for p in P.T])
+    C = (P * u).sum(axis=0)
+
+    # strain energies of the three modes and two static solutions, one pass
+    Ue = element_vectors(model, free, np.column_stack([modes['phi'][:, idx], u]))
+    E = np.einsum('eik,eij,ejk->ek', Ue, ke, Ue, optimize=True)              # (ne, 5)
+
+    lam, T = modes['omega'][idx]**2, modes['T'][idx]
+    dT = -T / (2 * lam) * dp * E[:, :3]
+    dC = -dp * E[:, 3:] / C * 100
+    tab = pd.DataFrame({'element_id': model.elem_ids, 'type': model.etype,
+                        'floor': sc.element_floor(model),
+                        'weight_g': model.length * model.A * sc.BALSA_DENSITY * 1000})
+    for k, name in enumerate(METRICS[:3]):
+        tab[f'd{name}'] = dT[:, k]
+    for k, d in enumerate('XY'):
+        tab[f'dC_{d}_pct'] = dC[:, k]
+    rel = np.column_stack([np.abs(dT) / T * 100, np.abs(dC)])                # %
+    tab['importance_pct'] = rel.max(axis=1)
+    tab['governs'] = np.array(METRICS)[rel.argmax(axis=1)]
+    tab.attrs.update(T=dict(zip(METRICS[:3], T)), C=dict(zip('XY', C)), V=V,
+                     torsion_mode=t + 1, action=action)
+    return tab.sort_values('importance_pct', ascending=False).reset_index(drop=True)
+
+
+def reanalysis_check(model, element_id, action='remove', V=1.0):
+    """
+    Exact T1 and ELF compliances (base shear V) with one member removed
+    or doubled; None if the removal leaves a mechanism.
+    """
+    f = np.ones(model.n_elem)
+    f[model.elem_ids == element_id] = 0.0 if action == 'remove' else 2.0
+    K, m_diag, free = fm.system_matrices(model, f)
+    op = fm.banded_inverse(K)
+    if op is None:
+        return None
+    T1 = fm.modal(model, 1, K, m_diag, free, OPinv=op)['T'][0]
+    C = {d: float(p @ op.matvec(p)) for d in 'XY'
+         for p in [sc.lateral_loads(model, free, d, 0.0, V)]}
+    return {'T1': T1, 'C': C}
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    action = 'double' if '--double' in args else 'remove'
+    top = int(opt.get('top', 20))
+
+    print("=" * 70)
+    print(f"ELEMENT IMPORTANCE ({action.upper()}) — {version}")
+    print("=" * 70)
+    model = fm.load_model(version)
+    tab = element_importance(model, action)
+    T, C = tab.attrs['T'], tab.attrs['C']
+    print(f"  T1 = {T['T1']:.4f}s, T2 = {T['T2']:.4f}s, "
+          f"torsion (mode {tab.attrs['torsion_mode']}) = {T['T_torsion']:.4f}s")
+    print(f"  ELF compliance: X {C['X'] * 1000:.4f} J, Y {C['Y'] * 1000:.4f} J")
+    print(f"\n  Top {top} of {len(tab)} members:")
+    cols = ['element_id', 'type', 'floor', 'dT1', 'dT2', 'dT_torsion',
+            'dC_X_pct', 'dC_Y_pct', 'importance_pct', 'governs']
+    print(tab[cols].head(top).to_string(index=False, float_format='%.4g'))
+    counts = tab.head(top)['type'].value_counts()
+    print("  By type: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+
+    first = tab.iloc[0]
+    ex = reanalysis_check(model, first['element_id'], action, tab.attrs['V'])
+    if ex is None:
+        print(f"\n  Check [{first['element_id']}]: re-analysis is a mechanism")
+    else:
+        d = first['governs'][-1] if first['governs'].startswith('C') else 'X'
+        print(f"\n  Check [{first['element_id']}]: ΔT1 first order {first['dT1']:.3e}s, "
+              f"exact {ex['T1'] - T['T1']:.3e}s; ΔC_{d} first order "
+              f"{first[f'dC_{d}_pct']:.3f}%, exact {(ex['C'][d] / C[d] - 1) * 100:.3f}%")
+
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f'element_importance_{version}.csv'
+    tab.to_csv(out, index=False)
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+COPY-ON-WRITE FORK SERVER (OPENSEES, V10)
+=========================================
+run_time_history / run_pushover normally rebuild the model, run eigen
+and set up the analysis before the first real step. For campaigns of
+many short runs the server does that once:
+
+1) parent: build_model() → gravity (loads held constant, time reset)
+   → eigen — prepare_model() in full_analysis_v10.py
+2) per job: os.fork(); the child inherits the prepared OpenSees domain
+   copy-on-write, adds only the record pattern (or pushover load
+   pattern), analyzes, and sends its result dict back through a pipe
+3) the parent's domain is never touched after warm-up, so every child
+   starts from the same gravity-loaded, eigen-analyzed state
+
+Up to n_procs children run at once; results are collected with a
+selector loop in the (single-threaded) parent. POSIX only (os.fork).
+
+Usage:
+    python scripts/fork_server.py [-jN] [--no-gravity]   # KYH1-3 × X/Y + pushovers
+"""
+
+import json
+import os
+import selectors
+import sys
+import time as timer
+import traceback
+from pathlib import Path
+
+import full_analysis_v10 as fa
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+
+class ForkServer:
+    """Warm V10 domain in this process; one forked child per job."""
+
+    def __init__(self, gravity=True, num_modes=6):
+        if not hasattr(os, 'fork'):
+            raise OSError("fork server needs os.fork (POSIX)")
+        t0 = timer.time()
+        self.state = fa.prepare_model(num_modes, gravity=gravity)
+        self.warmup_s = timer.time() - t0
+
+    def _execute(self, job):
+        """Child side: apply the job's pattern to the inherited domain."""
+        kind = job.get('kind', 'th')
+        if kind == 'th':
+            return fa.run_time_history(job['name'], job['time'], job['acc_g'], job['dt'],
+                                       direction=job['direction'],
+                                       integrator_dt=job.get('integrator_dt', 0.001),
+                                       xi_val=job.get('xi', 0.05), trim=job.get('trim'),
+                                       state=self.state)
+        if kind == 'pushover':
+            return fa.run_pushover(job['direction'], job.get('target_drift_pct', 5.0),
+                                   job.get('n_steps', 500), state=self.state)
+        raise ValueError(f"unknown job kind {kind!r}")
+
+    def _fork(self, job):
+        r, w = os.pipe()
+        sys.stdout.flush()                             # no duplicated buffers
+        pid = os.fork()
+        if pid == 0:                                   # child
+            os.close(r)
+            code = 0
+            try:
+                out = {'result': self._execute(job)}
+            except BaseException as e:
+                out = {'error': f"{type(e).__name__}: {e}",
+                       'traceback': traceback.format_exc(limit=5)}
+                code = 1
+            with os.fdopen(w, 'wb') as f:
+                f.write(json.dumps(out, default=float).encode())
+            sys.stdout.flush()
+            os._exit(code)
+        os.close(w)
+        return pid, r
+
+    def map(self, jobs, n_procs=None):
+        """
+        Run jobs (dicts, see _execute; arrays are inherited, not copied)
+        in forked children; yields (job index, result dict or None, error
+        or None) as they finish.
+        """
+        n_procs = n_procs or os.cpu_count()
+        queue = list(enumerate(jobs))
+        running = {}
+        sel = selectors.DefaultSelector()
+        while queue or running:
+            while queue and len(running) < n_procs:
+                i, job = queue.pop(0)
+                pid, fd = self._fork(job)
+                running[fd] = (i, pid, bytearray())
+                sel.register(fd, selectors.EVENT_READ)
+            for key, _ in sel.select():
+                chunk = os.read(key.fd, 1 << 16)
+                if chunk:
+                    running[key.fd][2].extend(chunk)
+                    continue
+                sel.unregister(key.fd)
+                os.close(key.fd)
+                i, pid, buf = running.pop(key.fd)
+                _, status = os.waitpid(pid, 0)
+                try:
+                    out = json.loads(buf)
+                except ValueError:
+                    out = {'error': f"child exited with status {status} and no result"}
+                yield i, out.get('result'), out.get('error')
+        sel.close()
+
+
+def main():
+    n_procs = next((int(a[2:]) for a in sys.argv[1:] if a.startswith('-j') and a[2:]), None)
+    gravity = '--no-gravity' not in sys.argv
+
+    print("=" * 70)
+    print("FORK SERVER — V10 OpenSees campaign from one warm domain")
+    print("=" * 70)
+    srv = ForkServer(gravity=gravity)
+    print(f"  Warm-up (build{' + gravity' if gravity else ''} + eigen): {srv.warmup_s:.2f}s, "
+          f"T1 = {srv.state['periods'][0]:.4f}s")
+
+    jobs = []
+    for k in (1, 2, 3):
+        t, a, dt = fa.parse_dask_gm(fa.GM_DASK / f'KYH{k}.txt')
+        for d in ('X', 'Y'):
+            jobs.append({'kind': 'th', 'name': f'KYH{k}', 'time': t, 'acc_g': a,
+                         'dt': dt, 'direction': d, 'integrator_dt': 0.0005})
+    jobs += [{'kind': 'pushover', 'direction': d, 'target_drift_pct': 3.0, 'n_steps': 300}
+             for d in ('X', 'Y')]
+
+    t0 = timer.time()
+    summary = {}
+    for i, res, err in srv.map(jobs, n_procs):
+        if err:
+            print(f"  job {i}: FAILED — {err}")
+            continue
+        summary[res['name']] = {k: v for k, v in res.items() if not isinstance(v, list)}
+        print(f"  {res['name']:<12} done ({res['elapsed_s']:.1f}s analysis)")
+    print(f"  {len(summary)}/{len(jobs)} jobs in {timer.time() - t0:.1f}s")
+
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / 'fork_server_v10.json'
+    out.write_text(json.dumps({'warmup_s': srv.warmup_s, 'gravity': gravity,
+                               'results': summary}, indent=2))
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+LINEAR-SCALING LOGNORMAL FRAGILITY (LIBRARY)
+============================================
+Importable form of analysis/torsional_irregularity/fragility_analysis.py:
+
+- element demands from the OpenSees `localForce` recorder output of the
+  V9 Tcl time histories, all elements at once ((time, element, 12))
+- P–M interaction DCR = P/Py + M/My, bending and shear stresses
+- elastic model ⇒ DCR_max = k·PGA per record; capacities PGA_c = DCR/k
+  give θ and record-to-record β_r, combined with epistemic β_u
+  (FEMA P-58 typical 0.30)
+
+Units: kN, cm (Tcl recorder output).
+
+Usage:
+    python scripts/fragility.py
+"""
+
+import numpy as np
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+TH_DIR = ROOT / 'analysis' / 'torsional_irregularity' / 'results'
+
+# 6mm × 6mm section, model-scaled strength (fragility_analysis.py)
+A_SEC = 0.36
+W_EL = 0.036
+F_Y = 9600.0
+P_Y = F_Y * A_SEC
+M_Y = F_Y * W_EL
+
+DS_THRESHOLDS = {'DS-1': 0.25, 'DS-2': 0.50, 'DS-3': 0.75, 'Gocme': 1.00}
+BETA_U = 0.30
+
+# record -> (recorder file, PGA [g])
+RECORDS = {
+    'KYH1': (TH_DIR / 'th_KYH1' / 'element_forces' / 'sample_forces.txt', 0.335),
+    'KYH2': (TH_DIR / 'th_KYH2' / 'element_forces' / 'sample_forces.txt', 1.243),
+    'KYH3': (TH_DIR / 'th_KYH3' / 'element_forces' / 'sample_forces.txt', 1.896),
+}
+
+
+def element_demands(forces):
+    """
+    Peak member demands from recorder rows (n_steps, 12·n_elem).
+    Returns dict of (n_elem,) arrays: P, M, V, DCR, sigma_b, tau.
+    """
+    F = np.asarray(forces, dtype=float)
+    F = F.reshape(F.shape[0], -1, 12)
+    f = np.abs(F)
+    P = np.abs(F[..., 0] + F[..., 6]).max(axis=0) / 2
+    My = np.maximum(f[..., 4], f[..., 10]).max(axis=0)
+    Mz = np.maximum(f[..., 5], f[..., 11]).max(axis=0)
+    M = np.hypot(My, Mz)
+    V = np.hypot(f[..., 1].max(axis=0), f[..., 2].max(axis=0))
+    return {'P': P, 'M': M, 'V': V, 'DCR': P / P_Y + M / M_Y,
+            'sigma_b': M / W_EL, 'tau': 1.5 * V / A_SEC}
+
+
+def linear_fragility(dcr_max, pga, thresholds=DS_THRESHOLDS, beta_u=BETA_U):
+    """
+    Lognormal parameters from one peak DCR per record (elastic scaling).
+    Returns dict: k per record, k_mean, beta_r, beta_total, theta per DS [g].
+    """
+    k = np.asarray(dcr_max, dtype=float) / np.asarray(pga, dtype=float)
+    k_mean = k.mean()
+    beta_r = np.std(np.log(1.0 / k))
+    beta_total = np.hypot(beta_r, beta_u)
+    return {'k': k, 'k_mean': k_mean, 'beta_r': beta_r, 'beta_u': beta_u,
+            'beta_total': beta_total,
+            'theta': {ds: t / k_mean for ds, t in thresholds.items()}}
+
+
+def exceedance(pga, theta, beta):
+    """P(DS ≥ ds | PGA) = Φ(ln(PGA/θ)/β), vectorized over pga."""
+    from scipy.special import ndtr
+    return ndtr(np.log(np.asarray(pga, dtype=float) / theta) / beta)
+
+
+def record_fragility(records=RECORDS, thresholds=DS_THRESHOLDS, beta_u=BETA_U):
+    """Element demands per record and the fitted fragility."""
+    demands, pga = {}, []
+    for name, (path, p) in records.items():
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found — run the Tcl time "
+                                    f"histories (advanced_time_history_dask.tcl) first")
+        demands[name] = element_demands(np.loadtxt(path, ndmin=2))
+        pga.append(p)
+    dcr_max = [d['DCR'].max() for d in demands.values()]
+    return demands, linear_fragility(dcr_max, pga, thresholds, beta_u)
+
+
+def main():
+    print("=" * 70)
+    print("  LINEAR-SCALING LOGNORMAL FRAGILITY — V9 Tcl time histories")
+    print("=" * 70)
+    demands, fit = record_fragility()
+    for (name, d), k in zip(demands.items(), fit['k']):
+        print(f"  {name}: DCR_max = {d['DCR'].max():.4f}, k = {k:.5f}  "
+              f"({len(d['DCR'])} elements)")
+    print(f"\n  k_mean = {fit['k_mean']:.5f}, beta_r = {fit['beta_r']:.4f}, "
+          f"beta_total = {fit['beta_total']:.4f}")
+    for ds, theta in fit['theta'].items():
+        p = exceedance([0.335, 0.500], theta, fit['beta_total'])
+        print(f"  {ds:<6} theta = {theta:.2f} g   P(|0.335g) = {p[0]:.2e}   "
+              f"P(|0.500g) = {p[1]:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+SPARSE FRAME MODEL (NumPy/SciPy)
+================================
+Python-side stiffness and mass assembly of the twin-tower CSV models,
+mirroring full_analysis_v10.build_model() so linear analyses can run
+without an OpenSees domain:
+
+- elasticBeamColumn members as 12×12 3D frame elements (no shear
+  deformation), pin-type members as axial-only trusses
+- same vecxz choice as the geomTransf tags in build_model()
+- lumped translational masses: 1.60 kg on floors 3,6,...,24, 2.22 kg at
+  the roof, 1.168 kg self weight spread over all nodes
+- base (floor 0) nodes fixed; rotational DOFs that only trusses touch
+  carry no stiffness and are dropped from the free set
+- optional test calibration (data/model_calibration.json, written by
+  stiffness_calibration.py): load_model(version, calibrated=True)
+  scales E and G, frame-member I (joint flexibility), truss E (brace
+  effectiveness) and the lumped masses
+
+Element matrices are built for all members at once as (n_elem, 12, 12)
+arrays and scattered into a SciPy CSR matrix, so per-element or
+per-group property scaling (sensitivities, optimization, Monte Carlo)
+is just another vector of factors.
+
+Units: m, kN, tonne, s (same as full_analysis_v10.py)
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from scipy import sparse
+from scipy.linalg import cholesky_banded, cho_solve_banded, LinAlgError
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import eigsh, LinearOperator
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+
+# Section / material defaults — build_model() in full_analysis_v10.py
+S = 0.01            # cm -> m
+E_LONG = 3.5e6      # kPa
+G_BALSA = 0.2e6     # kPa
+B_SEC = 0.006       # m (6mm × 6mm)
+
+PIN_TYPES = {'brace_xz', 'brace_yz', 'floor_brace',
+             'bridge_truss', 'bridge_brace_bot', 'bridge_brace_top'}
+
+MASS_FLOORS = [3, 6, 9, 12, 15, 18, 21, 24]
+MASS_FLOOR_KG = 1.60
+MASS_ROOF_KG = 2.22
+SELF_KG = 1.168
+
+NDF = 6
+
+CALIBRATION_FILE = DATA / 'model_calibration.json'
+CALIBRATION_KEYS = ('E_factor', 'joint_factor', 'brace_factor', 'mass_factor')
+
+
+@dataclass
+class FrameModel:
+    """Arrays describing one model version (node/element order = CSV order)."""
+    version: str
+    node_ids: np.ndarray        # (n,)
+    xyz: np.ndarray             # (n, 3) m
+    floor: np.ndarray           # (n,)
+    tower: np.ndarray           # (n,)
+    elem_ids: np.ndarray        # (ne,)
+    ei: np.ndarray              # (ne,) node index i
+    ej: np.ndarray              # (ne,) node index j
+    etype: np.ndarray           # (ne,) element_type strings
+    truss: np.ndarray           # (ne,) bool
+    E: np.ndarray               # (ne,) kPa
+    G: np.ndarray               # (ne,) kPa
+    A: np.ndarray               # (ne,) m²
+    Iy: np.ndarray              # (ne,) m⁴
+    Iz: np.ndarray              # (ne,) m⁴
+    J: np.ndarray               # (ne,) m⁴
+    mass: np.ndarray            # (n,) tonne, per translational DOF
+    fixed: np.ndarray           # (n,) bool
+    cache: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def n_elem(self):
+        return len(self.elem_ids)
+
+    @property
+    def ndof(self):
+        return NDF * self.n_nodes
+
+    @property
+    def length(self):
+        return np.linalg.norm(self.xyz[self.ej] - self.xyz[self.ei], axis=1)
+
+    @property
+    def elem_dofs(self):
+        """(ne, 12) global DOF numbers of each element."""
+        d = np.arange(NDF)
+        return np.hstack([self.ei[:, None] * NDF + d, self.ej[:, None] * NDF + d])
+
+    def floor_nodes(self, f):
+        return np.flatnonzero(self.floor == f)
+
+    @property
+    def floors(self):
+        return np.unique(self.floor)
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def model_files(version='v10'):
+    """Position / connectivity CSV paths for a model version ('' = base)."""
+    sfx = f'_{version}' if version else ''
+    return (DATA / f'twin_position_matrix{sfx}.csv',
+            DATA / f'twin_connectivity_matrix{sfx}.csv')
+
+
+def from_frames(pos_df, conn_df, version='', E=E_LONG, G=G_BALSA, b=B_SEC,
+                self_kg=SELF_KG, pin_types=PIN_TYPES, floor_mass_kg=None):
+    """
+    Build a FrameModel from position/connectivity DataFrames.
+
+    floor_mass_kg: {floor: kg spread over the floor's nodes}; default is
+    the build_model() scheme (MASS_FLOORS + roof). pin_types: element
+    types modelled as trusses (empty -> all members are frames).
+    """
+    node_ids = pos_df['node_id'].to_numpy(dtype=int)
+    lookup = pd.Series(np.arange(len(node_ids)), index=node_ids)
+    xyz = pos_df[['x', 'y', 'z']].to_numpy(dtype=float) * S
+    floor = pos_df['floor'].to_numpy(dtype=int)
+    tower = (pos_df['tower'].to_numpy() if 'tower' in pos_df
+             else np.zeros(len(node_ids), dtype=int))
+
+    ei = lookup.loc[conn_df['node_i'].to_numpy(dtype=int)].to_numpy()
+    ej = lookup.loc[conn_df['node_j'].to_numpy(dtype=int)].to_numpy()
+    etype = conn_df['element_type'].to_numpy(dtype=str)
+    ne = len(ei)
+
+    A = np.full(ne, b**2)
+    Iz = np.full(ne, b**4 / 12)
+    J = np.full(ne, 0.1406 * b**4)
+
+    # ---- MASS (same lumping as build_model) ----
+    if floor_mass_kg is None:
+        floor_mass_kg = {f: MASS_FLOOR_KG for f in MASS_FLOORS}
+        floor_mass_kg[int(floor.max())] = MASS_ROOF_KG
+    mass = np.zeros(len(node_ids))
+    for f, kg in floor_mass_kg.items():
+        sel = floor == f
+        if sel.any():
+            mass[sel] += kg / 1000 / sel.sum()
+    mass += self_kg / 1000 / len(node_ids)
+
+    return FrameModel(
+        version=version, node_ids=node_ids, xyz=xyz, floor=floor, tower=tower,
+        elem_ids=conn_df['element_id'].to_numpy(dtype=int), ei=ei, ej=ej,
+        etype=etype, truss=np.isin(etype, list(pin_types)),
+        E=np.full(ne, float(E)), G=np.full(ne, float(G)),
+        A=A, Iy=Iz.copy(), Iz=Iz, J=J, mass=mass, fixed=floor == 0)
+
+
+def load_model(version='v10', calibrated=False, **kwargs):
+    """
+    Load data/twin_*_matrix_<version>.csv into a FrameModel; with
+    calibrated=True the version's entry of CALIBRATION_FILE is applied
+    (nominal properties if there is none).
+
+    Calibration is opt-in. It is read by static_checks.py and
+    frequency_response.py (--calibrated), full_analysis_v10.build_model
+    (--calibrated / CALIBRATED, OpenSees) and analysis_service.py
+    (calibrated=1). Everything else stays nominal: config.py constants,
+    uncertainty.py (samples E around nominal), the Tcl time histories
+    and the joint demand / damage / fragility chain under
+    analysis/torsional_irregularity.
+    """
+    pos_file, conn_file = model_files(version)
+    model = from_frames(pd.read_csv(pos_file), pd.read_csv(conn_file),
+                        version=version, **kwargs)
+    if calibrated:
+        factors = load_calibration(version)
+        if factors:
+            apply_calibration(model, factors)
+    return model
+
+
+def load_calibration(version='v10'):
+    """Calibrated property factors of a version ({} if not calibrated)."""
+    if not CALIBRATION_FILE.exists():
+        return {}
+    entry = json.loads(CALIBRATION_FILE.read_text()).get(version or 'base', {})
+    return {k: float(entry[k]) for k in CALIBRATION_KEYS if k in entry}
+
+
+def apply_calibration(model, factors):
+    """
+    Scale model properties in place by calibration factors: E_factor on
+    E and G, joint_factor on frame-member Iy/Iz, brace_factor on truss
+    E, mass_factor on the lumped masses. Areas (and so member weight)
+    are unchanged.
+    """
+    e = factors.get('E_factor', 1.0)
+    frame = ~model.truss
+    model.E = model.E * np.where(model.truss, e * factors.get('brace_factor', 1.0), e)
+    model.G = model.G * e
+    model.Iy = np.where(frame, model.Iy * factors.get('joint_factor', 1.0), model.Iy)
+    model.Iz = np.where(frame, model.Iz * factors.get('joint_factor', 1.0), model.Iz)
+    model.mass = model.mass * factors.get('mass_factor', 1.0)
+    model.cache.clear()
+    return model
+
+
+# ============================================================
+# ELEMENT MATRICES
+# ============================================================
+
+def rotation(model):
+    """(ne, 3, 3) direction-cosine matrices, rows = local x, y, z."""
+    d = model.xyz[model.ej] - model.xyz[model.ei]
+    L = np.linalg.norm(d, axis=1)
+    ex = d / L[:, None]
+
+    # vecxz as in build_model(): vertical/inclined -> (0,1,0);
+    # horizontal -> (0,1,0) if dx > dy else (1,0,0)
+    adx, ady, adz = np.abs(d).T
+    horiz = adz < 0.1 * np.maximum(np.maximum(adx, ady), 1e-9)
+    vecxz = np.tile([0.0, 1.0, 0.0], (len(L), 1))
+    vecxz[horiz & ~(adx > ady)] = [1.0, 0.0, 0.0]
+
+    ey = np.cross(vecxz, ex)
+    n = np.linalg.norm(ey, axis=1)
+    bad = n < 1e-8          # vecxz parallel to the member: any normal will do
+    if bad.any():
+        ey[bad] = np.cross([0.0, 0.0, 1.0], ex[bad])
+        still = np.linalg.norm(ey[bad], axis=1) < 1e-8
+        ey[np.flatnonzero(bad)[still]] = np.cross([1.0, 0.0, 0.0], ex[bad][still])
+        n = np.linalg.norm(ey, axis=1)
+    ey /= n[:, None]
+    ez = np.cross(ex, ey)
+    return np.stack([ex, ey, ez], axis=1)
+
+
+def local_stiffness(L, EA, EIy, EIz, GJ):
+    """Batched 12×12 local frame stiffness (no shear deformation)."""
+    ne = len(L)
+    k = np.zeros((ne, 12, 12))
+    a, t = EA / L, GJ / L
+    k[:, 0, 0] = k[:, 6, 6] = a
+    k[:, 0, 6] = k[:, 6, 0] = -a
+    k[:, 3, 3] = k[:, 9, 9] = t
+    k[:, 3, 9] = k[:, 9, 3] = -t
+
+    # bending in local x-y (Iz): uy(1), rz(5), uy(7), rz(11)
+    c1, c2, c3, c4 = 12 * EIz / L**3, 6 * EIz / L**2, 4 * EIz / L, 2 * EIz / L
+    for (p, q), v in {(1, 1): c1, (7, 7): c1, (1, 7): -c1,
+                      (1, 5): c2, (1, 11): c2, (5, 7): -c2, (7, 11): -c2,
+                      (5, 5): c3, (11, 11): c3, (5, 11): c4}.items():
+        k[:, p, q] = k[:, q, p] = v
+
+    # bending in local x-z (Iy): uz(2), ry(4), uz(8), ry(10)
+    c1, c2, c3, c4 = 12 * EIy / L**3, 6 * EIy / L**2, 4 * EIy / L, 2 * EIy / L
+    for (p, q), v in {(2, 2): c1, (8, 8): c1, (2, 8): -c1,
+                      (2, 4): -c2, (2, 10): -c2, (4, 8): c2, (8, 10): c2,
+                      (4, 4): c3, (10, 10): c3, (4, 10): c4}.items():
+        k[:, p, q] = k[:, q, p] = v
+    return k
+
+
+def transformation(model):
+    """(ne, 12, 12) block-diagonal local<-global transformation."""
+    R = rotation(model)
+    T = np.zeros((model.n_elem, 12, 12))
+    for b in range(4):
+        T[:, 3 * b:3 * b + 3, 3 * b:3 * b + 3] = R
+    return T
+
+
+def element_stiffness(model, EA=None, EIy=None, EIz=None, GJ=None):
+    """
+    Global-axis element stiffness matrices, (ne, 12, 12).
+
+    Rigidities default to the model's E·A, E·Iy, E·Iz, G·J; trusses keep
+    only E·A. Passing unit/zero rigidities gives the per-property
+    derivative matrices used by the sensitivity tools.
+    """
+    m = model
+    EA = m.E * m.A if EA is None else EA
+    EIy = np.where(m.truss, 0.0, m.E * m.Iy) if EIy is None else EIy
+    EIz = np.where(m.truss, 0.0, m.E * m.Iz) if EIz is None else EIz
+    GJ = np.where(m.truss, 0.0, m.G * m.J) if GJ is None else GJ
+    T = m.cache.get('T')
+    if T is None:
+        T = m.cache['T'] = transformation(m)
+    kl = local_stiffness(m.length, EA, EIy, EIz, GJ)
+    return np.einsum('eji,ejk,ekl->eil', T, kl, T, optimize=True)
+
+
+def assemble(model, ke, factors=None):
+    """Scatter (ne, 12, 12) element matrices (× factors) into full CSR."""
+    dofs = model.elem_dofs
+    vals = ke if factors is None else ke * np.asarray(factors)[:, None, None]
+    rows = np.repeat(dofs, 12, axis=1).ravel()
+    cols = np.tile(dofs, (1, 12)).ravel()
+    n = model.ndof
+    return sparse.csr_matrix((vals.ravel(), (rows, cols)), shape=(n, n))
+
+
+def mass_diagonal(model):
+    """Full lumped mass diagonal (translational DOFs only)."""
+    md = np.zeros(model.ndof)
+    for d in range(3):
+        md[d::NDF] = model.mass
+    return md
+
+
+def free_dofs(model, K_full=None):
+    """Unrestrained DOFs that carry stiffness."""
+    if 'free' in model.cache:
+        return model.cache['free']
+    if K_full is None:
+        K_full = assemble(model, element_stiffness(model))
+    fixed = np.repeat(model.fixed, NDF)
+    diag = np.abs(K_full.diagonal())
+    free = np.flatnonzero(~fixed & (diag > 1e-12 * diag.max()))
+    model.cache['free'] = free
+    return free
+
+
+def system_matrices(model, factors=None):
+    """Reduced (K, M-diagonal, free-DOF index) for the current properties."""
+    ke = element_stiffness(model)
+    K_full = assemble(model, ke, factors)
+    free = free_dofs(model, K_full if factors is None else None)
+    K = K_full[free][:, free].tocsc()
+    return K, mass_diagonal(model)[free], free
+
+
+# ============================================================
+# MODAL ANALYSIS
+# ============================================================
+
+def influence_vectors(model, free):
+    """Rigid-body ground-motion influence vectors r_X, r_Y (free DOFs)."""
+    r = np.zeros((len(free), 2))
+    r[:, 0] = (free % NDF) == 0
+    r[:, 1] = (free % NDF) == 1
+    return r
+
+
+def banded_inverse(K, max_bytes=256e6):
+    """
+    K⁻¹ as a LinearOperator from a banded Cholesky factor after reverse
+    Cuthill–McKee reordering — for the tower models about half the fill
+    and solve time of the default SuperLU shift-invert. Several right-hand
+    sides (op.matmat / op @ B) share one banded solve call. Returns None
+    if the band would exceed max_bytes or K is not positive definite.
+    """
+    K = sparse.csr_matrix(K)
+    n = K.shape[0]
+    p = reverse_cuthill_mckee(K, symmetric_mode=True)
+    Kp = K[p][:, p].tocoo()
+    up = Kp.row <= Kp.col
+    bw = int((Kp.col - Kp.row)[up].max(initial=0))
+    if (bw + 1) * n * 8 > max_bytes:
+        return None
+    ab = np.zeros((bw + 1, n))
+    ab[bw + Kp.row[up] - Kp.col[up], Kp.col[up]] = Kp.data[up]
+    try:
+        c = cholesky_banded(ab, check_finite=False)
+    except LinAlgError:
+        return None
+
+    def solve(b):
+        b = np.asarray(b)
+        x = np.empty(b.shape)
+        x[p] = cho_solve_banded((c, False), b[p], check_finite=False)
+        return x
+    op = LinearOperator((n, n), matvec=solve, matmat=solve, dtype=float)
+    op.factor_bytes = c.nbytes
+    return op
+
+
+def modal(model, n_modes=12, K=None, m_diag=None, free=None, OPinv=None):
+    """
+    Generalized eigen solution K φ = ω² M φ (shift-invert, σ = 0, through
+    banded_inverse when the band fits, or a caller's K⁻¹ operator).
+
+    Returns dict: omega, T, phi (n_free, n_modes; mass-normalized),
+    free, gamma (n_modes, 2: X, Y participation) and mass_ratio
+    (effective modal mass / total mass, X and Y).
+    """
+    if K is None:
+        K, m_diag, free = system_matrices(model)
+    M = sparse.diags(m_diag).tocsc()
+    lam, phi = eigsh(K, k=n_modes, M=M, sigma=0.0, which='LM',
+                     OPinv=banded_inverse(K) if OPinv is None else OPinv)
+    order = np.argsort(lam)
+    lam, phi = lam[order], phi[:, order]
+    phi /= np.sqrt(np.einsum('ij,i,ij->j', phi, m_diag, phi))
+
+    r = influence_vectors(model, free)
+    gamma = phi.T @ (m_diag[:, None] * r)           # φᵀ M r  (mass-normalized)
+    m_tot = (m_diag[:, None] * r).sum(axis=0)
+    omega = np.sqrt(np.abs(lam))
+    return {
+        'omega': omega,
+        'T': 2 * np.pi / omega,
+        'phi': phi,
+        'free': free,
+        'm_diag': m_diag,
+        'gamma': gamma,
+        'mass_ratio': gamma**2 / m_tot,
+    }
+
+
+def rayleigh_coeffs(omega_a, omega_b, xi):
+    """Mass/stiffness-proportional coefficients giving ξ at ω_a and ω_b."""
+    a0 = 2 * xi * omega_a * omega_b / (omega_a + omega_b)
+    a1 = 2 * xi / (omega_a + omega_b)
+    return a0, a1
+
+
+def rayleigh_modal_damping(omega, a0, a1):
+    """Modal damping ratios implied by C = a0·M + a1·K."""
+    return a0 / (2 * omega) + a1 * omega / 2
+
+
+def floor_operator(model, free, dof=0, nodes_by_floor=None):
+    """
+    Sparse (n_floors, n_free) operator averaging one translational DOF
+    over the nodes of each floor (both towers).
+    """
+    floors = model.floors if nodes_by_floor is None else list(nodes_by_floor)
+    pos = pd.Series(np.arange(len(free)), index=free)
+    rows, cols = [], []
+    for r, f in enumerate(floors):
+        nodes = (model.floor_nodes(f) if nodes_by_floor is None
+                 else nodes_by_floor[f])
+        g = nodes * NDF + dof
+        g = g[np.isin(g, free)]
+        rows.append(np.full(len(g), r))
+        cols.append(pos.loc[g].to_numpy())
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    counts = np.bincount(rows, minlength=len(floors)).astype(float)
+    vals = 1.0 / counts[rows]
+    return sparse.csr_matrix((vals, (rows, cols)), shape=(len(floors), len(free)))
@@ -0,0 +1,241 @@
+"""
+FREQUENCY-DOMAIN RESPONSE ENGINE (LINEAR MODELS)
+================================================
+For the elastic balsa model every record response is a convolution, so
+instead of one transient run per record:
+
+1) build the frequency response function (FRF) of the chosen outputs
+   once per model — from modal data (φ, Γ, ω, ξ) or directly from
+   reduced K, M, C matrices
+2) for any batch of records: rfft → multiply by the FRF → irfft
+
+Records are zero-padded by a free-vibration tail ln(1/tol)/(ξ1·ω1) so
+the circular convolution does not wrap the response of the end of the
+record back onto its start. Damping may be modal (ξ per mode) or
+Rayleigh (C = a0·M + a1·K, classical — exact in modal coordinates).
+
+Outputs are relative displacement of floor averages (X or Y); absolute
+acceleration is obtained by adding the ground acceleration back.
+
+Usage:
+    python scripts/frequency_response.py [version] [--calibrated]    # KYH1-3, X & Y
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+import time as timer
+from pathlib import Path
+from scipy import fft
+
+import frame_model as fm
+from ground_motion_im import load_dask_record
+
+ROOT = Path(__file__).parent.parent
+GM_DASK = ROOT / 'ground_motion_dask'
+RESULTS = ROOT / 'results'
+
+G = 9.81
+
+
+# ============================================================
+# FREQUENCY RESPONSE FUNCTIONS
+# ============================================================
+
+def padded_length(npts, dt, omega1, xi1, tol=1e-3):
+    """FFT length covering the record plus the decay tail of mode 1."""
+    tail = np.log(1.0 / tol) / (xi1 * omega1)
+    return fft.next_fast_len(npts + int(np.ceil(tail / dt)), real=True)
+
+
+def modal_frf(omega_n, xi_n, omega):
+    """Modal receptances H_n(ω) = 1 / (ω_n² − ω² + 2iξ_nω_nω), (n_modes, nf)."""
+    w = np.asarray(omega)[None, :]
+    wn = np.asarray(omega_n)[:, None]
+    return 1.0 / (wn**2 - w**2 + 2j * np.asarray(xi_n)[:, None] * wn * w)
+
+
+def modal_transfer(phi_out, gamma, omega_n, xi_n, omega):
+    """
+    Transfer from ground acceleration to output relative displacement.
+
+    phi_out: (n_out, n_modes) output operator applied to mode shapes,
+    gamma: (n_modes,) participation for the excitation direction.
+    u_out(ω) = −Σ φ_out,n Γ_n H_n(ω) · a_g(ω).  Returns (n_out, nf).
+    """
+    H = modal_frf(omega_n, xi_n, omega)
+    return -(phi_out * gamma[None, :]) @ H
+
+
+def direct_transfer(K, M, C, r, out, omega, chunk=64):
+    """
+    Transfer from reduced (dense) K, M, C matrices:
+    (K − ω²M + iωC) u = −M r a_g,  output = out @ u.  Returns (n_out, nf).
+    """
+    K, M, C = (np.asarray(X, dtype=float) for X in (K, M, C))
+    rhs = -(M @ r)
+    out = np.atleast_2d(out)
+    tf = np.empty((out.shape[0], len(omega)), dtype=complex)
+    for s in range(0, len(omega), chunk):
+        w = np.asarray(omega[s:s + chunk])[:, None, None]
+        D = K[None] - w**2 * M[None] + 1j * w * C[None]
+        u = np.linalg.solve(D, np.broadcast_to(rhs, (len(w), len(rhs)))[..., None])
+        tf[:, s:s + chunk] = out @ u[..., 0].T
+    return tf
+
+
+# ============================================================
+# BATCH RESPONSE
+# ============================================================
+
+def batch_response(acc, dt, transfer_fn, nfft, keep_history=False,
+                   max_bytes=256e6):
+    """
+    Responses of many records through one FRF.
+
+    acc: (n_rec, npts) ground acceleration (m/s²). transfer_fn(omega)
+    returns the (n_out, nf) transfer, evaluated once here. Records are
+    processed in chunks bounded by max_bytes. Returns dict with 'peak'
+    (n_rec, n_out) and, if requested, 'history' (n_rec, n_out, npts).
+    """
+    acc = np.atleast_2d(acc)
+    n_rec, npts = acc.shape
+    omega = 2 * np.pi * fft.rfftfreq(nfft, dt)
+    tf = transfer_fn(omega)
+    n_out = tf.shape[0]
+
+    per_rec = n_out * nfft * 16
+    c = max(1, int(max_bytes // per_rec))
+    peak = np.empty((n_rec, n_out))
+    hist = np.empty((n_rec, n_out, npts)) if keep_history else None
+
+    for s in range(0, n_rec, c):
+        A = fft.rfft(acc[s:s + c], n=nfft, axis=-1, workers=-1)     # (c, nf)
+        U = fft.irfft(A[:, None, :] * tf[None], n=nfft, axis=-1, workers=-1)
+        peak[s:s + c] = np.abs(U).max(axis=-1)
+        if keep_history:
+            hist[s:s + c] = U[..., :npts]
+    return {'peak': peak, 'history': hist}
+
+
+class ModalEngine:
+    """
+    Modal FRF engine for one FrameModel: eigen solve once, then
+    screen any number of records per direction.
+    """
+
+    def __init__(self, model, n_modes=24, xi=0.05, rayleigh=None, modes=None):
+        self.model = model
+        self.modes = fm.modal(model, n_modes) if modes is None else modes
+        om = self.modes['omega']
+        if rayleigh is not None:
+            a0, a1 = rayleigh
+            self.xi = fm.rayleigh_modal_damping(om, a0, a1)
+        else:
+            self.xi = np.broadcast_to(np.asarray(xi, dtype=float), om.shape).copy()
+
+        free = self.modes['free']
+        self.floors = model.floors
+        self.ops = {d: fm.floor_operator(model, free, dof=k)
+                    for k, d in enumerate('XY')}
+        self.dz = np.diff(np.array([model.xyz[model.floor_nodes(f), 2].mean()
+                                    for f in self.floors]))
+
+    def transfer(self, direction='X'):
+        """Floor-average relative displacement transfer for one direction."""
+        k = 'XY'.index(direction)
+        phi_out = self.ops[direction] @ self.modes['phi']
+        gamma = self.modes['gamma'][:, k]
+        om, xi = self.modes['omega'], self.xi
+        return lambda w: modal_transfer(phi_out, gamma, om, xi, w)
+
+    def drift_transfer(self, direction='X'):
+        """Interstory drift-ratio transfer (floor f relative to f−1)."""
+        base = self.transfer(direction)
+        dz = self.dz[:, None]
+        return lambda w: np.diff(base(w), axis=0) / dz
+
+    def run(self, acc_g, dt, direction='X', keep_history=False,
+            min_mass_ratio=1e-5, max_bytes=256e6):
+        """
+        Peak floor displacements [m] and drift ratios for stacked records.
+
+        Only the modal coordinates of modes with effective mass ratio
+        ≥ min_mass_ratio in this direction go through the inverse FFT;
+        floor displacements and drifts are then one matrix product each.
+        """
+        acc = np.atleast_2d(acc_g) * G
+        n_rec, npts = acc.shape
+        k = 'XY'.index(direction)
+        sel = self.modes['mass_ratio'][:, k] >= min_mass_ratio
+        om, xi = self.modes['omega'][sel], self.xi[sel]
+        nfft = padded_length(npts, dt, self.modes['omega'][0], self.xi[0])
+        w = 2 * np.pi * fft.rfftfreq(nfft, dt)
+        Hq = -self.modes['gamma'][sel, k, None] * modal_frf(om, xi, w)
+
+        phi_out = self.ops[direction] @ self.modes['phi'][:, sel]   # (n_fl, n_sel)
+        phi_drift = np.diff(phi_out, axis=0) / self.dz[:, None]
+
+        c = max(1, int(max_bytes // (len(om) * nfft * 16)))
+        disp = np.empty((n_rec, phi_out.shape[0]))
+        drift = np.empty((n_rec, phi_drift.shape[0]))
+        hist = np.empty((n_rec, phi_out.shape[0], npts)) if keep_history else None
+        for s in range(0, n_rec, c):
+            A = fft.rfft(acc[s:s + c], n=nfft, axis=-1, workers=-1)
+            q = fft.irfft(A[:, None, :] * Hq[None], n=nfft, axis=-1,
+                          workers=-1)[..., :npts]                   # (c, n_modes, npts)
+            u = np.matmul(phi_out, q)
+            disp[s:s + c] = np.abs(u).max(axis=-1)
+            drift[s:s + c] = np.abs(np.matmul(phi_drift, q)).max(axis=-1)
+            if keep_history:
+                hist[s:s + c] = u
+        return {'disp': disp, 'drift': drift, 'history': hist, 'nfft': nfft}
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    t0 = timer.time()
+    model = fm.load_model(version, calibrated='--calibrated' in args)
+    eng = ModalEngine(model, n_modes=24)
+    print(f"Model {version}: {model.n_nodes} nodes, {model.n_elem} elements, "
+          f"T1={eng.modes['T'][0]:.4f}s  (setup {timer.time()-t0:.2f}s)")
+
+    names, recs = [], []
+    for k in (1, 2, 3):
+        fp = GM_DASK / f'KYH{k}.txt'
+        if fp.exists():
+            _, a, dt = load_dask_record(fp)
+            names.append(f'KYH{k}')
+            recs.append(a)
+    if not recs:
+        print("  No records found")
+        return
+    n = min(len(r) for r in recs)
+    acc = np.stack([r[:n] for r in recs])
+
+    rows = []
+    for d in 'XY':
+        t1 = timer.time()
+        res = eng.run(acc, dt, direction=d)
+        el = timer.time() - t1
+        for i, nm in enumerate(names):
+            j = int(np.argmax(res['drift'][i]))
+            rows.append({'case': f'{nm}_{d}',
+                         'u_roof_cm': res['disp'][i, -1] * 100,
+                         'max_drift_pct': res['drift'][i, j] * 100,
+                         'max_drift_floor': int(eng.floors[j + 1])})
+        print(f"  {d}: {len(names)} records in {el*1000:.0f} ms (nfft={res['nfft']})")
+
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    RESULTS.mkdir(exist_ok=True)
+    df.to_csv(RESULTS / f'frf_screening_{version}.csv', index=False)
+
+
+if __name__ == "__main__":
+    main()
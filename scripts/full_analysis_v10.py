@@ -6,6 +6,10 @@ DASK 2026 - V10 FULL ANALYSIS SUITE
 3) BOL090 time-history analysis (ZTAH) in X and Y
 4) Pushover analysis in X and Y
 
+With --calibrated (or CALIBRATED = True) the V10 factors fitted by
+stiffness_calibration.py (data/model_calibration.json) scale E, G,
+frame I, brace E and the lumped masses.
+
 Units throughout: m, kN, tonne, s
 Stress output: MPa
 Displacement output: cm
@@ -20,7 +24,12 @@ import sys
 import json
 import time as timer
 from collections import defaultdict
-import openseespy.opensees as ops
+from frame_model import load_calibration
+from ground_motion_im import trim_record
+from lazy_imports import lazy_module
+from topology_check import check_model
+
+ops = lazy_module('openseespy.opensees')
 
 # ============================================================
 # PATHS
@@ -30,7 +39,13 @@ DATA = ROOT / 'data'
 GM_DASK = ROOT / 'ground_motion_dask'
 GM_BOL = ROOT / 'ground_motion'
 RESULTS = ROOT / 'results'
-RESULTS.mkdir(exist_ok=True)
+
+# Duration-trimmed mode: integrate only the significant (Husid) window
+# plus a free-vibration tail; peaks are checked to stay within TRIM_TOL.
+DURATION_TRIM = False
+# Apply the stored V10 calibration factors in build_model()
+CALIBRATED = False
+TRIM_TOL = 0.02
 
 # ============================================================
 # 0) HELPER FUNCTIONS
@@ -75,14 +90,18 @@ def parse_at2(filepath):
     t = np.arange(npts) * dt
     return t, a, dt
 
-def build_model():
-    """Build V10 OpenSees model. Returns pos_df, conn_df, node_map, elem_info, etc."""
+def build_model(calibrated=None):
+    """
+    Build V10 OpenSees model. Returns pos_df, conn_df, node_map, elem_info, etc.
+    calibrated: apply load_calibration('v10') factors (default CALIBRATED).
+    """
     pos_df = pd.read_csv(DATA / 'twin_position_matrix_v10.csv')
     conn_df = pd.read_csv(DATA / 'twin_connectivity_matrix_v10.csv')
     pos_df['node_id'] = pos_df['node_id'].astype(int)
     conn_df['node_i'] = conn_df['node_i'].astype(int)
     conn_df['node_j'] = conn_df['node_j'].astype(int)
     conn_df['element_id'] = conn_df['element_id'].astype(int)
+    check_model(pos_df, conn_df, 'V10')
 
     S = 0.01
     E_long = 3.5e6    # kPa
@@ -91,6 +110,14 @@ def build_model():
     A = b_sec**2
     Iz = b_sec**4 / 12
     J = 0.1406 * b_sec**4
+    Iz_frame, E_brace, f_mass = Iz, E_long, 1.0
+    cal = load_calibration('v10') if (CALIBRATED if calibrated is None else calibrated) else {}
+    if cal:
+        e = cal.get('E_factor', 1.0)
+        E_long, G_balsa = E_long * e, G_balsa * e
+        E_brace = E_long * cal.get('brace_factor', 1.0)
+        Iz_frame = Iz * cal.get('joint_factor', 1.0)
+        f_mass = cal.get('mass_factor', 1.0)
 
     ops.wipe()
     ops.model('basic', '-ndm', 3, '-ndf', 6)
@@ -109,7 +136,7 @@ def build_model():
     ops.geomTransf('Linear', 1, 0, 1, 0)
     ops.geomTransf('Linear', 2, 1, 0, 0)
     ops.geomTransf('Linear', 3, 0, 1, 0)
-    ops.uniaxialMaterial('Elastic', 100, E_long)
+    ops.uniaxialMaterial('Elastic', 100, E_brace)
 
     pin_types = {'brace_xz', 'brace_yz', 'floor_brace',
                  'bridge_truss', 'bridge_brace_bot', 'bridge_brace_top'}
@@ -130,7 +157,7 @@ def build_model():
             if dz < 0.1 * max(dx, dy, 1e-9):
                 t = 1 if dx > dy else 2
             ops.element('elasticBeamColumn', eid, ni, nj,
-                        A, E_long, G_balsa, J, Iz, Iz, t)
+                        A, E_long, G_balsa, J, Iz_frame, Iz_frame, t)
             elem_info[eid] = (et, ni, nj, False)
 
     # ---- MASS ----
@@ -154,6 +181,8 @@ def build_model():
     for nid in all_nodes:
         node_mass[nid] += ms
 
+    for nid in node_mass:
+        node_mass[nid] *= f_mass
     for nid, m in node_mass.items():
         ops.mass(nid, m, m, m, 0.0, 0.0, 0.0)
 
@@ -179,6 +208,39 @@ def run_modal(num_modes=12):
     return periods
 
 
+def apply_gravity(node_mass, n_steps=10):
+    """Self-weight (m·g, −Z) as nodal loads, static solve, then held constant."""
+    ops.timeSeries('Linear', 100)
+    ops.pattern('Plain', 100, 100)
+    for nid, m in node_mass.items():
+        ops.load(nid, 0.0, 0.0, -m * 9.81, 0.0, 0.0, 0.0)
+    ops.constraints('Transformation')
+    ops.numberer('RCM')
+    ops.system('BandGeneral')
+    ops.test('NormDispIncr', 1e-8, 50)
+    ops.algorithm('Newton')
+    ops.integrator('LoadControl', 1.0 / n_steps)
+    ops.analysis('Static')
+    ok = ops.analyze(n_steps)
+    ops.loadConst('-time', 0.0)
+    ops.wipeAnalysis()
+    return ok
+
+
+def prepare_model(num_modes=6, gravity=False):
+    """
+    Build the model, optionally apply gravity, run eigen; returns the state
+    run_time_history / run_pushover need. The OpenSees domain is left
+    ready for a load pattern (fork_server.py forks from this point).
+    """
+    (pos_df, _, nm, _, bn, _, nmass, _, _, fn, fz) = build_model()
+    if gravity and apply_gravity(nmass) != 0:
+        raise RuntimeError("gravity analysis failed")
+    return {'pos_df': pos_df, 'node_map': nm, 'base_nodes': bn, 'node_mass': nmass,
+            'floor_nodes': fn, 'floor_z': fz, 'periods': run_modal(num_modes),
+            'gravity': gravity}
+
+
 def get_roof_nodes(pos_df):
     """Get top-floor node IDs."""
     tf = int(pos_df['floor'].max())
@@ -213,68 +275,44 @@ def interstory_drift(floor_disp, floor_z):
     return drift
 
 
-# ============================================================
-# 1) BUILD MODEL & MODAL
-# ============================================================
-print("=" * 80)
-print("  DASK 2026 - V10 FULL ANALYSIS SUITE")
-print("=" * 80)
-
-t0_global = timer.time()
-
-(pos_df, conn_df, node_map, elem_info, base_nodes,
- all_nodes, node_mass, total_mass, floors, floor_nodes, floor_z) = build_model()
-
-print(f"\nModel built: {len(pos_df)} nodes, {len(conn_df)} elements")
-print(f"Total mass: {total_mass*1000:.2f} kg = {total_mass:.4f} tonne")
-print(f"Floors: {len(floors)}, Height: {max(floor_z.values())*100:.0f} cm")
-
-roof_nodes = get_roof_nodes(pos_df)
-H_total = max(floor_z.values())  # m
-
-# Modal
-periods = run_modal(12)
-print(f"\nModal Analysis:")
-for i in range(min(6, len(periods))):
-    print(f"  Mode {i+1}: T = {periods[i]:.4f} s  ({1/periods[i]:.1f} Hz)")
-
-omega1 = 2*np.pi / periods[0]
-omega2 = 2*np.pi / periods[1] if len(periods) > 1 else omega1*3.5
-
-# Rayleigh damping: xi = 5% at modes 1 and 3.5*omega1
-xi = 0.05
-omega_a = omega1
-omega_b = 3.5 * omega1
-a0 = 2 * xi * omega_a * omega_b / (omega_a + omega_b)
-a1 = 2 * xi / (omega_a + omega_b)
-print(f"\nRayleigh damping: a0={a0:.4f}, a1={a1:.6f}")
-print(f"  omega_a={omega_a:.2f}, omega_b={omega_b:.2f} rad/s")
-
-
 # ============================================================
 # 2) TIME-HISTORY ANALYSIS FUNCTION
 # ============================================================
 
 def run_time_history(gm_name, time_arr, acc_g, dt_gm, direction='X',
-                     integrator_dt=0.001, xi_val=0.05):
+                     integrator_dt=0.001, xi_val=0.05, trim=None, state=None):
     """
     Run Newmark time-history analysis.
     acc_g: acceleration in g units
     direction: 'X' (DOF 1) or 'Y' (DOF 2)
+    trim: integrate only the significant window (default DURATION_TRIM)
+    state: prepare_model() output whose domain is still pristine (default:
+    rebuild the model)
     Returns dict with roof displacement/acceleration/velocity time histories
     and peak interstory drift profile.
     """
-    # Rebuild model fresh
-    (_, _, _, _, _, _, _, _, _, fn, fz) = build_model()
+    trim = DURATION_TRIM if trim is None else trim
+    # Rebuild model fresh (modal for Rayleigh)
+    state = state or prepare_model(6)
+    pos_df, fn, fz, pds = (state[k] for k in ('pos_df', 'floor_nodes', 'floor_z', 'periods'))
     roof_nds = get_roof_nodes(pos_df)
-
-    # Modal for Rayleigh
-    pds = run_modal(6)
     om1 = 2*np.pi / pds[0]
     om_b = 3.5 * om1
     r_a0 = 2*xi_val*om1*om_b/(om1+om_b)
     r_a1 = 2*xi_val/(om1+om_b)
 
+    # Duration trim: the PGA and amp_factor stay based on the full record
+    pga = np.max(np.abs(acc_g))
+    t_offset = 0.0
+    trim_info = None
+    if trim:
+        acc_g, t_offset, trim_info = trim_record(acc_g, dt_gm, pds[0],
+                                                 xi=xi_val, tol=TRIM_TOL)
+        time_arr = np.arange(len(acc_g)) * dt_gm
+        print(f"    Trimmed to {trim_info['t_start']:.2f}-{trim_info['t_end']:.2f}s "
+              f"({trim_info['step_ratio']*100:.0f}% of steps, "
+              f"SDOF peak error {trim_info['peak_error']*100:.2f}%)")
+
     # Convert acc from g to m/s^2
     acc_ms2 = acc_g * 9.81
 
@@ -335,7 +373,7 @@ def run_time_history(gm_name, time_arr, acc_g, dt_gm, direction='X',
         step_count += 1
 
         if step_count % record_interval == 0:
-            t_hist.append(ct)
+            t_hist.append(ct + t_offset)
             u_roof_hist.append(ops.nodeDisp(ref_node, dof))
             v_roof_hist.append(ops.nodeVel(ref_node, dof))
             a_roof_hist.append(ops.nodeAccel(ref_node, dof))
@@ -382,7 +420,6 @@ def run_time_history(gm_name, time_arr, acc_g, dt_gm, direction='X',
     max_drift_floor = max(drift, key=drift.get) if drift else 0
     max_drift_val = max(drift.values()) if drift else 0
 
-    pga = np.max(np.abs(acc_g))
     amp_factor = (a_max / 9.81) / pga if pga > 0 else 0
 
     result = {
@@ -402,6 +439,7 @@ def run_time_history(gm_name, time_arr, acc_g, dt_gm, direction='X',
         'a_roof_g': (a_roof / 9.81).tolist(),
         'status': 'OK' if ok == 0 else 'FAILED',
         'elapsed_s': float(elapsed),
+        'trim': trim_info,
     }
 
     return result
@@ -411,14 +449,17 @@ def run_time_history(gm_name, time_arr, acc_g, dt_gm, direction='X',
 # 3) PUSHOVER ANALYSIS FUNCTION
 # ============================================================
 
-def run_pushover(direction='X', target_drift_pct=5.0, n_steps=500):
+def run_pushover(direction='X', target_drift_pct=5.0, n_steps=500, state=None):
     """
     Displacement-controlled pushover.
     Lateral load: inverted triangular distribution.
     target_drift: fraction of total height.
+    state: prepare_model() output (default: rebuild the model)
     """
-    (_, _, nm, _, bn, an, nmass, tmass, fls, fn, fz) = build_model()
-    _ = run_modal(4)  # just to verify model
+    state = state or prepare_model(4)  # modal just to verify model
+    pos_df, nm, bn, nmass, fz = (state[k] for k in ('pos_df', 'node_map', 'base_nodes',
+                                                    'node_mass', 'floor_z'))
+    H_total = max(fz.values())  # m
 
     dof = 1 if direction == 'X' else 2
     target_disp = target_drift_pct / 100.0 * H_total  # m
@@ -529,171 +570,219 @@ def run_pushover(direction='X', target_drift_pct=5.0, n_steps=500):
     return result
 
 
-# ============================================================
-# 4) RUN ALL ANALYSES
-# ============================================================
-
-all_results = {
-    'modal': {
-        'periods': [float(p) for p in periods[:12]],
-        'omega1': float(omega1),
-        'rayleigh_a0': float(a0),
-        'rayleigh_a1': float(a1),
-        'total_mass_kg': float(total_mass * 1000),
-    },
-    'time_history': {},
-    'pushover': {},
-}
-
-# --- KYH-1/2/3 ---
-print("\n" + "=" * 80)
-print("  KYH-1/2/3 TIME HISTORY ANALYSES")
-print("=" * 80)
-
-for kyh_num in [1, 2, 3]:
-    gm_file = GM_DASK / f'KYH{kyh_num}.txt'
-    if not gm_file.exists():
-        print(f"  WARNING: {gm_file} not found, skipping")
-        continue
-
-    t_gm, a_gm, dt_gm = parse_dask_gm(gm_file)
-    pga = np.max(np.abs(a_gm))
-    print(f"\n  KYH-{kyh_num}: {len(a_gm)} points, dt={dt_gm:.5f}s, "
-          f"duration={t_gm[-1]:.1f}s, PGA={pga:.4f}g")
-
-    for dire in ['X', 'Y']:
-        key = f"KYH{kyh_num}_{dire}"
-        res = run_time_history(f"KYH{kyh_num}", t_gm, a_gm, dt_gm,
-                               direction=dire, integrator_dt=0.0005)
-        all_results['time_history'][key] = res
-        print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
-              f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
-
-
-# --- BOL090 ---
-print("\n" + "=" * 80)
-print("  BOL090 (Düzce 1999) TIME HISTORY ANALYSIS")
-print("=" * 80)
-
-bol_file = GM_BOL / 'BOL090.AT2'
-if bol_file.exists():
-    t_bol, a_bol, dt_bol = parse_at2(bol_file)
-    pga_bol = np.max(np.abs(a_bol))
-    print(f"  BOL090: {len(a_bol)} points, dt={dt_bol:.4f}s, "
-          f"duration={t_bol[-1]:.1f}s, PGA={pga_bol:.4f}g")
-
-    for dire in ['X', 'Y']:
-        key = f"BOL090_{dire}"
-        res = run_time_history("BOL090", t_bol, a_bol, dt_bol,
-                               direction=dire, integrator_dt=0.001)
-        all_results['time_history'][key] = res
-        print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
-              f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
-else:
-    print(f"  WARNING: {bol_file} not found")
-
-
-# --- BOL090 scaled 1:50 ---
-bol_scaled_file = GM_BOL / 'BOL090_scaled_1_50.AT2'
-if bol_scaled_file.exists():
-    t_bols, a_bols, dt_bols = parse_at2(bol_scaled_file)
-    pga_bols = np.max(np.abs(a_bols))
-    print(f"\n  BOL090 (1:50 scaled): PGA={pga_bols:.4f}g")
-
-    for dire in ['X', 'Y']:
-        key = f"BOL090_scaled_{dire}"
-        res = run_time_history("BOL090_scaled", t_bols, a_bols, dt_bols,
-                               direction=dire, integrator_dt=0.001)
-        all_results['time_history'][key] = res
-        print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
-              f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
-
-
-# --- PUSHOVER ---
-print("\n" + "=" * 80)
-print("  PUSHOVER ANALYSIS")
-print("=" * 80)
-
-for dire in ['X', 'Y']:
-    res = run_pushover(direction=dire, target_drift_pct=3.0, n_steps=300)
-    if res:
-        all_results['pushover'][dire] = res
-        print(f"    >> Pushover {dire}: V_base_max={res['v_base_max_N']:.1f}N, "
-              f"u_max={res['u_max_cm']:.2f}cm, k0={res['k_initial_kN_m']:.1f}kN/m")
-
+def main():
+    global CALIBRATED
+    CALIBRATED = CALIBRATED or '--calibrated' in sys.argv[1:]
+    RESULTS.mkdir(exist_ok=True)
+
+    # ============================================================
+    # 1) BUILD MODEL & MODAL
+    # ============================================================
+    print("=" * 80)
+    print("  DASK 2026 - V10 FULL ANALYSIS SUITE")
+    print("=" * 80)
+
+    t0_global = timer.time()
+
+    (pos_df, conn_df, node_map, elem_info, base_nodes,
+     all_nodes, node_mass, total_mass, floors, floor_nodes, floor_z) = build_model()
+
+    print(f"\nModel built: {len(pos_df)} nodes, {len(conn_df)} elements"
+          + (f" (calibrated: {load_calibration('v10') or 'no factors stored'})"
+             if CALIBRATED else ""))
+    print(f"Total mass: {total_mass*1000:.2f} kg = {total_mass:.4f} tonne")
+    print(f"Floors: {len(floors)}, Height: {max(floor_z.values())*100:.0f} cm")
+
+    roof_nodes = get_roof_nodes(pos_df)
+    H_total = max(floor_z.values())  # m
+
+    # Modal
+    periods = run_modal(12)
+    print(f"\nModal Analysis:")
+    for i in range(min(6, len(periods))):
+        print(f"  Mode {i+1}: T = {periods[i]:.4f} s  ({1/periods[i]:.1f} Hz)")
+
+    omega1 = 2*np.pi / periods[0]
+    omega2 = 2*np.pi / periods[1] if len(periods) > 1 else omega1*3.5
+
+    # Rayleigh damping: xi = 5% at modes 1 and 3.5*omega1
+    xi = 0.05
+    omega_a = omega1
+    omega_b = 3.5 * omega1
+    a0 = 2 * xi * omega_a * omega_b / (omega_a + omega_b)
+    a1 = 2 * xi / (omega_a + omega_b)
+    print(f"\nRayleigh damping: a0={a0:.4f}, a1={a1:.6f}")
+    print(f"  omega_a={omega_a:.2f}, omega_b={omega_b:.2f} rad/s")
+
+    # ============================================================
+    # 4) RUN ALL ANALYSES
+    # ============================================================
+
+    all_results = {
+        'modal': {
+            'periods': [float(p) for p in periods[:12]],
+            'omega1': float(omega1),
+            'rayleigh_a0': float(a0),
+            'rayleigh_a1': float(a1),
+            'total_mass_kg': float(total_mass * 1000),
+        },
+        'time_history': {},
+        'pushover': {},
+    }
 
-# ============================================================
-# 5) SUMMARY TABLE
-# ============================================================
-print("\n" + "=" * 80)
-print("  RESULTS SUMMARY")
-print("=" * 80)
+    # --- KYH-1/2/3 ---
+    print("\n" + "=" * 80)
+    print("  KYH-1/2/3 TIME HISTORY ANALYSES")
+    print("=" * 80)
+
+    for kyh_num in [1, 2, 3]:
+        gm_file = GM_DASK / f'KYH{kyh_num}.txt'
+        if not gm_file.exists():
+            print(f"  WARNING: {gm_file} not found, skipping")
+            continue
+
+        t_gm, a_gm, dt_gm = parse_dask_gm(gm_file)
+        pga = np.max(np.abs(a_gm))
+        print(f"\n  KYH-{kyh_num}: {len(a_gm)} points, dt={dt_gm:.5f}s, "
+              f"duration={t_gm[-1]:.1f}s, PGA={pga:.4f}g")
+
+        for dire in ['X', 'Y']:
+            key = f"KYH{kyh_num}_{dire}"
+            res = run_time_history(f"KYH{kyh_num}", t_gm, a_gm, dt_gm,
+                                   direction=dire, integrator_dt=0.0005)
+            all_results['time_history'][key] = res
+            print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
+                  f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
+
+
+    # --- BOL090 ---
+    print("\n" + "=" * 80)
+    print("  BOL090 (Düzce 1999) TIME HISTORY ANALYSIS")
+    print("=" * 80)
+
+    bol_file = GM_BOL / 'BOL090.AT2'
+    if bol_file.exists():
+        t_bol, a_bol, dt_bol = parse_at2(bol_file)
+        pga_bol = np.max(np.abs(a_bol))
+        print(f"  BOL090: {len(a_bol)} points, dt={dt_bol:.4f}s, "
+              f"duration={t_bol[-1]:.1f}s, PGA={pga_bol:.4f}g")
+
+        for dire in ['X', 'Y']:
+            key = f"BOL090_{dire}"
+            res = run_time_history("BOL090", t_bol, a_bol, dt_bol,
+                                   direction=dire, integrator_dt=0.001)
+            all_results['time_history'][key] = res
+            print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
+                  f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
+    else:
+        print(f"  WARNING: {bol_file} not found")
 
-print(f"\n{'Analysis':<25} {'PGA(g)':<10} {'u_max(cm)':<12} {'a_max(g)':<12} "
-      f"{'drift(%)':<10} {'floor':<6} {'amp':<8}")
-print("-" * 90)
 
-for key, res in all_results['time_history'].items():
-    print(f"{key:<25} {res['pga_g']:<10.4f} {res['u_max_cm']:<12.4f} "
-          f"{res['a_max_g']:<12.4f} {res['max_drift_pct']:<10.4f} "
-          f"{res['max_drift_floor']:<6} {res['amp_factor']:<8.2f}")
+    # --- BOL090 scaled 1:50 ---
+    bol_scaled_file = GM_BOL / 'BOL090_scaled_1_50.AT2'
+    if bol_scaled_file.exists():
+        t_bols, a_bols, dt_bols = parse_at2(bol_scaled_file)
+        pga_bols = np.max(np.abs(a_bols))
+        print(f"\n  BOL090 (1:50 scaled): PGA={pga_bols:.4f}g")
 
-print("-" * 90)
-for dire, res in all_results['pushover'].items():
-    print(f"Pushover_{dire:<20} {'---':<10} {res['u_max_cm']:<12.2f} "
-          f"{'---':<12} {'---':<10} {'---':<6} {res['v_base_max_N']:.0f}N")
+        for dire in ['X', 'Y']:
+            key = f"BOL090_scaled_{dire}"
+            res = run_time_history("BOL090_scaled", t_bols, a_bols, dt_bols,
+                                   direction=dire, integrator_dt=0.001)
+            all_results['time_history'][key] = res
+            print(f"    >> u_max={res['u_max_cm']:.3f}cm, a_max={res['a_max_g']:.3f}g, "
+                  f"drift={res['max_drift_pct']:.3f}% (floor {res['max_drift_floor']})")
 
-print("-" * 90)
 
-# ============================================================
-# 6) SAVE RESULTS
-# ============================================================
+    # --- PUSHOVER ---
+    print("\n" + "=" * 80)
+    print("  PUSHOVER ANALYSIS")
+    print("=" * 80)
 
-# Save compact JSON (no huge arrays for the summary)
-summary = {}
-for key, res in all_results['time_history'].items():
-    summary[key] = {k: v for k, v in res.items()
-                    if k not in ('time', 'u_roof_cm', 'a_roof_g')}
-summary['pushover'] = {}
-for dire, res in all_results['pushover'].items():
-    summary['pushover'][dire] = {k: v for k, v in res.items()
-                                  if k not in ('disp_cm', 'force_N')}
-summary['modal'] = all_results['modal']
-
-with open(RESULTS / 'full_analysis_v10_summary.json', 'w') as f:
-    json.dump(summary, f, indent=2)
-
-# Save full results (with time histories) as separate JSON
-with open(RESULTS / 'full_analysis_v10_full.json', 'w') as f:
-    json.dump(all_results, f, indent=2)
-
-# Save pushover curves as CSV
-for dire, res in all_results['pushover'].items():
-    po_df = pd.DataFrame({
-        'disp_cm': res['disp_cm'],
-        'force_N': res['force_N'],
-    })
-    po_df.to_csv(RESULTS / f'pushover_{dire}_v10.csv', index=False)
-
-# Save time history envelopes
-th_summary = []
-for key, res in all_results['time_history'].items():
-    th_summary.append({
-        'case': key,
-        'PGA_g': res['pga_g'],
-        'u_max_cm': res['u_max_cm'],
-        'a_max_g': res['a_max_g'],
-        'v_max_cm_s': res['v_max_cm_s'],
-        'max_drift_pct': res['max_drift_pct'],
-        'max_drift_floor': res['max_drift_floor'],
-        'amp_factor': res['amp_factor'],
-        'status': res['status'],
-    })
-pd.DataFrame(th_summary).to_csv(RESULTS / 'time_history_summary_v10.csv', index=False)
-
-total_elapsed = timer.time() - t0_global
-print(f"\nAll results saved to: results/")
-print(f"Total elapsed: {total_elapsed:.0f}s ({total_elapsed/60:.1f}min)")
-print("=" * 80)
-print("  DONE")
-print("=" * 80)
+    for dire in ['X', 'Y']:
+        res = run_pushover(direction=dire, target_drift_pct=3.0, n_steps=300)
+        if res:
+            all_results['pushover'][dire] = res
+            print(f"    >> Pushover {dire}: V_base_max={res['v_base_max_N']:.1f}N, "
+                  f"u_max={res['u_max_cm']:.2f}cm, k0={res['k_initial_kN_m']:.1f}kN/m")
+
+
+    # ============================================================
+    # 5) SUMMARY TABLE
+    # ============================================================
+    print("\n" + "=" * 80)
+    print("  RESULTS SUMMARY")
+    print("=" * 80)
+
+    print(f"\n{'Analysis':<25} {'PGA(g)':<10} {'u_max(cm)':<12} {'a_max(g)':<12} "
+          f"{'drift(%)':<10} {'floor':<6} {'amp':<8}")
+    print("-" * 90)
+
+    for key, res in all_results['time_history'].items():
+        print(f"{key:<25} {res['pga_g']:<10.4f} {res['u_max_cm']:<12.4f} "
+              f"{res['a_max_g']:<12.4f} {res['max_drift_pct']:<10.4f} "
+              f"{res['max_drift_floor']:<6} {res['amp_factor']:<8.2f}")
+
+    print("-" * 90)
+    for dire, res in all_results['pushover'].items():
+        print(f"Pushover_{dire:<20} {'---':<10} {res['u_max_cm']:<12.2f} "
+              f"{'---':<12} {'---':<10} {'---':<6} {res['v_base_max_N']:.0f}N")
+
+    print("-" * 90)
+
+    # ============================================================
+    # 6) SAVE RESULTS
+    # ============================================================
+
+    # Save compact JSON (no huge arrays for the summary)
+    summary = {}
+    for key, res in all_results['time_history'].items():
+        summary[key] = {k: v for k, v in res.items()
+                        if k not in ('time', 'u_roof_cm', 'a_roof_g')}
+    summary['pushover'] = {}
+    for dire, res in all_results['pushover'].items():
+        summary['pushover'][dire] = {k: v for k, v in res.items()
+                                      if k not in ('disp_cm', 'force_N')}
+    summary['modal'] = all_results['modal']
+
+    with open(RESULTS / 'full_analysis_v10_summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    # Save full results (with time histories) as separate JSON
+    with open(RESULTS / 'full_analysis_v10_full.json', 'w') as f:
+        json.dump(all_results, f, indent=2)
+
+    # Save pushover curves as CSV
+    for dire, res in all_results['pushover'].items():
+        po_df = pd.DataFrame({
+            'disp_cm': res['disp_cm'],
+            'force_N': res['force_N'],
+        })
+        po_df.to_csv(RESULTS / f'pushover_{dire}_v10.csv', index=False)
+
+    # Save time history envelopes
+    th_summary = []
+    for key, res in all_results['time_history'].items():
+        th_summary.append({
+            'case': key,
+            'PGA_g': res['pga_g'],
+            'u_max_cm': res['u_max_cm'],
+            'a_max_g': res['a_max_g'],
+            'v_max_cm_s': res['v_max_cm_s'],
+            'max_drift_pct': res['max_drift_pct'],
+            'max_drift_floor': res['max_drift_floor'],
+            'amp_factor': res['amp_factor'],
+            'status': res['status'],
+        })
+    pd.DataFrame(th_summary).to_csv(RESULTS / 'time_history_summary_v10.csv', index=False)
+
+    total_elapsed = timer.time() - t0_global
+    print(f"\nAll results saved to: results/")
+    print(f"Total elapsed: {total_elapsed:.0f}s ({total_elapsed/60:.1f}min)")
+    print("=" * 80)
+    print("  DONE")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+PARAMETRIC TWIN-TOWER GEOMETRY ENGINE
+=====================================
+One vectorized generator behind the regenerate_twin_model*.py /
+create_v10_*.py family. A model variant is a compact spec:
+
+    x            column lines along X (cm, shared by both towers)
+    towers       {tower: column lines along Y}
+    z            {'ground': first story height, 'typical': story height,
+                  'floors': number of levels}
+    beams        interior beam thinning per direction ('x', 'y'): kept on
+                 levels with level % every == offset (default: every
+                 `keep_every` levels), perimeter lines always kept, plus
+                 'keep_bays' / 'keep_lines' / 'skip_bays' exceptions
+    rules        brace / panel rules, applied to both towers
+    bridges      {'x': [x_left, x_right], 'spans': [[f_bot, f_top], ...]}
+
+Rule kinds ('plane'):
+    'xz' / 'yz'  diagonals in the front/back (y = first/last line) or side
+                 (x = first/last line) faces over `spans` [[f_bot, f_top]],
+                 on bays selected by width ('bays', 'skip_bays').
+                 pattern: 'x' both diagonals, '/' or '\\' one diagonal,
+                 'alt' single diagonal alternating with (f_bot + bay).
+    'floor'      horizontal diagonal in every plan bay at `floors`
+    'links'      explicit face members [f_a, line_a, f_b, line_b]
+                 (mega braces, chevrons) on the 'face' plane
+
+Nodes and elements are produced as index arrays (meshgrid/broadcast over
+level × bay × face) and numbered deterministically by one lexsort:
+tower → stage → level → family → face/bay → diagonal. Rules with
+order 'floor' are numbered inside the level sweep (columns, beams,
+braces of one level together); 'block' rules follow the sweep. With
+these keys V9 and V10 reproduce the legacy CSVs byte for byte.
+Every generated model goes through topology_check before it is written.
+
+Usage:
+    python scripts/geometry_engine.py v10            # write data/ CSVs
+    python scripts/geometry_engine.py spec.json v14  # JSON spec -> v14
+    python scripts/geometry_engine.py v10 check      # compare with data/
+    python scripts/geometry_engine.py bench          # 1:1-size grid timing
+"""
+
+import json
+import sys
+import time as timer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from topology_check import TopologyError, check_model
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+
+BALSA_DENSITY = 160  # kg/m^3
+SECTION_FRAME = 36   # mm^2 (6x6)
+WIDTH_TOL = 0.05     # cm, bay width matching
+
+# plane rank inside one level of the sweep (legacy loop order)
+PLANE_RANK = {'column': 0, 'beam_x': 1, 'beam_y': 2, 'xz': 3, 'yz': 4, 'floor': 5}
+
+# 24-member bridge template: (end_i, end_j, element_type)
+# ends: <t1|t2|mid>_<bot|top>_<l|r>
+BRIDGE_TEMPLATE = [
+    ('t1_bot_l', 'mid_bot_l', 'bridge_beam'), ('t1_bot_r', 'mid_bot_r', 'bridge_beam'),
+    ('mid_bot_l', 'mid_bot_r', 'bridge_beam'), ('mid_bot_l', 't2_bot_l', 'bridge_beam'),
+    ('mid_bot_r', 't2_bot_r', 'bridge_beam'), ('t1_top_l', 'mid_top_l', 'bridge_beam'),
+    ('t1_top_r', 'mid_top_r', 'bridge_beam'), ('mid_top_l', 'mid_top_r', 'bridge_beam'),
+    ('mid_top_l', 't2_top_l', 'bridge_beam'), ('mid_top_r', 't2_top_r', 'bridge_beam'),
+    ('mid_bot_l', 'mid_top_l', 'bridge_column'), ('mid_bot_r', 'mid_top_r', 'bridge_column'),
+    ('t1_bot_l', 'mid_top_l', 'bridge_truss'), ('mid_bot_l', 't1_top_l', 'bridge_truss'),
+    ('mid_bot_l', 't2_top_l', 'bridge_truss'), ('t2_bot_l', 'mid_top_l', 'bridge_truss'),
+    ('t1_bot_r', 'mid_top_r', 'bridge_truss'), ('mid_bot_r', 't1_top_r', 'bridge_truss'),
+    ('mid_bot_r', 't2_top_r', 'bridge_truss'), ('t2_bot_r', 'mid_top_r', 'bridge_truss'),
+    ('t1_bot_l', 't2_bot_r', 'bridge_rigid'), ('t2_bot_l', 't1_bot_r', 'bridge_rigid'),
+    ('t1_top_l', 't2_top_r', 'bridge_rigid'), ('t2_top_l', 't1_top_r', 'bridge_rigid'),
+]
+
+
+# ============================================================
+# SPEC HELPERS
+# ============================================================
+
+def level_spans(floors, height=1):
+    """[[f, f + height]] for every bottom level f."""
+    return [[int(f), int(f) + height] for f in floors]
+
+
+def group_spans(n_levels, per_floor=4, every=3):
+    """Per-level spans for the first `per_floor` levels, then `every`-level groups."""
+    top = n_levels - 1
+    spans = [[f, f + 1] for f in range(min(per_floor, top))]
+    f = per_floor
+    while f < top:
+        spans.append([f, min(f + every, top)])
+        f = spans[-1][1]
+    return spans
+
+
+def z_levels(spec):
+    """Level elevations (cm): ground story, then typical stories."""
+    z = spec['z']
+    h = np.full(z['floors'] - 1, float(z['typical']))
+    h[0] = z['ground']
+    return np.concatenate([[0.0], np.cumsum(h)])
+
+
+# ============================================================
+# MODEL SPECS
+# ============================================================
+
+def spec_v9():
+    """V9 (regenerate_twin_model_v9b): core panels to level 6, V8 beams."""
+    top = 25
+    return {
+        'version': 'v9',
+        'x': [0.0, 3.0, 11.0, 14.4, 15.6, 19.0, 27.0, 30.0],
+        'towers': {1: [0.0, 7.4, 8.6, 16.0], 2: [24.0, 31.4, 32.6, 40.0]},
+        'z': {'ground': 9.0, 'typical': 6.0, 'floors': 26},
+        'beams': {
+            'x': {'every': 2, 'keep_bays': [1.2]},
+            'y': {'every': 2, 'offset': 1, 'keep_lines': [14.4, 15.6]},
+        },
+        'rules': [
+            {'plane': 'xz', 'type': 'shear_wall_xz', 'connection': 'rigid',
+             'bays': [3.4], 'pattern': 'x', 'spans': level_spans(range(0, 7))},
+            {'plane': 'xz', 'type': 'brace_xz', 'connection': 'pin',
+             'bays': [3.4], 'pattern': 'x', 'spans': level_spans(range(8, top, 2))},
+            {'plane': 'xz', 'type': 'brace_xz', 'connection': 'pin',
+             'bays': [3.0, 8.0], 'pattern': 'alt',
+             'spans': level_spans([0, 8, 16, 24])},
+            {'plane': 'yz', 'type': 'brace_yz', 'connection': 'pin',
+             'skip_bays': [1.2], 'pattern': 'x',
+             'spans': level_spans([0, 6, 12, 18, 24])},
+            {'plane': 'floor', 'type': 'floor_brace', 'connection': 'pin',
+             'skip_bays': [1.2], 'floors': [0, 12, 24]},
+        ],
+        'bridges': {'x': [11.0, 19.0], 'spans': [[5, 6], [11, 12], [17, 18], [23, 25]]},
+    }
+
+
+def spec_v10():
+    """V10: stick X-braces, 8.3 cm bays in 3-level groups, YZ mega braces."""
+    n = 26
+    mega = [[0, 0, 2, 1], [0, 2, 2, 1], [2, 1, 5, 0], [2, 1, 5, 2]]
+    for fb, ft, fm, fbt in [(5, 11, 8, 6), (11, 17, 14, 12), (17, 23, 20, 18)]:
+        mega += [[fb, 0, fm, 1], [fb, 2, fm, 1], [fm, 1, ft, 0], [fm, 1, ft, 2],
+                 [fbt, 0, fm, 1], [fbt, 2, fm, 1]]
+    mega += [[23, 0, 25, 1], [23, 2, 25, 1]]
+    return {
+        'version': 'v10',
+        'x': [0.3, 3.0, 11.3, 15.0, 18.7, 27.0, 29.7],
+        'towers': {1: [0.3, 8.0, 15.7], 2: [24.3, 32.0, 39.7]},
+        'z': {'ground': 9.0, 'typical': 6.0, 'floors': n},
+        'beams': {'keep_every': 4},
+        'rules': [
+            {'plane': 'xz', 'type': 'brace_xz', 'connection': 'pin',
+             'bays': [3.7], 'pattern': 'x',
+             'spans': level_spans(list(range(0, 13)) + list(range(n - 3, n - 1)))},
+            {'plane': 'xz', 'type': 'brace_xz', 'connection': 'pin', 'order': 'block',
+             'bays': [8.3], 'pattern': 'x', 'spans': group_spans(n, 4, 3)},
+            {'plane': 'links', 'face': 'yz', 'type': 'brace_yz', 'connection': 'pin',
+             'order': 'block', 'members': mega},
+            {'plane': 'floor', 'type': 'floor_brace', 'connection': 'pin',
+             'order': 'block', 'skip_bays': [0.6], 'floors': list(range(0, n, 10))},
+        ],
+        'bridges': {'x': [11.3, 18.7], 'spans': [[5, 6], [11, 12], [17, 18], [23, 25]]},
+    }
+
+
+def spec_uniform(nx=61, ny=21, n_levels=121, bay=300.0, story=350.0,
+                 brace_every=3):
+    """Regular full-size style grid (benchmarks, 1:1 studies)."""
+    x = list(np.arange(nx) * bay)
+    return {
+        'version': f'grid_{nx}x{ny}x{n_levels}',
+        'x': x,
+        'towers': {1: list(np.arange(ny) * bay),
+                   2: list(np.arange(ny) * bay + (ny + 2) * bay)},
+        'z': {'ground': story * 1.3, 'typical': story, 'floors': n_levels},
+        'beams': {'keep_every': 1},
+        'rules': [
+            {'plane': 'xz', 'type': 'brace_xz', 'connection': 'pin',
+             'pattern': 'x', 'spans': group_spans(n_levels, 0, brace_every)},
+            {'plane': 'yz', 'type': 'brace_yz', 'connection': 'pin',
+             'pattern': 'alt', 'spans': level_spans(range(n_levels - 1))},
+            {'plane': 'floor', 'type': 'floor_brace', 'connection': 'pin',
+             'floors': list(range(0, n_levels, 10))},
+        ],
+        'bridges': {'x': [x[nx // 2 - 1], x[nx // 2 + 1]],
+                    'spans': [[f, f + 1] for f in range(10, n_levels - 1, 20)]},
+    }
+
+
+SPECS = {'v9': spec_v9, 'v10': spec_v10}
+
+
+def load_spec(name_or_path):
+    """Named spec ('v9', 'v10') or a JSON spec file."""
+    if name_or_path in SPECS:
+        return SPECS[name_or_path]()
+    with open(name_or_path) as f:
+        spec = json.load(f)
+    spec['towers'] = {int(k): v for k, v in spec['towers'].items()}
+    return spec
+
+
+# ============================================================
+# GENERATION
+# ============================================================
+
+class _Elements:
+    """Element arrays accumulated per family with their numbering keys."""
+
+    N_KEYS = 7
+
+    def __init__(self):
+        self.parts = []
+
+    def add(self, ni, nj, etype, conn, tower, keys):
+        ni = np.asarray(ni).ravel()
+        if ni.size == 0:
+            return
+        k = [np.broadcast_to(np.asarray(v), np.shape(nj)).ravel() for v in keys]
+        k += [np.zeros(ni.size, dtype=int)] * (self.N_KEYS - len(k))
+        self.parts.append((ni, np.asarray(nj).ravel(), etype, conn, tower, k))
+
+    def frame(self):
+        ni = np.concatenate([p[0] for p in self.parts])
+        nj = np.concatenate([p[1] for p in self.parts])
+        n = [len(p[0]) for p in self.parts]
+        etype = np.repeat([p[2] for p in self.parts], n)
+        conn = np.repeat([p[3] for p in self.parts], n)
+        tower = np.repeat([p[4] for p in self.parts], n)
+        keys = [np.concatenate([p[5][i] for p in self.parts])
+                for i in range(self.N_KEYS)]
+        order = np.lexsort(keys[::-1])
+        return pd.DataFrame({
+            'element_id': np.arange(len(ni)),
+            'node_i': ni[order], 'node_j': nj[order],
+            'element_type': etype[order], 'tower': tower[order],
+            'connection': conn[order],
+        })
+
+
+def _width_mask(widths, bays=None, skip=None, tol=WIDTH_TOL):
+    """Bays whose width matches `bays` (all if None) and not `skip`."""
+    w = np.asarray(widths)[:, None]
+    mask = np.ones(len(widths), bool)
+    if bays is not None:
+        mask &= (np.abs(w - np.asarray(bays, float)[None]) < tol).any(axis=1)
+    if skip:
+        mask &= ~(np.abs(w - np.asarray(skip, float)[None]) < tol).any(axis=1)
+    return mask
+
+
+def _line_mask(coords, lines, tol=WIDTH_TOL):
+    c = np.asarray(coords)[:, None]
+    return (np.abs(c - np.asarray(lines, float)[None]) < tol).any(axis=1)
+
+
+def _face_view(G, plane):
+    """Tower node grid viewed as (level, face, position along face)."""
+    nx, ny = G.shape[1:]
+    if plane == 'xz':        # faces y = first/last line, positions along X
+        return G[:, :, [0, ny - 1] if ny > 1 else [0]].transpose(0, 2, 1)
+    return G[:, [0, nx - 1] if nx > 1 else [0], :]   # 'yz': x = first/last
+
+
+def _tower_elements(acc, spec, t_rank, G, x, y, label):
+    nf, nx, ny = G.shape
+    beams = spec.get('beams', {})
+    lev = np.arange(nf)
+    rank = PLANE_RANK
+
+    def periodic(opts):
+        every = opts.get('every', beams.get('keep_every', 1))
+        return (lev % every == opts.get('offset', 0))[:, None, None]
+
+    # columns: level × x × y
+    F, I, J = np.meshgrid(lev[:-1], np.arange(nx), np.arange(ny), indexing='ij')
+    acc.add(G[F, I, J], G[F + 1, I, J], 'column', 'rigid', label,
+            (t_rank, 0, F, rank['column'], I, J))
+
+    # beams along X: level × bay × y line
+    bx = beams.get('x', {})
+    F, I, J = np.meshgrid(lev, np.arange(nx - 1), np.arange(ny), indexing='ij')
+    always = np.isin(J, [0, ny - 1])
+    if bx.get('keep_bays'):
+        always = always | _width_mask(np.diff(x), bx['keep_bays'])[None, :, None]
+    gap = ~_width_mask(np.diff(x), skip=bx.get('skip_bays'))[None, :, None]
+    keep = np.broadcast_to(always | (periodic(bx) & ~gap), F.shape)
+    acc.add(G[F, I, J][keep], G[F, I + 1, J][keep], 'beam_x', 'rigid', label,
+            (t_rank, 0, F[keep], rank['beam_x'], I[keep], J[keep]))
+
+    # beams along Y: level × bay × x line
+    by = beams.get('y', {})
+    F, J, I = np.meshgrid(lev, np.arange(ny - 1), np.arange(nx), indexing='ij')
+    always = np.isin(I, [0, nx - 1])
+    if by.get('keep_lines'):
+        always = always | _line_mask(x, by['keep_lines'])[None, None, :]
+    if by.get('keep_bays'):
+        always = always | _width_mask(np.diff(y), by['keep_bays'])[None, :, None]
+    gap = ~_width_mask(np.diff(y), skip=by.get('skip_bays'))[None, :, None]
+    keep = np.broadcast_to(always | (periodic(by) & ~gap), F.shape)
+    acc.add(G[F, I, J][keep], G[F, I, J + 1][keep], 'beam_y', 'rigid', label,
+            (t_rank, 0, F[keep], rank['beam_y'], J[keep], I[keep]))
+
+    for r, rule in enumerate(spec.get('rules', [])):
+        stage = 0 if rule.get('order', 'floor') == 'floor' else r + 1
+        plane = rule['plane']
+        etype, conn = rule['type'], rule.get('connection', 'pin')
+
+        if plane in ('xz', 'yz'):
+            V = _face_view(G, plane)                             # (nf, n_face, n_pos)
+            line = x if plane == 'xz' else y
+            bays = np.flatnonzero(_width_mask(np.diff(line), rule.get('bays'),
+                                              rule.get('skip_bays')))
+            spans = np.asarray(rule['spans'], dtype=int).reshape(-1, 2)
+            S, P, B = np.meshgrid(np.arange(len(spans)), np.arange(V.shape[1]), bays,
+                                  indexing='ij')
+            fb, ft = spans[S, 0], spans[S, 1]
+            bl, br, tl, tr = V[fb, P, B], V[fb, P, B + 1], V[ft, P, B], V[ft, P, B + 1]
+            pat = rule.get('pattern', 'x')
+            if pat == 'alt':
+                up = (fb + B) % 2 == 0
+                members = [(np.where(up, bl, br), np.where(up, tr, tl), 0)]
+            else:
+                members = [(bl, tr, 0), (br, tl, 1)]
+                members = [mb for mb in members
+                           if pat == 'x' or (pat == '/') == (mb[2] == 0)]
+            for ni, nj, m in members:
+                keys = ((t_rank, 0, fb, rank[plane], P, B, m) if stage == 0
+                        else (t_rank, stage, fb, P, B, m))
+                acc.add(ni, nj, etype, conn, label, keys)
+
+        elif plane == 'floor':
+            floors = np.asarray(rule['floors'], dtype=int)
+            ix = np.flatnonzero(_width_mask(np.diff(x), skip=rule.get('skip_bays')))
+            jy = np.flatnonzero(_width_mask(np.diff(y), skip=rule.get('skip_bays')))
+            F, I, J = np.meshgrid(floors, ix, jy, indexing='ij')
+            keys = ((t_rank, 0, F, rank['floor'], I, J) if stage == 0
+                    else (t_rank, stage, F, I, J))
+            acc.add(G[F, I, J], G[F, I + 1, J + 1], etype, conn, label, keys)
+            if rule.get('pattern') == 'x':
+                keys = keys[:-1] + (keys[-1], 1)
+                acc.add(G[F, I + 1, J], G[F, I, J + 1], etype, conn, label, keys)
+
+        elif plane == 'links':
+            V = _face_view(G, rule.get('face', 'yz'))
+            mem = np.asarray(rule['members'], dtype=int).reshape(-1, 4)
+            P, M = np.meshgrid(np.arange(V.shape[1]), np.arange(len(mem)), indexing='ij')
+            fa, ca, fb, cb = (mem[M, k] for k in range(4))
+            keys = ((t_rank, 0, np.minimum(fa, fb), rank['yz'], P, M) if stage == 0
+                    else (t_rank, stage, P, M))
+            acc.add(V[fa, P, ca], V[fb, P, cb], etype, conn, label, keys)
+        else:
+            raise ValueError(f"Unknown rule plane '{plane}'")
+
+
+def _bridges(acc, spec, G_by_tower, x, z, n_towers, start_id):
+    """Bridge nodes/elements between the first two towers."""
+    br = spec.get('bridges')
+    if not br or not br.get('spans'):
+        return pd.DataFrame(columns=['node_id', 'x', 'y', 'z', 'floor', 'zone', 'tower'])
+    (t1, y1), (t2, y2) = list(spec['towers'].items())[:2]
+    G1, G2 = G_by_tower[t1], G_by_tower[t2]
+    ix = [int(np.flatnonzero(_line_mask(x, [v]))[0]) for v in br['x']]
+    y_mid = (y1[-1] + y2[0]) / 2
+
+    spans = np.asarray(br['spans'], dtype=int).reshape(-1, 2)
+    floors = np.unique(spans)
+    # bridge nodes: level × (left, right)
+    mid = start_id + np.arange(len(floors) * 2).reshape(-1, 2)
+    nodes = pd.DataFrame({
+        'node_id': mid.ravel(),
+        'x': np.tile(np.asarray(br['x'], float), len(floors)),
+        'y': y_mid, 'z': np.repeat(z[floors], 2),
+        'floor': np.repeat(floors, 2), 'zone': 'bridge', 'tower': 'bridge',
+    })
+    row = np.searchsorted(floors, spans)                     # (n_br, 2)
+    ends = {}
+    for lvl, k in (('bot', 0), ('top', 1)):
+        f = spans[:, k]
+        for side, s in (('l', 0), ('r', 1)):
+            ends[f't1_{lvl}_{side}'] = G1[f, ix[s], -1]
+            ends[f't2_{lvl}_{side}'] = G2[f, ix[s], 0]
+            ends[f'mid_{lvl}_{side}'] = mid[row[:, k], s]
+    b = np.arange(len(spans))
+    for m, (a, c, etype) in enumerate(BRIDGE_TEMPLATE):
+        acc.add(ends[a], ends[c], etype, 'rigid', 'bridge', (n_towers, 0, b, m))
+    return nodes
+
+
+def generate(spec):
+    """
+    Position and connectivity DataFrames for a spec.
+
+    Tower nodes are numbered tower → level → x line → y line, bridge
+    nodes after them (level → left/right).
+    """
+    x = np.asarray(spec['x'], dtype=float)
+    z = z_levels(spec)
+    nf, nx = len(z), len(x)
+
+    pos, G_by_tower, acc = [], {}, _Elements()
+    start = 0
+    for t_rank, (tower, ys) in enumerate(spec['towers'].items()):
+        y = np.asarray(ys, dtype=float)
+        ny = len(y)
+        G = start + np.arange(nf * nx * ny).reshape(nf, nx, ny)
+        F, I, J = np.meshgrid(np.arange(nf), np.arange(nx), np.arange(ny), indexing='ij')
+        pos.append(pd.DataFrame({
+            'node_id': G.ravel(), 'x': x[I.ravel()], 'y': y[J.ravel()],
+            'z': z[F.ravel()], 'floor': F.ravel(), 'zone': 'tower', 'tower': tower,
+        }))
+        G_by_tower[tower] = G
+        _tower_elements(acc, spec, t_rank, G, x, y, f'tower{tower}')
+        start += G.size
+
+    pos.append(_bridges(acc, spec, G_by_tower, x, z, len(spec['towers']), start))
+    pos_df = pd.concat([p for p in pos if len(p)], ignore_index=True)
+    conn_df = acc.frame()
+
+    xyz = pos_df[['x', 'y', 'z']].to_numpy()
+    d = xyz[conn_df['node_j'].to_numpy()] - xyz[conn_df['node_i'].to_numpy()]
+    conn_df['length'] = np.round(np.sqrt((d**2).sum(axis=1)), 4)
+    return pos_df, conn_df
+
+
+def frame_weight(conn_df):
+    """Frame weight (kg) of 6x6 mm balsa sticks."""
+    return conn_df['length'].sum() * 10 * SECTION_FRAME * BALSA_DENSITY / 1e9
+
+
+def write_model(pos_df, conn_df, version, data_dir=DATA):
+    """Standard twin_position/connectivity_matrix_<version>.csv pair."""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(exist_ok=True)
+    p = data_dir / f'twin_position_matrix_{version}.csv'
+    c = data_dir / f'twin_connectivity_matrix_{version}.csv'
+    pos_df.to_csv(p, index=False)
+    conn_df.to_csv(c, index=False)
+    return p, c
+
+
+def compare_with_files(pos_df, conn_df, version, data_dir=DATA):
+    """True if the generated tables equal the stored CSVs."""
+    p0 = pd.read_csv(Path(data_dir) / f'twin_position_matrix_{version}.csv')
+    c0 = pd.read_csv(Path(data_dir) / f'twin_connectivity_matrix_{version}.csv')
+    p1 = pd.read_csv(pd.io.common.StringIO(pos_df.to_csv(index=False)))
+    c1 = pd.read_csv(pd.io.common.StringIO(conn_df.to_csv(index=False)))
+    return p0.equals(p1), c0.equals(c1)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    args = sys.argv[1:] or ['v10']
+    if args[0] == 'bench':
+        spec = spec_uniform()
+        t0 = timer.time()
+        pos_df, conn_df = generate(spec)
+        print(f"{spec['version']}: {len(pos_df)} nodes, {len(conn_df)} elements "
+              f"in {(timer.time() - t0)*1000:.0f} ms")
+        return
+
+    spec = load_spec(args[0])
+    version = spec.get('version', Path(args[0]).stem)
+    check = 'check' in args[1:]
+    out = [a for a in args[1:] if a != 'check']
+    version = out[0] if out else version
+
+    t0 = timer.time()
+    pos_df, conn_df = generate(spec)
+    elapsed = timer.time() - t0
+
+    print("=" * 70)
+    print(f"TWIN TOWERS MODEL {version.upper()} (geometry engine)")
+    print("=" * 70)
+    print(f"  Nodes: {len(pos_df)}, elements: {len(conn_df)}  ({elapsed*1000:.1f} ms)")
+    for etype, sub in conn_df.groupby('element_type', sort=True):
+        print(f"  {etype:<20}: {len(sub):5d} elements, {sub['length'].sum():9.1f} cm")
+    print(f"  Frame weight: {frame_weight(conn_df):.4f} kg")
+
+    try:
+        check_model(pos_df, conn_df, version)
+    except TopologyError as err:
+        print(f"\n{err}")
+        sys.exit(1)
+
+    if check:
+        same_p, same_c = compare_with_files(pos_df, conn_df, version)
+        print(f"  data/ positions identical:    {same_p}")
+        print(f"  data/ connectivity identical: {same_c}")
+        return
+    p, c = write_model(pos_df, conn_df, version)
+    print(f"\nSaved: {p.relative_to(ROOT)}")
+    print(f"Saved: {c.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+GROUND-MOTION INTENSITY MEASURES & DURATION TRIMMING
+=====================================================
+Vectorized intensity measures for the DASK records (KYH1-3, BOL090):
+- PGA, PGV, PGD (trapezoidal integration, no baseline correction)
+- Arias intensity Ia and normalized Husid curve
+- Significant durations D5-95 and D5-75
+- Cumulative absolute velocity (CAV)
+- Housner spectrum intensity SI (PSV, 5%, T = 0.1-2.5 s)
+
+All functions accept a single record (npts,) or a stack of equal-length
+records (n_rec, npts), with acceleration in g.
+
+Duration-trimmed analysis mode
+------------------------------
+`significant_window` returns the part of the record that actually needs
+integrating: the D5-95 window plus a short lead-in and a free-vibration
+tail of ln(1/tol) / (ξ·ω1) seconds (time for the response to decay to
+`tol` of its level when the strong motion ends). `check_trim` verifies
+the trimmed record against the full one on an SDOF bank around the
+model periods and widens the window until peaks agree within `tol`.
+
+Usage:
+    python scripts/ground_motion_im.py            # IM table for KYH1-3
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scipy.integrate import trapezoid
+
+from sdof_response import oscillator_response, response_spectrum
+
+ROOT = Path(__file__).parent.parent
+GM_DASK = ROOT / 'ground_motion_dask'
+RESULTS = ROOT / 'results'
+
+G = 9.81  # m/s²
+
+# V10 modal periods (data/modal_results_v10.csv) — default trim check bank
+T_MODEL = (0.1150, 0.0790, 0.0535)
+
+
+# ============================================================
+# RECORD I/O
+# ============================================================
+
+def load_dask_record(filepath):
+    """Load a DASK competition record (Time [sec] / Acceleration [g])."""
+    data = pd.read_csv(filepath, sep=r'\s+', comment='#', header=None,
+                       skiprows=1).to_numpy(dtype=float)
+    t, a = data[:, 0], data[:, 1]
+    dt = t[1] - t[0] if len(t) > 1 else 0.001
+    return t, a, dt
+
+
+# ============================================================
+# INTENSITY MEASURES
+# ============================================================
+
+def _cumtrapz(y, dt):
+    """Cumulative trapezoid along the last axis, starting at 0."""
+    out = np.zeros_like(y, dtype=float)
+    out[..., 1:] = np.cumsum(0.5 * (y[..., 1:] + y[..., :-1]) * dt, axis=-1)
+    return out
+
+
+def husid(acc_g, dt):
+    """Arias intensity history Ia(t) [m/s] and its normalized form."""
+    a = np.asarray(acc_g, dtype=float) * G
+    ia_t = np.pi / (2 * G) * _cumtrapz(a**2, dt)
+    ia = ia_t[..., -1:]
+    norm = np.divide(ia_t, ia, out=np.zeros_like(ia_t), where=ia > 0)
+    return ia_t, norm
+
+
+def _crossing_time(norm, level, dt):
+    """First time the normalized Husid curve reaches `level`."""
+    return np.argmax(norm >= level, axis=-1) * dt
+
+
+def significant_duration(acc_g, dt, lo=0.05, hi=0.95):
+    """Significant duration D_lo-hi and its start/end times."""
+    _, norm = husid(acc_g, dt)
+    t_lo = _crossing_time(norm, lo, dt)
+    t_hi = _crossing_time(norm, hi, dt)
+    return t_hi - t_lo, t_lo, t_hi
+
+
+def intensity_measures(acc_g, dt, housner=True):
+    """
+    All scalar IMs for one record or a stack of records.
+
+    Returns dict of floats (single record) or (n_rec,) arrays.
+    Units: PGA g, PGV m/s, PGD m, Ia m/s, CAV m/s, D s, SI m.
+    """
+    acc_g = np.asarray(acc_g, dtype=float)
+    a = acc_g * G
+    vel = _cumtrapz(a, dt)
+    disp = _cumtrapz(vel, dt)
+
+    ia_t, norm = husid(acc_g, dt)
+    t5 = _crossing_time(norm, 0.05, dt)
+    t75 = _crossing_time(norm, 0.75, dt)
+    t95 = _crossing_time(norm, 0.95, dt)
+
+    ims = {
+        'PGA_g': np.max(np.abs(acc_g), axis=-1),
+        'PGV_m_s': np.max(np.abs(vel), axis=-1),
+        'PGD_m': np.max(np.abs(disp), axis=-1),
+        'Ia_m_s': ia_t[..., -1],
+        'CAV_m_s': _cumtrapz(np.abs(a), dt)[..., -1],
+        'D5_95_s': t95 - t5,
+        'D5_75_s': t75 - t5,
+        't5_s': t5,
+        't95_s': t95,
+        'duration_s': (acc_g.shape[-1] - 1) * dt,
+    }
+    if housner:
+        ims['SI_m'] = housner_intensity(acc_g, dt)
+    return ims
+
+
+def housner_intensity(acc_g, dt, T_lo=0.1, T_hi=2.5, n_T=49, xi=0.05):
+    """Housner spectrum intensity: ∫ PSV(T, 5%) dT over [T_lo, T_hi] (m)."""
+    periods = np.linspace(T_lo, T_hi, n_T)
+    acc = np.atleast_2d(np.asarray(acc_g, dtype=float)) * G
+    si = np.array([trapezoid(response_spectrum(a, dt, periods, xi)['PSV'][0],
+                             periods) for a in acc])
+    return si if np.ndim(acc_g) > 1 else float(si[0])
+
+
+# ============================================================
+# DURATION-TRIMMED ANALYSIS MODE
+# ============================================================
+
+def free_vibration_tail(T1, xi=0.05, tol=0.02, min_cycles=3):
+    """Tail length for the response to decay to `tol` after strong motion."""
+    omega1 = 2 * np.pi / T1
+    return max(np.log(1.0 / tol) / (xi * omega1), min_cycles * T1)
+
+
+def significant_window(acc_g, dt, T1, xi=0.05, tol=0.02, lo=0.05, hi=0.95,
+                       lead=None):
+    """
+    Sample range [i0, i1) to integrate in duration-trimmed mode.
+
+    Starts `lead` seconds before t_lo (default 2·T1, so the oscillators
+    are at rest when the strong motion arrives) and ends a free-vibration
+    tail after t_hi.
+    """
+    acc_g = np.asarray(acc_g, dtype=float)
+    _, t_lo, t_hi = significant_duration(acc_g, dt, lo, hi)
+    lead = 2 * T1 if lead is None else lead
+    tail = free_vibration_tail(T1, xi, tol)
+    n = acc_g.shape[-1]
+    i0 = max(int(np.floor((t_lo - lead) / dt)), 0)
+    i1 = min(int(np.ceil((t_hi + tail) / dt)) + 1, n)
+    return i0, i1
+
+
+def check_trim(acc_g, dt, i0, i1, periods=T_MODEL, xi=0.05):
+    """Max relative peak-displacement error of trimmed vs full record."""
+    omega = 2 * np.pi / np.asarray(periods)
+    a = np.asarray(acc_g, dtype=float) * G
+    full = np.max(np.abs(oscillator_response(a, dt, omega, xi)), axis=1)
+    trim = np.max(np.abs(oscillator_response(a[i0:i1], dt, omega, xi)), axis=1)
+    return float(np.max(np.abs(trim - full) / full))
+
+
+def trim_record(acc_g, dt, T1, xi=0.05, tol=0.02, periods=None):
+    """
+    Duration-trimmed record with verified peak tolerance.
+
+    Widens the Husid bounds (5-95 → 2.5-97.5 → 1-99 → full) until the
+    SDOF bank at `periods` (default: T1 and two higher model modes)
+    reproduces the full-record peaks within `tol`.
+    Returns (acc_trimmed, t_offset, info).
+    """
+    acc_g = np.asarray(acc_g, dtype=float)
+    periods = (T1,) + tuple(T_MODEL[1:]) if periods is None else periods
+
+    for lo, hi in [(0.05, 0.95), (0.025, 0.975), (0.01, 0.99)]:
+        i0, i1 = significant_window(acc_g, dt, T1, xi, tol, lo, hi)
+        err = check_trim(acc_g, dt, i0, i1, periods, xi)
+        if err <= tol:
+            break
+    else:
+        i0, i1, err = 0, acc_g.size, 0.0
+
+    info = {
+        'i0': int(i0), 'i1': int(i1),
+        't_start': i0 * dt, 't_end': (i1 - 1) * dt,
+        'husid_bounds': (lo, hi) if (i0, i1) != (0, acc_g.size) else (0.0, 1.0),
+        'step_ratio': (i1 - i0) / acc_g.size,
+        'peak_error': err,
+    }
+    return acc_g[i0:i1], i0 * dt, info
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    rows = []
+    for k in (1, 2, 3):
+        fp = GM_DASK / f'KYH{k}.txt'
+        if not fp.exists():
+            print(f"  WARNING: {fp} not found, skipping")
+            continue
+        _, a, dt = load_dask_record(fp)
+        ims = intensity_measures(a, dt)
+        _, _, info = trim_record(a, dt, T_MODEL[0])
+        ims.update({'record': f'KYH{k}',
+                    'trim_t_start_s': info['t_start'],
+                    'trim_t_end_s': info['t_end'],
+                    'trim_step_ratio': info['step_ratio'],
+                    'trim_peak_error': info['peak_error']})
+        rows.append(ims)
+
+    df = pd.DataFrame(rows).set_index('record')
+    print("=" * 80)
+    print("  GROUND-MOTION INTENSITY MEASURES")
+    print("=" * 80)
+    print(df.T.to_string(float_format=lambda v: f"{v:.4f}"))
+
+    RESULTS.mkdir(exist_ok=True)
+    df.to_csv(RESULTS / 'ground_motion_im.csv')
+    print(f"\nSaved: {RESULTS / 'ground_motion_im.csv'}")
+
+
+if __name__ == "__main__":
+    main()
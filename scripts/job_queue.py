@@ -0,0 +1,388 @@
+"""
+PERSISTENT JOB QUEUE FOR ANALYSIS CAMPAIGNS (SQLite)
+====================================================
+Campaigns (model versions × records × directions × damping × intensity)
+are enqueued as parameterized jobs in an embedded SQLite database
+(WAL mode) and leased to worker processes:
+
+- enqueue is idempotent: a job's key is the hash of (campaign, kind,
+  params), so re-running a campaign script adds only missing jobs
+- lease = one `BEGIN IMMEDIATE` transaction moving the oldest runnable
+  job to 'leased' with an owner and an expiry; workers heartbeat while
+  running. A worker that dies leaves an expired lease, which the next
+  lease call reclaims — a restarted campaign resumes where it stopped
+- results are written to results/campaigns/<campaign>/ (temp file +
+  os.replace) before the job is marked done, so 'done' always points at
+  a complete file; a crash in between only re-runs that one job
+- failures retry with the next solver fallback of the job kind
+  (smaller integrator step, more modes); a lost lease re-runs with the
+  same fallback. Every attempt is logged with worker, fallback, timing
+  and error
+
+Job kinds:
+    'frf_th'       modal FRF engine (linear), peak roof disp / drift
+    'opensees_th'  full_analysis_v10.run_time_history (Newmark, V10)
+
+Usage:
+    python scripts/job_queue.py demo [campaign]     # enqueue FRF campaign
+    python scripts/job_queue.py work [-jN]          # run until queue empty
+    python scripts/job_queue.py status
+    python scripts/job_queue.py retry               # failed -> pending
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time as timer
+import traceback
+from multiprocessing import get_context
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+DB_PATH = ROOT / 'results' / 'job_queue.sqlite'
+OUT_DIR = ROOT / 'results' / 'campaigns'
+
+LEASE_S = 120.0          # lease length; heartbeats renew at LEASE_S / 4
+MAX_LOST = 3             # lost leases (worker died) before a job is given up
+
+# solver fallbacks per job kind: attempt n runs with FALLBACKS[kind][n]
+FALLBACKS = {
+    'frf_th': [{}, {'n_modes': 48}, {'n_modes': 96, 'min_mass_ratio': 0.0}],
+    'opensees_th': [{'integrator_dt': 0.0005},
+                    {'integrator_dt': 0.00025},
+                    {'integrator_dt': 0.0001}],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY,
+    key           TEXT UNIQUE NOT NULL,
+    campaign      TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    params        TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    failures      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    created       REAL NOT NULL,
+    finished      REAL,
+    elapsed       REAL,
+    result_path   TEXT,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_runnable ON jobs (status, priority, id);
+CREATE TABLE IF NOT EXISTS attempts (
+    job_id    INTEGER NOT NULL REFERENCES jobs(id),
+    attempt   INTEGER NOT NULL,
+    worker    TEXT NOT NULL,
+    fallback  TEXT NOT NULL,
+    started   REAL NOT NULL,
+    finished  REAL,
+    status    TEXT,
+    error     TEXT,
+    PRIMARY KEY (job_id, attempt)
+);
+"""
+
+
+def job_key(campaign, kind, params):
+    blob = json.dumps([campaign, kind, params], sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+# ============================================================
+# QUEUE
+# ============================================================
+
+class JobQueue:
+    """SQLite-backed queue; one instance per process (connections are not shared)."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, campaign, kind, params_list, priority=0):
+        """Add jobs not already present; returns number of new jobs."""
+        if kind not in FALLBACKS:
+            raise ValueError(f"unknown job kind {kind!r}")
+        now = timer.time()
+        rows = [(job_key(campaign, kind, p), campaign, kind,
+                 json.dumps(p, sort_keys=True), priority, len(FALLBACKS[kind]), now)
+                for p in params_list]
+        with self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (key, campaign, kind, params, priority, "
+                "max_attempts, created) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            return self.db.total_changes - before
+
+    def lease(self, worker, lease_s=LEASE_S):
+        """
+        Atomically take the next runnable job (pending, or leased with an
+        expired lease). Returns (job row, fallback dict) or None.
+        """
+        now = timer.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.db.execute(
+                "SELECT * FROM jobs WHERE failures < max_attempts AND "
+                "attempts < max_attempts + ? AND "
+                "(status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY priority DESC, id LIMIT 1", (MAX_LOST, now)).fetchone()
+            if row is None:
+                self.db.execute('COMMIT')
+                return None
+            if row['status'] == 'leased':       # previous owner died mid-run
+                self.db.execute(
+                    "UPDATE attempts SET finished = ?, status = 'lost' "
+                    "WHERE job_id = ? AND attempt = ?", (now, row['id'], row['attempts']))
+            attempt = row['attempts'] + 1
+            fallback = FALLBACKS[row['kind']][row['failures']]
+            self.db.execute(
+                "UPDATE jobs SET status = 'leased', attempts = ?, lease_owner = ?, "
+                "lease_expires = ? WHERE id = ?", (attempt, worker, now + lease_s, row['id']))
+            self.db.execute(
+                "INSERT OR REPLACE INTO attempts (job_id, attempt, worker, fallback, started) "
+                "VALUES (?, ?, ?, ?, ?)", (row['id'], attempt, worker,
+                                           json.dumps(fallback), now))
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        return dict(row, attempts=attempt), fallback
+
+    def heartbeat(self, job_id, worker, lease_s=LEASE_S):
+        with self.db:
+            self.db.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND "
+                            "lease_owner = ? AND status = 'leased'",
+                            (timer.time() + lease_s, job_id, worker))
+
+    def complete(self, job, worker, result_path, elapsed):
+        now = timer.time()
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET status = 'done', finished = ?, elapsed = ?, result_path = ?, "
+                "error = NULL, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND lease_owner = ?",
+                (now, elapsed, str(result_path), job['id'], worker))
+            self.db.execute("UPDATE attempts SET finished = ?, status = 'done' "
+                            "WHERE job_id = ? AND attempt = ?", (now, job['id'], job['attempts']))
+
+    def fail(self, job, worker, error):
+        """Record a failed attempt; the job stays runnable while fallbacks remain."""
+        now = timer.time()
+        final = job['failures'] + 1 >= job['max_attempts']
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, failures = failures + 1, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL, finished = ? "
+                "WHERE id = ? AND lease_owner = ?",
+                ('failed' if final else 'pending', error, now if final else None,
+                 job['id'], worker))
+            self.db.execute("UPDATE attempts SET finished = ?, status = 'failed', error = ? "
+                            "WHERE job_id = ? AND attempt = ?",
+                            (now, error, job['id'], job['attempts']))
+
+    def retry_failed(self, campaign=None):
+        """Failed jobs back to pending with a fresh fallback chain."""
+        q = ("UPDATE jobs SET status = 'pending', attempts = 0, failures = 0, error = NULL, "
+             "finished = NULL WHERE status = 'failed' OR (status = 'leased' AND "
+             "attempts >= max_attempts + %d)" % MAX_LOST)
+        args = ()
+        if campaign:
+            q += " AND campaign = ?"
+            args = (campaign,)
+        with self.db:
+            return self.db.execute(q, args).rowcount
+
+    def counts(self, campaign=None):
+        q = "SELECT campaign, status, COUNT(*), SUM(elapsed) FROM jobs"
+        args = ()
+        if campaign:
+            q += " WHERE campaign = ?"
+            args = (campaign,)
+        return self.db.execute(q + " GROUP BY campaign, status", args).fetchall()
+
+    def results(self, campaign):
+        """(params, result dict) of the finished jobs of a campaign."""
+        out = []
+        for r in self.db.execute("SELECT params, result_path FROM jobs WHERE campaign = ? "
+                                 "AND status = 'done' ORDER BY id", (campaign,)):
+            out.append((json.loads(r['params']), json.loads(Path(r['result_path']).read_text())))
+        return out
+
+
+# ============================================================
+# JOB KINDS
+# ============================================================
+
+_ENGINES = {}      # per-process (version, n_modes, xi) -> ModalEngine
+_RECORDS = {}
+
+
+def _record(name):
+    if name not in _RECORDS:
+        from ground_motion_im import load_dask_record
+        _RECORDS[name] = load_dask_record(ROOT / 'ground_motion_dask' / f'{name}.txt')
+    return _RECORDS[name]
+
+
+def run_frf_th(p, fb):
+    """Linear modal FRF time history of one record, one direction."""
+    import numpy as np
+    import frame_model as fm
+    from frequency_response import ModalEngine
+    n_modes = fb.get('n_modes', p.get('n_modes', 24))
+    key = (p['version'], n_modes, p.get('xi', 0.05))
+    if key not in _ENGINES:
+        _ENGINES[key] = ModalEngine(fm.load_model(p['version']), n_modes=n_modes,
+                                    xi=p.get('xi', 0.05))
+    eng = _ENGINES[key]
+    _, a, dt = _record(p['record'])
+    res = eng.run(a * p.get('scale', 1.0), dt, direction=p['direction'],
+                  min_mass_ratio=fb.get('min_mass_ratio', 1e-5))
+    if not np.all(np.isfinite(res['disp'])):
+        raise FloatingPointError("non-finite response")
+    j = int(res['drift'][0].argmax())
+    return {'u_roof_cm': float(res['disp'][0, -1] * 100),
+            'max_drift_pct': float(res['drift'][0, j] * 100),
+            'max_drift_floor': int(eng.floors[j + 1]),
+            'drift_profile_pct': (res['drift'][0] * 100).tolist(),
+            'T1': float(eng.modes['T'][0])}
+
+
+def run_opensees_th(p, fb):
+    """Newmark time history on the V10 OpenSees model."""
+    import numpy as np
+    import full_analysis_v10 as fa
+    t, a, dt = _record(p['record'])
+    res = fa.run_time_history(p['record'], t, a * p.get('scale', 1.0), dt,
+                              direction=p['direction'], integrator_dt=fb['integrator_dt'],
+                              xi_val=p.get('xi', 0.05))
+    if res['status'] != 'OK':
+        raise RuntimeError(f"analysis failed (integrator_dt={fb['integrator_dt']})")
+    return {k: v for k, v in res.items() if not isinstance(v, (list, np.ndarray))}
+
+
+HANDLERS = {'frf_th': run_frf_th, 'opensees_th': run_opensees_th}
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+def _write_result(job, result):
+    """Atomic result file for one job."""
+    d = OUT_DIR / job['campaign']
+    d.mkdir(parents=True, exist_ok=True)
+    path = d / f"{job['kind']}_{job['id']:06d}.json"
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps({'job': job['id'], 'params': json.loads(job['params']),
+                               'result': result}, indent=1))
+    os.replace(tmp, path)
+    return path
+
+
+def _heartbeat_loop(db_path, job_id, worker, stop):
+    q = JobQueue(db_path)
+    while not stop.wait(LEASE_S / 4):
+        q.heartbeat(job_id, worker)
+    q.close()
+
+
+def worker_loop(db_path=DB_PATH, max_jobs=None, name=None):
+    """Lease and run jobs until none are runnable; returns jobs processed."""
+    worker = name or f'{socket.gethostname()}:{os.getpid()}'
+    q = JobQueue(db_path)
+    n = 0
+    while max_jobs is None or n < max_jobs:
+        got = q.lease(worker)
+        if got is None:
+            break
+        job, fb = got
+        stop = threading.Event()
+        hb = threading.Thread(target=_heartbeat_loop, args=(db_path, job['id'], worker, stop),
+                              daemon=True)
+        hb.start()
+        t0 = timer.time()
+        try:
+            result = HANDLERS[job['kind']](json.loads(job['params']), fb)
+            path = _write_result(job, result)
+            q.complete(job, worker, path, timer.time() - t0)
+        except Exception as e:
+            q.fail(job, worker, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}")
+        finally:
+            stop.set()
+            hb.join()
+        n += 1
+    q.close()
+    return n
+
+
+def run_workers(n_workers=None, db_path=DB_PATH):
+    """Run n worker processes until the queue is drained."""
+    n_workers = n_workers or os.cpu_count()
+    with get_context('spawn').Pool(n_workers) as pool:
+        return sum(pool.map(worker_loop, [db_path] * n_workers))
+
+
+# ============================================================
+# CAMPAIGNS
+# ============================================================
+
+def frf_campaign(versions=('v9', 'v10', 'v11', 'v12', 'v13'), records=('KYH1', 'KYH2', 'KYH3'),
+                 directions=('X', 'Y'), xis=(0.02, 0.05), scales=(0.5, 1.0, 1.5, 2.0)):
+    """Parameter grid; version-major so worker engine caches are reused."""
+    return [{'version': v, 'record': r, 'direction': d, 'xi': xi, 'scale': s}
+            for v in versions for xi in xis for r in records
+            for d in directions for s in scales]
+
+
+def print_status(q, campaign=None):
+    rows = q.counts(campaign)
+    if not rows:
+        print("  (queue empty)")
+    for c, st, n, el in rows:
+        print(f"  {c:<16} {st:<8} {n:>6}  {el or 0:>8.1f}s")
+
+
+def main():
+    args = sys.argv[1:] or ['status']
+    cmd = args[0]
+    jobs = next((int(a[2:]) for a in args if a.startswith('-j') and a[2:]), None)
+    rest = [a for a in args[1:] if not a.startswith('-')]
+    q = JobQueue()
+    print("=" * 70)
+    print(f"JOB QUEUE — {q.path.relative_to(ROOT)}")
+    print("=" * 70)
+    if cmd == 'demo':
+        campaign = rest[0] if rest else 'frf_demo'
+        n = q.enqueue(campaign, 'frf_th', frf_campaign())
+        print(f"  {campaign}: {n} new jobs")
+    elif cmd == 'work':
+        t0 = timer.time()
+        n = run_workers(jobs)
+        print(f"  {n} jobs processed in {timer.time() - t0:.1f}s")
+    elif cmd == 'retry':
+        print(f"  {q.retry_failed(rest[0] if rest else None)} failed jobs re-queued")
+    print_status(q)
+    q.close()
+
+
+if __name__ == "__main__":
+    main()
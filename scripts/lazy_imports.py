@@ -0,0 +1,59 @@
+"""
+LAZY MODULE IMPORTS
+===================
+Heavy optional dependencies (openseespy, plotly, matplotlib, ezdxf,
+scipy.stats) cost seconds to import and are often not installed. Modules
+that only need them inside some functions bind a proxy instead:
+
+    ops = lazy_module('openseespy.opensees')
+    ...
+    ops.wipe()          # first attribute access performs the import
+
+The proxy replaces nothing in sys.modules until first use, so importing
+the module that holds it stays cheap and works without the dependency.
+"""
+
+import importlib
+
+HINTS = {
+    'openseespy': 'pip install openseespy',
+    'ezdxf': 'pip install ezdxf',
+    'plotly': 'pip install plotly',
+    'matplotlib': 'pip install matplotlib',
+    'openpyxl': 'pip install openpyxl',
+}
+
+
+class LazyModule:
+    """Module proxy importing `name` on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        mod = self.__dict__['_module']
+        if mod is None:
+            name = self.__dict__['_name']
+            try:
+                mod = importlib.import_module(name)
+            except ImportError as e:
+                hint = HINTS.get(name.split('.')[0])
+                raise ImportError(f"{name} is required here"
+                                  + (f" ({hint})" if hint else '')) from e
+            self.__dict__['_module'] = mod
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_module(name):
+    return LazyModule(name)
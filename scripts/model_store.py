@@ -0,0 +1,367 @@
+"""
+VERSIONED MODEL STORE (BASE + DELTAS)
+=====================================
+Compact binary repository for the twin-tower model iterations in data/.
+
+Layout (data/model_store/):
+    manifest.json           versions, parents, column order, string tables
+    <base>.nodes.npy        structured arrays of a base model, loaded
+    <base>.elements.npy     memory-mapped (np.load(mmap_mode='r'))
+    <version>.delta.npz     edit script against the parent version
+
+A delta stores, for nodes and elements, an edit script of segments
+(kind, start, stop): kind 0 copies parent rows [start, stop), kind 1
+appends rows [start, stop) of the delta's own added-row table. Rows are
+matched by content (ids excluded), so inserting a few braces — or
+renumbering everything behind an insertion, as V11 does — costs only
+the new rows plus a handful of segments. Sequential ids (id == row) are
+regenerated rather than stored. Text columns are stored as uint16 codes
+into append-only string tables.
+
+`put(..., parent='auto')` picks the stored version giving the smallest
+delta, so storage grows with the size of the changes, not the number
+of iterations.
+
+Usage:
+    python scripts/model_store.py import            # data/twin_*.csv -> store
+    python scripts/model_store.py list
+    python scripts/model_store.py diff v9 v13
+    python scripts/model_store.py export v13 [dir]  # legacy CSV pair
+"""
+
+import json
+import sys
+import time as timer
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib import recfunctions as rfn
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+STORE = DATA / 'model_store'
+
+TABLES = ('nodes', 'elements')
+ID_COLUMN = {'nodes': 'node_id', 'elements': 'element_id'}
+LEGACY_NAME = {'nodes': 'twin_position_matrix', 'elements': 'twin_connectivity_matrix'}
+
+
+# ============================================================
+# ENCODING
+# ============================================================
+
+def _field_dtype(series):
+    if pd.api.types.is_float_dtype(series):
+        return 'f8'
+    if pd.api.types.is_integer_dtype(series):
+        return 'i4' if series.abs().max() < 2**31 else 'i8'
+    return 'u2'          # text -> code into the string table
+
+
+def encode(df, strings):
+    """DataFrame -> structured array; text columns become string-table codes."""
+    fields = [(c, _field_dtype(df[c])) for c in df.columns]
+    arr = np.empty(len(df), dtype=fields)
+    for c, kind in fields:
+        if kind != 'u2':
+            arr[c] = df[c].to_numpy()
+            continue
+        table = strings.setdefault(c, [])
+        values = df[c].astype(str).to_numpy()
+        new = [v for v in pd.unique(values) if v not in table]
+        table.extend(new)
+        arr[c] = pd.Index(table).get_indexer(values)
+    return arr
+
+
+def decode(arr, strings, columns):
+    """Structured array -> legacy DataFrame (original column order)."""
+    out = {}
+    for c in columns:
+        v = arr[c]
+        out[c] = np.asarray(strings[c], dtype=object)[v] if arr.dtype[c] == np.uint16 else v
+    return pd.DataFrame(out)
+
+
+def _content(arr, id_col):
+    """Packed row bytes without the id column, one void scalar per row."""
+    cols = [c for c in arr.dtype.names if c != id_col]
+    packed = rfn.repack_fields(np.asarray(arr[cols]))
+    return np.ascontiguousarray(packed).view(f'V{packed.dtype.itemsize}').ravel()
+
+
+def edit_script(parent, child, id_col):
+    """
+    (ops, added) turning parent rows into child rows.
+
+    ops: (k, 3) int32 (kind, start, stop); kind 0 = parent slice,
+    kind 1 = slice of `added`.
+    """
+    a = _content(parent, id_col).tolist()
+    b = _content(child, id_col).tolist()
+    sm = SequenceMatcher(None, a, b, autojunk=False)
+    ops, take = [], []
+    n_added = 0
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == 'equal':
+            ops.append((0, i1, i2))
+        elif j2 > j1:                                     # replace / insert
+            ops.append((1, n_added, n_added + j2 - j1))
+            take.append(np.arange(j1, j2))
+            n_added += j2 - j1
+    idx = np.concatenate(take) if take else np.zeros(0, dtype=int)
+    return np.asarray(ops, dtype=np.int32).reshape(-1, 3), child[idx]
+
+
+def apply_script(parent, ops, added):
+    """Materialize child rows from parent rows and an edit script."""
+    parts = [parent[s:e] if k == 0 else added[s:e] for k, s, e in ops]
+    return np.concatenate(parts) if parts else added[:0]
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+class ModelStore:
+    """Base + delta model repository rooted at `root`."""
+
+    def __init__(self, root=STORE):
+        self.root = Path(root)
+        self._cache = {}
+        mf = self.root / 'manifest.json'
+        if mf.exists():
+            self.manifest = json.loads(mf.read_text())
+        else:
+            self.manifest = {'versions': {}, 'strings': {t: {} for t in TABLES}}
+
+    # --- bookkeeping -------------------------------------------------
+
+    def versions(self):
+        return list(self.manifest['versions'])
+
+    def __contains__(self, version):
+        return version in self.manifest['versions']
+
+    def _save_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / 'manifest.json').write_text(json.dumps(self.manifest, indent=1))
+
+    def chain(self, version):
+        """Versions from the base down to `version`."""
+        out = []
+        while version is not None:
+            out.append(version)
+            version = self.manifest['versions'][version]['parent']
+        return out[::-1]
+
+    # --- writing -----------------------------------------------------
+
+    def _delta_size(self, arrays, parent):
+        base = self.arrays(parent)
+        total = 0
+        for t in TABLES:
+            if arrays[t].dtype != base[t].dtype:
+                return None
+            ops, added = edit_script(base[t], arrays[t], ID_COLUMN[t])
+            total += ops.nbytes + added.nbytes
+        return total
+
+    def put(self, version, pos_df, conn_df, parent='auto'):
+        """
+        Store a model version. parent: a stored version, None (new base)
+        or 'auto' (smallest delta among compatible stored versions).
+        """
+        children = [v for v, m in self.manifest['versions'].items()
+                    if m['parent'] == version]
+        if children:
+            raise ValueError(f"Version '{version}' is the parent of {children}; "
+                             f"store the change under a new name")
+        strings = self.manifest['strings']
+        arrays = {'nodes': encode(pos_df, strings['nodes']),
+                  'elements': encode(conn_df, strings['elements'])}
+
+        if parent == 'auto':
+            sizes = {v: self._delta_size(arrays, v) for v in self.versions() if v != version}
+            sizes = {v: s for v, s in sizes.items() if s is not None}
+            base_size = sum(a.nbytes for a in arrays.values())
+            parent = min(sizes, key=sizes.get) if sizes else None
+            if parent is not None and sizes[parent] > 0.5 * base_size:
+                parent = None
+        meta = {'parent': parent,
+                'columns': {'nodes': list(pos_df.columns), 'elements': list(conn_df.columns)},
+                'sequential_ids': {}}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        if parent is None:
+            for t in TABLES:
+                np.save(self.root / f'{version}.{t}.npy', arrays[t])
+        else:
+            payload = {}
+            base = self.arrays(parent)
+            for t in TABLES:
+                col = ID_COLUMN[t]
+                seq = bool((arrays[t][col] == np.arange(len(arrays[t]))).all())
+                meta['sequential_ids'][t] = seq
+                ops, added = edit_script(base[t], arrays[t], col)
+                payload[f'{t}_ops'] = ops
+                payload[f'{t}_added'] = added
+                if not seq:
+                    payload[f'{t}_ids'] = arrays[t][col]
+            np.savez_compressed(self.root / f'{version}.delta.npz', **payload)
+
+        self.manifest['versions'][version] = meta
+        self._cache.pop(version, None)
+        self._save_manifest()
+        return parent
+
+    # --- reading -----------------------------------------------------
+
+    def arrays(self, version):
+        """{'nodes', 'elements'} structured arrays (base memory-mapped)."""
+        if version in self._cache:
+            return self._cache[version]
+        meta = self.manifest['versions'][version]
+        if meta['parent'] is None:
+            out = {t: np.load(self.root / f'{version}.{t}.npy', mmap_mode='r')
+                   for t in TABLES}
+        else:
+            parent = self.arrays(meta['parent'])
+            with np.load(self.root / f'{version}.delta.npz') as d:
+                out = {}
+                for t in TABLES:
+                    arr = apply_script(parent[t], d[f'{t}_ops'], d[f'{t}_added'])
+                    arr[ID_COLUMN[t]] = (np.arange(len(arr))
+                                         if meta['sequential_ids'][t] else d[f'{t}_ids'])
+                    out[t] = arr
+        self._cache[version] = out
+        return out
+
+    def frames(self, version):
+        """(position_df, connectivity_df) exactly as the legacy CSVs."""
+        arrs = self.arrays(version)
+        cols = self.manifest['versions'][version]['columns']
+        strings = self.manifest['strings']
+        return (decode(arrs['nodes'], strings['nodes'], cols['nodes']),
+                decode(arrs['elements'], strings['elements'], cols['elements']))
+
+    def export_csv(self, version, data_dir=DATA):
+        """Write twin_position/connectivity_matrix_<version>.csv."""
+        data_dir = Path(data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        pos_df, conn_df = self.frames(version)
+        paths = []
+        for t, df in (('nodes', pos_df), ('elements', conn_df)):
+            p = data_dir / f'{LEGACY_NAME[t]}_{version}.csv'
+            df.to_csv(p, index=False)
+            paths.append(p)
+        return paths
+
+    def diff(self, a, b):
+        """
+        Element / node rows only in `a` ('removed') or only in `b` ('added'),
+        matched by content. Returns {table: {'removed': df, 'added': df}}.
+        """
+        A, B = self.arrays(a), self.arrays(b)
+        fa, fb = self.frames(a), self.frames(b)
+        out = {}
+        for k, t in enumerate(TABLES):
+            col = ID_COLUMN[t]
+            if A[t].dtype != B[t].dtype:
+                out[t] = {'removed': fa[k], 'added': fb[k]}
+                continue
+            ka, kb = _content(A[t], col), _content(B[t], col)
+            in_b = np.isin(ka, kb)
+            in_a = np.isin(kb, ka)
+            out[t] = {'removed': fa[k][~in_b].reset_index(drop=True),
+                      'added': fb[k][~in_a].reset_index(drop=True)}
+        return out
+
+    def disk_usage(self, version):
+        """Bytes on disk for one version's own files."""
+        files = (self.root.glob(f'{version}.*.npy') if self.manifest['versions'][version]['parent'] is None
+                 else [self.root / f'{version}.delta.npz'])
+        return sum(p.stat().st_size for p in files)
+
+
+def legacy_versions(data_dir=DATA):
+    """Versions with both legacy CSVs in data/ ('' = unsuffixed base)."""
+    out = []
+    for p in sorted(Path(data_dir).glob('twin_position_matrix*.csv')):
+        v = p.stem[len('twin_position_matrix'):].lstrip('_')
+        if (Path(data_dir) / f'twin_connectivity_matrix{"_" + v if v else ""}.csv').exists():
+            out.append(v)
+    return out
+
+
+def import_legacy(store, data_dir=DATA, versions=None, base='v9'):
+    """Import legacy CSV pairs, `base` first, the rest as deltas."""
+    versions = versions or [v for v in legacy_versions(data_dir) if v]
+    order = [base] + [v for v in versions if v != base] if base in versions else versions
+    for v in order:
+        pos = pd.read_csv(Path(data_dir) / f'twin_position_matrix_{v}.csv')
+        conn = pd.read_csv(Path(data_dir) / f'twin_connectivity_matrix_{v}.csv')
+        parent = store.put(v, pos, conn, parent=None if v == base else 'auto')
+        yield v, parent
+
+
+def load_frame_model(version, store=None, **kwargs):
+    """FrameModel straight from the store (no CSV parsing)."""
+    import frame_model as fm
+    store = store or ModelStore()
+    pos_df, conn_df = store.frames(version)
+    return fm.from_frames(pos_df, conn_df, version=version, **kwargs)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    args = sys.argv[1:] or ['list']
+    store = ModelStore()
+    cmd = args[0]
+
+    if cmd == 'import':
+        print("=" * 70)
+        print("  IMPORT LEGACY CSVs -> data/model_store")
+        print("=" * 70)
+        csv_bytes = 0
+        for v, parent in import_legacy(store):
+            csv_bytes += sum((DATA / f'{LEGACY_NAME[t]}_{v}.csv').stat().st_size
+                             for t in TABLES)
+            print(f"  {v:<6} parent={str(parent):<6} {store.disk_usage(v)/1024:8.1f} KiB")
+        total = sum(store.disk_usage(v) for v in store.versions())
+        print(f"\n  CSV: {csv_bytes/1024:.0f} KiB   store: {total/1024:.0f} KiB")
+
+    elif cmd == 'list':
+        for v in store.versions():
+            meta = store.manifest['versions'][v]
+            t0 = timer.time()
+            a = store.arrays(v)
+            ms = (timer.time() - t0) * 1000
+            print(f"  {v:<6} parent={str(meta['parent']):<6} nodes={len(a['nodes']):5d} "
+                  f"elements={len(a['elements']):5d}  {store.disk_usage(v)/1024:7.1f} KiB"
+                  f"  load {ms:.1f} ms")
+
+    elif cmd == 'diff':
+        a, b = args[1], args[2]
+        for t, d in store.diff(a, b).items():
+            print(f"--- {t}: {len(d['removed'])} removed, {len(d['added'])} added "
+                  f"({a} -> {b})")
+            for tag, df in (('-', d['removed']), ('+', d['added'])):
+                for line in df.head(40).to_string(index=False, header=False).splitlines():
+                    print(f"  {tag} {line}")
+
+    elif cmd == 'export':
+        out = Path(args[2]) if len(args) > 2 else DATA
+        for p in store.export_csv(args[1], out):
+            print(f"Saved: {p}")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+INCREMENTAL RESULTS → REPORT PIPELINE
+=====================================
+Declares every producing script as a stage with its inputs and outputs
+(paths or globs relative to the repo root) and rebuilds only what is
+out of date:
+
+    model CSVs ─┬─ topology_<v>    data/twin_adjacency_<v>.npz
+                ├─ frf_<v>         results/frf_screening_<v>.csv
+                ├─ tex_<v>         tex/data/<v>/*.tsv
+                └─ dxf_v10, excel, th_v10 (OpenSees), tex_data (report V9)
+    KYH records ── gm_im, rotd, damping_sweep
+    Tcl TH (th_tcl) → joint_demand → damage, fragility
+    tex/data tables → report (latexmk tex/rapor.tex)
+
+The stage graph comes from matching outputs against inputs. A stage is
+skipped when the content hash of its inputs, its command and its script
+source equals the one recorded at its last successful run and its
+outputs are still what that run wrote. Hashes are recomputed only for
+files whose size/mtime changed. Because the check happens when a stage
+becomes ready, an upstream rebuild whose outputs come out byte-identical
+does not propagate (early cutoff), and editing one model version only
+touches that version's stages.
+
+Independent stages run in parallel as subprocesses (-j N).
+
+Usage:
+    python scripts/pipeline.py                   # build everything
+    python scripts/pipeline.py tex_v10 frf_v10   # targets + upstream
+    python scripts/pipeline.py -n                # dry run
+    python scripts/pipeline.py -j4 --force tex_v9
+    python scripts/pipeline.py list
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time as timer
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+STATE_FILE = ROOT / 'results' / '.pipeline_state.json'
+LOG_DIR = ROOT / 'results' / 'pipeline_logs'
+
+PY = sys.executable
+KYH = [f'ground_motion_dask/KYH{k}.txt' for k in (1, 2, 3)]
+TORSION = 'analysis/torsional_irregularity'
+TEX_TABLES = ['afad_spectrum_dd2', 'spectrum_key_points', 'tower1_nodes_xz',
+              'tower1_columns', 'tower1_beams', 'tower1_braces',
+              'modal_results', 'torsion_check', 'drift_results']
+
+
+# ============================================================
+# STAGES
+# ============================================================
+
+@dataclass
+class Stage:
+    """One producing command; paths are relative to the repo root."""
+    name: str
+    cmd: list
+    inputs: list
+    outputs: list
+    cwd: str = '.'
+    stdout: str = None        # capture stdout into this (output) file
+
+    def __post_init__(self):
+        if self.stdout:
+            self.outputs = list(self.outputs) + [self.stdout]
+
+    @property
+    def scripts(self):
+        """Command arguments that are source files (part of the recipe)."""
+        return [str(Path(self.cwd) / a) for a in self.cmd
+                if str(a).endswith(('.py', '.tcl'))]
+
+
+def model_versions():
+    """Versions with both model CSVs in data/ ('' = unsuffixed base)."""
+    out = []
+    for p in sorted(DATA.glob('twin_position_matrix*.csv')):
+        v = p.stem[len('twin_position_matrix'):].lstrip('_')
+        if (DATA / f"twin_connectivity_matrix{'_' + v if v else ''}.csv").exists():
+            out.append(v)
+    return [v for v in out if v]
+
+
+def model_inputs(v):
+    return [f'data/twin_position_matrix_{v}.csv', f'data/twin_connectivity_matrix_{v}.csv']
+
+
+def default_stages(versions=None):
+    """The repo's results → report graph."""
+    versions = model_versions() if versions is None else versions
+    fm = ['scripts/frame_model.py']
+    stages = []
+    for v in versions:
+        stages += [
+            Stage(f'topology_{v}', [PY, 'scripts/topology_check.py', v, 'save'],
+                  model_inputs(v) + fm, [f'data/twin_adjacency_{v}.npz']),
+            Stage(f'frf_{v}', [PY, 'scripts/frequency_response.py', v],
+                  model_inputs(v) + KYH + fm + ['scripts/ground_motion_im.py'],
+                  [f'results/frf_screening_{v}.csv']),
+            Stage(f'tex_{v}', [PY, 'scripts/tex_export.py', v, f'tex/data/{v}'],
+                  model_inputs(v) + KYH + fm + ['scripts/frequency_response.py',
+                                                'scripts/ground_motion_im.py'],
+                  [f'tex/data/{v}/*.tsv']),
+        ]
+    stages += [
+        Stage('gm_im', [PY, 'scripts/ground_motion_im.py'], KYH + ['scripts/sdof_response.py'],
+              ['results/ground_motion_im.csv']),
+        Stage('rotd', [PY, 'scripts/rotd_spectra.py'],
+              KYH + ['scripts/sdof_response.py', 'scripts/ground_motion_im.py'],
+              [f'results/rotd_KYH{k}.csv' for k in (1, 2, 3)]),
+        Stage('tex_data', [PY, 'scripts/export_tex_data.py'],
+              model_inputs('v9') + ['scripts/tex_export.py'],
+              [f'tex/data/{t}.tsv' for t in TEX_TABLES]),
+        Stage('damping_sweep', [PY, 'damping_sweep.py'],
+              [f'{TORSION}/twin_position_matrix_v9.csv',
+               f'{TORSION}/twin_connectivity_matrix_v9.csv', KYH[0],
+               'scripts/frame_model.py', 'scripts/sdof_response.py'],
+              [f'{TORSION}/results/damping_study/*.csv'], cwd=TORSION),
+        Stage('th_v10', [PY, 'scripts/full_analysis_v10.py'],
+              model_inputs('v10') + KYH + ['ground_motion/BOL090.AT2',
+                                           'scripts/ground_motion_im.py',
+                                           'scripts/topology_check.py',
+                                           'scripts/frame_model.py'],
+              ['results/full_analysis_v10_summary.json', 'results/full_analysis_v10_full.json',
+               'results/time_history_summary_v10.csv', 'results/pushover_*_v10.csv']),
+        Stage('dxf_v10', [PY, 'scripts/export_v10_autocad.py'], model_inputs('v10'),
+              ['exports/twin_towers_v10_*.dxf']),
+        Stage('excel', [PY, 'scripts/area_calculator_excel.py'], model_inputs('v10e'),
+              ['DASK2026_Alan_Hesabi.xlsx']),
+        # V9 Tcl time histories → joint envelopes → damage / fragility
+        Stage('th_tcl', ['OpenSees', 'advanced_time_history_dask.tcl'],
+              [f'{TORSION}/tbdy2018_torsion_analysis_trimmed.tcl'] + KYH,
+              [f'{TORSION}/results/th_KYH{k}/element_forces/{f}'
+               for k in (1, 2, 3)
+               for f in ('sample_forces.txt', 'all_forces.txt', 'frame_elements.txt')],
+              cwd=TORSION),
+        Stage('joint_demand', [PY, 'joint_demand.py'],
+              [f'{TORSION}/results/th_KYH{k}/element_forces/{f}'
+               for k in (1, 2, 3) for f in ('all_forces.txt', 'frame_elements.txt')]
+              + [f'{TORSION}/twin_position_matrix_v9.csv',
+                 f'{TORSION}/twin_connectivity_matrix_v9.csv'],
+              [f'{TORSION}/results/joint_demand/*.csv'], cwd=TORSION),
+        Stage('damage', [PY, f'{TORSION}/damage_assessment.py'],
+              [f'{TORSION}/results/th_KYH1/element_forces/sample_forces.txt'],
+              [f'{TORSION}/results/th_KYH1/element_forces/damage_assessment_summary.txt']),
+        Stage('fragility', [PY, f'{TORSION}/fragility_advanced.py'],
+              [f'{TORSION}/results/th_KYH{k}/element_forces/sample_forces.txt'
+               for k in (1, 2, 3)], [],
+              stdout=f'{TORSION}/results/fragility_advanced.txt'),
+        Stage('report', ['latexmk', '-pdf', '-interaction=nonstopmode', 'rapor.tex'],
+              ['tex/rapor.tex'] + [f'tex/data/{t}.tsv' for t in TEX_TABLES],
+              ['tex/rapor.pdf'], cwd='tex'),
+    ]
+    return stages
+
+
+# ============================================================
+# GRAPH
+# ============================================================
+
+def _match(a, b):
+    """Two path patterns can name the same file (glob per path part)."""
+    pa, pb = Path(a).parts, Path(b).parts
+    return len(pa) == len(pb) and all(fnmatch(x, y) or fnmatch(y, x)
+                                      for x, y in zip(pa, pb))
+
+
+def build_graph(stages):
+    """upstream[name] = set of stage names producing any of its inputs."""
+    by_name = {s.name: s for s in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("duplicate stage names")
+    owner = {}
+    for s in stages:
+        for o in s.outputs:
+            for other, pats in owner.items():
+                if any(_match(o, p) for p in pats):
+                    raise ValueError(f"{s.name} and {other} both write {o}")
+        owner[s.name] = list(s.outputs)
+    upstream = {s.name: {n for n, outs in owner.items() if n != s.name and
+                         any(_match(i, o) for i in s.inputs + s.scripts for o in outs)}
+                for s in stages}
+    order = topological_order(upstream)
+    return by_name, upstream, order
+
+
+def topological_order(upstream):
+    order, state = [], {}
+
+    def visit(n, path):
+        if state.get(n) == 'done':
+            return
+        if state.get(n) == 'active':
+            raise ValueError(f"cycle: {' -> '.join(path + [n])}")
+        state[n] = 'active'
+        for u in sorted(upstream[n]):
+            visit(u, path + [n])
+        state[n] = 'done'
+        order.append(n)
+
+    for n in sorted(upstream):
+        visit(n, [])
+    return order
+
+
+def closure(targets, upstream):
+    """Targets plus everything they depend on."""
+    need, todo = set(), list(targets)
+    while todo:
+        n = todo.pop()
+        if n not in need:
+            need.add(n)
+            todo.extend(upstream[n])
+    return need
+
+
+# ============================================================
+# CONTENT HASHES
+# ============================================================
+
+class Hasher:
+    """sha1 of files, reused while (size, mtime) is unchanged."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def file(self, rel):
+        p = ROOT / rel
+        st = p.stat()
+        key = [st.st_size, st.st_mtime_ns]
+        hit = self.cache.get(rel)
+        if hit and hit[:2] == key:
+            return hit[2]
+        h = hashlib.sha1(p.read_bytes()).hexdigest()
+        self.cache[rel] = key + [h]
+        return h
+
+    def expand(self, patterns):
+        files = set()
+        for pat in patterns:
+            if any(c in pat for c in '*?['):
+                files.update(str(p.relative_to(ROOT)) for p in ROOT.glob(pat) if p.is_file())
+            elif (ROOT / pat).is_file():
+                files.add(pat)
+        return sorted(files)
+
+    def files(self, patterns):
+        """{path: sha1} for all existing files matching the patterns."""
+        return {f: self.file(f) for f in self.expand(patterns)}
+
+    def stage_key(self, s):
+        """Inputs + recipe (command and script sources)."""
+        h = hashlib.sha1(json.dumps([s.cmd[1:], s.cwd, s.stdout]).encode())
+        for f, d in self.files(s.inputs + s.scripts).items():
+            h.update(f'{f}:{d}\n'.encode())
+        missing = [p for p in s.inputs if not self.expand([p])]
+        h.update(json.dumps(missing).encode())
+        return h.hexdigest()
+
+
+def load_state(path=STATE_FILE):
+    if path.exists():
+        return json.loads(path.read_text())
+    return {'stages': {}, 'files': {}}
+
+
+def save_state(state, path=STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(state, indent=1, sort_keys=True))
+
+
+def up_to_date(s, hasher, state):
+    """True if the recorded run of this stage is still valid."""
+    rec = state['stages'].get(s.name)
+    if rec is None or rec['key'] != hasher.stage_key(s):
+        return False
+    return hasher.files(s.outputs) == rec['outputs'] and bool(rec['outputs']) == bool(s.outputs)
+
+
+# ============================================================
+# EXECUTION
+# ============================================================
+
+def run_stage(s):
+    """Run one stage; returns (ok, seconds, log path)."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log = LOG_DIR / f'{s.name}.log'
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONIOENCODING='utf-8')
+    t0 = timer.time()
+    try:
+        proc = subprocess.run(s.cmd, cwd=ROOT / s.cwd, env=env, capture_output=True,
+                              text=True)
+        ok = proc.returncode == 0
+        out, err = proc.stdout, proc.stderr
+    except OSError as e:
+        ok, out, err = False, '', str(e)
+    log.write_text(out + ('\n--- stderr ---\n' + err if err else ''))
+    if ok and s.stdout:
+        (ROOT / s.stdout).parent.mkdir(parents=True, exist_ok=True)
+        (ROOT / s.stdout).write_text(out)
+    return ok, timer.time() - t0, log
+
+
+def build(stages, targets=None, jobs=None, force=(), dry_run=False):
+    """
+    Bring targets (default: all stages) up to date. force: stage names
+    rebuilt regardless of hashes. Returns {name: status}.
+    """
+    by_name, upstream, order = build_graph(stages)
+    unknown = set(targets or ()) - set(by_name)
+    if unknown:
+        raise KeyError(f"unknown stages: {sorted(unknown)}")
+    need = closure(targets or by_name, upstream)
+
+    state = load_state()
+    hasher = Hasher(state['files'])
+    status = {}
+    pending = [n for n in order if n in need]
+
+    def ready(n):
+        return all(status.get(u) in ('skip', 'built') for u in upstream[n] if u in need)
+
+    def blocked(n):
+        return any(status.get(u) in ('failed', 'blocked') for u in upstream[n])
+
+    if dry_run:
+        for n in pending:
+            if blocked(n) or any(status[u] in ('stale', 'after upstream') for u in upstream[n]):
+                status[n] = 'after upstream'
+            else:
+                status[n] = ('skip' if n not in force and up_to_date(by_name[n], hasher, state)
+                             else 'stale')
+        save_state(state)
+        return status
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        running = {}
+        while pending or running:
+            for n in list(pending):
+                if blocked(n):
+                    status[n] = 'blocked'
+                    pending.remove(n)
+                elif ready(n):
+                    pending.remove(n)
+                    s = by_name[n]
+                    if n not in force and up_to_date(s, hasher, state):
+                        status[n] = 'skip'
+                        print(f"  [skip]    {n}")
+                        continue
+                    print(f"  [run]     {n}: {' '.join(map(str, s.cmd[1:] or s.cmd))}")
+                    running[pool.submit(run_stage, s)] = n
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n = running.pop(fut)
+                s = by_name[n]
+                ok, el, log = fut.result()
+                if ok:
+                    state['stages'][n] = {'key': hasher.stage_key(s),
+                                          'outputs': hasher.files(s.outputs)}
+                    status[n] = 'built'
+                    print(f"  [built]   {n} ({el:.1f}s)")
+                else:
+                    state['stages'].pop(n, None)
+                    status[n] = 'failed'
+                    print(f"  [FAILED]  {n} ({el:.1f}s) — see {log.relative_to(ROOT)}")
+                save_state(state)
+    save_state(state)
+    return status
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    args = sys.argv[1:]
+    jobs = next((int(a[2:]) for a in args if a.startswith('-j') and a[2:]), None)
+    dry_run = '-n' in args or '--dry-run' in args
+    force_all = '--force' in args
+    targets = [a for a in args if not a.startswith('-')]
+
+    stages = default_stages()
+    if targets == ['list']:
+        _, upstream, order = build_graph(stages)
+        for n in order:
+            dep = ', '.join(sorted(upstream[n])) or '-'
+            print(f"  {n:<18} <- {dep}")
+        return
+
+    print("=" * 70)
+    print(f"PIPELINE — {len(stages)} stages, targets: {' '.join(targets) or 'all'}"
+          f"{' (dry run)' if dry_run else ''}")
+    print("=" * 70)
+    t0 = timer.time()
+    force = set(targets or (s.name for s in stages)) if force_all else set()
+    status = build(stages, targets or None, jobs, force, dry_run)
+
+    counts = {}
+    for n, st in status.items():
+        counts.setdefault(st, []).append(n)
+    if dry_run:
+        for st in ('stale', 'after upstream', 'skip'):
+            if counts.get(st):
+                print(f"  {st:<15} {' '.join(counts[st])}")
+    print("\n  " + ', '.join(f"{len(v)} {k}" for k, v in sorted(counts.items()))
+          + f"  ({timer.time() - t0:.1f}s)")
+    sys.exit(1 if counts.get('failed') else 0)
+
+
+if __name__ == "__main__":
+    main()
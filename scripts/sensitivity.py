@@ -0,0 +1,265 @@
+"""
+ANALYTIC SENSITIVITIES (EIGEN + ADJOINT)
+========================================
+Derivatives of periods, story drifts and η_bi with respect to member
+properties and floor masses, for every element at once:
+
+- parameters: relative factors p on each element's E·A, E·I (both
+  axes) and G·J — K = Σ p_e K_e, so dK/dp_e is the element matrix
+  itself; brace areas are the E·A factors of brace members; a member
+  doubled up ("multiplicity") is the sum of the three
+- eigenvalues (mass-normalized φ): dλ/dp_e = φ_eᵀ K_e φ_e,
+  dλ/dm_f = −λ φᵀ (dM/dm_f) φ; dT = −T/(2λ) dλ — no extra solve
+- static responses r = cᵀu, K u = P (ESL load of static_checks.py):
+  one adjoint solve K a = c per response, then
+  dr/dp_e = −a_eᵀ K_e u_e for all elements and properties
+- η_bi = Δmax/Δavg of the governing story: two adjoint solves (edge
+  drifts), chain rule through the ratio
+- drift: the largest edge drift ratio over stories, edges and ±ecc
+  cases (as static_checks.drift_check) gets its own adjoint solve — it
+  is rarely at the η_bi story
+- element derivatives are summed into groups (type × floor by default)
+  and ranked by effect per gram of added balsa
+
+The ESL load is held fixed (the V(T1) dependence is not differentiated).
+
+Usage:
+    python scripts/sensitivity.py [version]
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+from scipy import sparse
+
+import frame_model as fm
+import static_checks as sc
+from tex_export import edge_nodes
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+PROPERTIES = ('EA', 'EI', 'GJ')
+
+
+# ============================================================
+# BUILDING BLOCKS
+# ============================================================
+
+def property_matrices(model):
+    """Element matrices per property, (ne, 12, 12) each; they sum to K_e."""
+    z = np.zeros(model.n_elem)
+    return {'EA': fm.element_stiffness(model, EIy=z, EIz=z, GJ=z),
+            'EI': fm.element_stiffness(model, EA=z, GJ=z),
+            'GJ': fm.element_stiffness(model, EA=z, EIy=z, EIz=z)}
+
+
+def element_vectors(model, free, v):
+    """Free-DOF vector(s) gathered per element, (ne, 12[, k])."""
+    v = np.asarray(v)
+    full = np.zeros((model.ndof,) + v.shape[1:])
+    full[free] = v
+    return full[model.elem_dofs]
+
+
+def floor_mass_operator(model, free):
+    """(n_free, n_floors) diagonal of dM/dm_f per kg added on floor f."""
+    rows, cols, vals = [], [], []
+    pos = np.full(model.ndof, -1)
+    pos[free] = np.arange(len(free))
+    for j, f in enumerate(model.floors):
+        nodes = model.floor_nodes(f)
+        g = pos[(nodes[:, None] * fm.NDF + np.arange(3)).ravel()]
+        g = g[g >= 0]
+        rows.append(g)
+        cols.append(np.full(len(g), j))
+        vals.append(np.full(len(g), 1e-3 / len(nodes)))
+    return sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(len(free), len(model.floors)))
+
+
+def group_codes(model, by='floor'):
+    """Group index per element and labels: type × floor ('floor') or type only."""
+    keys = pd.DataFrame({'type': model.etype})
+    if by == 'floor':
+        keys['floor'] = sc.element_floor(model)
+    codes, uniq = pd.factorize(pd.MultiIndex.from_frame(keys), sort=True)
+    return codes, pd.DataFrame(list(uniq), columns=keys.columns)
+
+
+def aggregate(codes, d, n_groups):
+    """Sum element derivatives (ne, ...) into groups (n_groups, ...)."""
+    d = np.asarray(d)
+    flat = d.reshape(len(d), -1)
+    out = np.stack([np.bincount(codes, weights=c, minlength=n_groups) for c in flat.T], axis=1)
+    return out.reshape((n_groups,) + d.shape[1:])
+
+
+# ============================================================
+# SENSITIVITIES
+# ============================================================
+
+def eigen_sensitivities(model, modes, kes):
+    """
+    dλ_n/dp_e per property (ne, n_modes) and dλ_n/dm_f [per kg]
+    (n_floors, n_modes), from the mass-normalized modes.
+    """
+    U = element_vectors(model, modes['free'], modes['phi'])
+    d = {k: np.einsum('eim,eij,ejm->em', U, ke, U, optimize=True) for k, ke in kes.items()}
+    lam = modes['omega']**2
+    Mf = floor_mass_operator(model, modes['free'])
+    d_mass = -(Mf.T @ modes['phi']**2) * lam
+    return d, d_mass
+
+
+def period_sensitivity(modes, dlam):
+    """dT_n from dλ_n (any leading shape)."""
+    lam = modes['omega']**2
+    return -modes['T'] / (2 * lam) * dlam
+
+
+def adjoint_sensitivities(model, solve, free, kes, P, C):
+    """
+    Responses r = C u with K u = P, and dr/dp_e per property
+    (ne, n_resp): one solve for u plus one adjoint solve per row of C.
+    """
+    C = sparse.csr_matrix(C)
+    u = solve(P)
+    A = np.column_stack([solve(c) for c in C.toarray()])
+    ue = element_vectors(model, free, u)
+    Ae = element_vectors(model, free, A)
+    d = {k: -np.einsum('eir,eij,ej->er', Ae, ke, ue, optimize=True) for k, ke in kes.items()}
+    return C @ u, d
+
+
+def torsion_sensitivity(model, solve, free, kes, direction='X', ecc=sc.ECC, V=1.0):
+    """
+    Governing η_bi and governing story drift ratio (over ±ecc), each at
+    its own story and load case, with their derivatives per property
+    (ne,). Two adjoint solves for η_bi, one more for the drift.
+    """
+    k = 'XY'.index(direction)
+    lo, hi = edge_nodes(model, axis=1 - k)
+    ops = [fm.floor_operator(model, free, dof=k, nodes_by_floor=e) for e in (lo, hi)]
+    z = np.array([model.xyz[model.floor_nodes(f), 2].max() for f in model.floors])
+    h = np.diff(z)
+    best, worst = None, None
+    for e in (ecc, -ecc):
+        P = sc.lateral_loads(model, free, direction, e, V)
+        u = solve(P)
+        D = np.stack([np.diff(op @ u) for op in ops])                   # (2, n_story)
+        a = np.abs(D)
+        eta = a.max(axis=0) / a.mean(axis=0)
+        s = int(eta.argmax())
+        if best is None or eta[s] > best[0]:
+            best = (eta[s], s, P, D[:, s])
+        r = a / h
+        g, t = np.unravel_index(r.argmax(), r.shape)
+        if worst is None or r[g, t] > worst[0]:
+            worst = (r[g, t], int(g), int(t), P, np.sign(D[g, t]))
+    eta, s, P, Ds = best
+    C = sparse.vstack([op[s + 1] - op[s] for op in ops])
+    _, dD = adjoint_sensitivities(model, solve, free, kes, P, C)
+    sgn = np.sign(Ds)
+    g = int(np.abs(Ds).argmax())
+    lo_, hi_ = np.abs(Ds)
+    drift, ge, t, Pd, sgn_d = worst
+    _, dR = adjoint_sensitivities(model, solve, free, kes, Pd, ops[ge][t + 1] - ops[ge][t])
+    out = {'story': int(model.floors[s + 1]), 'eta_bi': float(eta),
+           'drift_story': int(model.floors[t + 1]), 'drift_ratio': float(drift),
+           'd_eta': {}, 'd_drift': {}}
+    for p, d in dD.items():
+        da = d * sgn                                                    # d|Δ|
+        out['d_eta'][p] = 2 * (da[:, g] * (lo_ + hi_) - np.abs(Ds)[g] * da.sum(axis=1)) \
+            / (lo_ + hi_)**2
+        out['d_drift'][p] = dR[p][:, 0] * sgn_d / h[t]
+    return out
+
+
+# ============================================================
+# RANKING
+# ============================================================
+
+def sensitivity_table(model, n_modes=3, by='floor'):
+    """
+    Group table: weight and the effect of doubling each group (first
+    order, multiplicity p: 1 → 2) on T1, max η_bi and drift, X and Y.
+    """
+    K, m_diag, free = fm.system_matrices(model)
+    op = fm.banded_inverse(K)
+    solve = op.matvec if op is not None else sc.factorize(K)
+    modes = fm.modal(model, n_modes, K, m_diag, free, OPinv=op)
+    kes = property_matrices(model)
+    V = sc.base_shear(model, modes['T'][0])
+
+    codes, tab = group_codes(model, by)
+    ng = len(tab)
+    tab['n_elem'] = np.bincount(codes, minlength=ng)
+    w = model.length * model.A * sc.BALSA_DENSITY * 1000                 # g
+    tab['weight_g'] = np.bincount(codes, weights=w, minlength=ng)
+
+    dlam, dlam_m = eigen_sensitivities(model, modes, kes)
+    for p in PROPERTIES:
+        tab[f'dT1_{p}'] = aggregate(codes, period_sensitivity(modes, dlam[p])[:, 0], ng)
+    tab['dT1'] = tab[[f'dT1_{p}' for p in PROPERTIES]].sum(axis=1)
+    for d in 'XY':
+        t = torsion_sensitivity(model, solve, free, kes, d, V=V)
+        tab[f'deta_{d}'] = aggregate(codes, sum(t['d_eta'].values()), ng)
+        tab[f'ddrift_{d}'] = aggregate(codes, sum(t['d_drift'].values()), ng)
+        tab.attrs[d] = t
+    tab['dT1_per_g'] = tab['dT1'] / tab['weight_g']
+    tab.attrs['modes'] = modes
+    tab.attrs['dT1_mass'] = pd.Series(period_sensitivity(modes, dlam_m)[:, 0] / 1000,
+                                      index=model.floors, name='dT1_per_g')
+    return tab.sort_values('dT1_per_g').reset_index(drop=True)
+
+
+def finite_difference_T1(model, codes, group, h=1e-4):
+    """T1 derivative of one group's multiplicity by central differences."""
+    T = []
+    for s in (1 + h, 1 - h):
+        f = np.where(codes == group, s, 1.0)
+        K, m_diag, free = fm.system_matrices(model, f)
+        T.append(fm.modal(model, 1, K, m_diag, free)['T'][0])
+    return (T[0] - T[1]) / (2 * h)
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else 'v10'
+    model = fm.load_model(version)
+    print("=" * 70)
+    print(f"ANALYTIC SENSITIVITIES — {version}")
+    print("=" * 70)
+    tab = sensitivity_table(model)
+    modes = tab.attrs['modes']
+    print(f"  T1 = {modes['T'][0]:.4f}s, T2 = {modes['T'][1]:.4f}s")
+    for d in 'XY':
+        t = tab.attrs[d]
+        print(f"  {d}: η_bi = {t['eta_bi']:.3f} (story {t['story']}), "
+              f"max drift = {t['drift_ratio']*100:.3f}% (story {t['drift_story']})")
+
+    # first-order check against a re-analysis for the most effective group
+    codes, labels = group_codes(model)
+    top = tab.iloc[0]
+    g = int(np.flatnonzero((labels['type'] == top['type']) & (labels['floor'] == top['floor']))[0])
+    fd = finite_difference_T1(model, codes, g)
+    print(f"  Check dT1/dp [{top['type']} @ floor {top['floor']}]: "
+          f"analytic {top['dT1']:.4e}, finite difference {fd:.4e}")
+
+    dm = tab.attrs['dT1_mass']
+    top_m = dm.abs().sort_values(ascending=False).index[:3]
+    print("  dT1 per gram of floor mass: " +
+          ", ".join(f"floor {f}: {dm[f]:.2e} s" for f in top_m))
+
+    print("\n  Most effective groups for T1 (per gram of added balsa):")
+    cols = ['type', 'floor', 'n_elem', 'weight_g', 'dT1', 'dT1_per_g', 'deta_X', 'deta_Y']
+    print(tab[cols].head(12).to_string(index=False, float_format='%.3e'))
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f'sensitivity_{version}.csv'
+    tab.to_csv(out, index=False)
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
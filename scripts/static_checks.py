@@ -0,0 +1,163 @@
+"""
+STATIC DESIGN CHECKS (SPARSE FRAME MODEL)
+=========================================
+Equivalent-lateral-load checks on frame_model.py models, shared by the
+analysis service and the optimizers:
+
+- lateral load ∝ m·z (inverted triangle, as run_pushover), scaled to
+  the TBDY base shear V = W·Sae(T1)/Ra, with ±5% accidental
+  eccentricity applied per floor as a couple about the floor's centre
+  of mass
+- story drift ratios of the two plan edges normal to the load and the
+  A1a torsional irregularity η_bi = Δmax/Δavg (as eccentricity_v10.py,
+  but edge-based like tex_export.torsion_table)
+- member weight: balsa 160 kg/m³ × 6 mm × 6 mm section × length
+
+Members can be switched off through an element mask ("what if the
+floor-10 braces go"): the stiffness is re-assembled with zero factors,
+the model arrays are untouched.
+
+Usage:
+    python scripts/static_checks.py [version] [--calibrated]
+"""
+
+import numpy as np
+import sys
+from scipy.sparse.linalg import splu
+
+import frame_model as fm
+from tex_export import design_spectrum, edge_nodes, spectrum_params
+
+G = 9.81
+BALSA_DENSITY = 160.0      # kg/m³
+WEIGHT_LIMIT_KG = 1.40     # stiffening_analysis.py
+ECC = 0.05                 # accidental eccentricity (TBDY 4.5.9)
+ETA_LIMIT = 1.2            # A1a irregularity
+ETA_MAX = 1.4
+DRIFT_LIMIT = 0.008        # elastic story drift ratio
+
+
+# ============================================================
+# MEMBER SELECTION / WEIGHT
+# ============================================================
+
+def element_floor(model):
+    """Upper floor of each element (braces and columns belong to the story below)."""
+    return np.maximum(model.floor[model.ei], model.floor[model.ej])
+
+
+def element_mask(model, spec):
+    """
+    Elements matching 'type[,type...]@floor[,floor...]', e.g.
+    'brace_xz@10', 'brace_xz,brace_yz', '@10,11'. Empty spec -> none.
+    """
+    mask = np.zeros(model.n_elem, dtype=bool)
+    for part in filter(None, (spec or '').split(';')):
+        types, _, floors = part.partition('@')
+        sel = np.ones(model.n_elem, dtype=bool)
+        if types:
+            sel &= np.isin(model.etype, types.split(','))
+        if floors:
+            sel &= np.isin(element_floor(model), [int(f) for f in floors.split(',')])
+        mask |= sel
+    return mask
+
+
+def member_weight_kg(model, active=None):
+    """Balsa weight of the (active) members."""
+    w = model.length * model.A * BALSA_DENSITY
+    return float(w.sum() if active is None else w[active].sum())
+
+
+# ============================================================
+# STATIC SOLVE
+# ============================================================
+
+def factorize(K):
+    """x = solve(b) for reduced K: banded Cholesky, SuperLU if the band is too wide."""
+    op = fm.banded_inverse(K)
+    if op is not None:
+        return op.matvec
+    try:
+        return splu(K.tocsc()).solve
+    except RuntimeError as e:
+        raise ValueError(f"stiffness matrix is singular ({e}) — mechanism?") from None
+
+
+def base_shear(model, T1, Ra=1.0, params=None):
+    """TBDY equivalent base shear [kN] for the model's mass."""
+    return float(model.mass.sum() * G * design_spectrum([T1], params)[0] / Ra)
+
+
+def lateral_loads(model, free, direction='X', ecc=0.0, V=1.0):
+    """
+    Reduced load vector: ∝ m·z per floor, total V, plus the couple
+    ecc·L·F_f about each floor's mass centre (L = plan size normal to
+    the load) distributed ∝ m·r.
+    """
+    k = 'XY'.index(direction)
+    m, xyz = model.mass, model.xyz
+    P = np.zeros(model.ndof)
+    floors = model.floors[model.floors > 0]
+    Mz = np.array([m[model.floor_nodes(f)].sum() * xyz[model.floor_nodes(f), 2].max()
+                   for f in floors])
+    for f, F in zip(floors, V * Mz / Mz.sum()):
+        nodes = model.floor_nodes(f)
+        mn = m[nodes]
+        r = xyz[nodes, 1 - k]
+        r = r - (mn * r).sum() / mn.sum()
+        f_n = F * mn / mn.sum()
+        if ecc:
+            f_n += ecc * np.ptp(r) * F * mn * r / (mn * r**2).sum()
+        P[nodes * fm.NDF + k] = f_n
+    return P[free]
+
+
+def drift_check(model, solve, free, direction='X', ecc=ECC, V=1.0):
+    """
+    Edge story drifts under +ecc and −ecc load cases (envelope).
+    Returns dict: floor, drift_ratio (max edge), eta_bi, roof_disp [m].
+    """
+    k = 'XY'.index(direction)
+    lo, hi = edge_nodes(model, axis=1 - k)
+    ops = [fm.floor_operator(model, free, dof=k, nodes_by_floor=e) for e in (lo, hi)]
+    P = np.column_stack([lateral_loads(model, free, direction, e, V)
+                         for e in ((ecc, -ecc) if ecc else (0.0,))])
+    U = np.column_stack([solve(p) for p in P.T])
+    edge = np.stack([np.abs(np.diff(op @ U, axis=0)) for op in ops])   # (2, n_story, n_case)
+    z = np.array([model.xyz[model.floor_nodes(f), 2].max() for f in model.floors])
+    h = np.diff(z)[:, None]
+    d_max, d_avg = edge.max(axis=0), edge.mean(axis=0)
+    eta = d_max / np.where(d_avg > 0, d_avg, 1.0)
+    roof = np.stack([op @ U for op in ops])[:, -1].mean(axis=0)
+    return {'floor': model.floors[1:], 'drift_ratio': (d_max / h).max(axis=1),
+            'eta_bi': eta.max(axis=1), 'roof_disp': float(np.abs(roof).max())}
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    model = fm.load_model(version, calibrated='--calibrated' in args)
+    K, m_diag, free = fm.system_matrices(model)
+    solve = factorize(K)
+    T1 = fm.modal(model, 1, K, m_diag, free)['T'][0]
+    V = base_shear(model, T1)
+
+    print("=" * 70)
+    print(f"STATIC CHECKS — {version}")
+    print("=" * 70)
+    sds, sd1, ta, tb, _ = spectrum_params()
+    print(f"  T1 = {T1:.4f}s, Sae(T1) = {design_spectrum([T1])[0]:.3f}g "
+          f"(TA={ta:.3f}, TB={tb:.3f}), V = {V*1000:.2f} N")
+    w = member_weight_kg(model)
+    print(f"  Member weight: {w:.3f} kg (limit {WEIGHT_LIMIT_KG:.2f} kg)")
+    for d in 'XY':
+        r = drift_check(model, solve, free, d, V=V)
+        j, i = int(r['eta_bi'].argmax()), int(r['drift_ratio'].argmax())
+        print(f"  {d}: max η_bi = {r['eta_bi'][j]:.3f} (floor {r['floor'][j]}), "
+              f"max drift = {r['drift_ratio'][i]*100:.3f}% (floor {r['floor'][i]}), "
+              f"roof = {r['roof_disp']*100:.3f} cm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+STIFFNESS CALIBRATION AGAINST FREE-VIBRATION TESTS
+==================================================
+Fits a few global model parameters to measured periods and mode-shape
+ratios, replacing the hand calibration of modal_analysis_calibrated.py
+(E = 350 × (0.139/0.20)² from T ∝ 1/√E):
+
+- parameters (log factors on the frame_model.py defaults): E_factor
+  (E and G of all members), joint_factor (frame-member I — rotational
+  flexibility of the glued joints), brace_factor (truss E·A — brace
+  end effectiveness), mass_factor (lumped masses)
+- measurements (JSON): per mode a period, optionally the direction
+  (X/Y) and floor/roof amplitude ratios of the floor-averaged mode
+  shape, e.g.
+      {"modes": [{"direction": "X", "T": 0.20, "shape": {"12": 0.55}}]}
+  measured modes are matched to the model's X- or Y-dominant modes in
+  period order
+- residuals: ln(T/T_meas) (σ = 1%), shape ratio error (σ = 0.05) and a
+  Gaussian prior on each log factor — periods only see E/mass, so the
+  prior is what splits a period shift between stiffness and mass
+- Jacobian without re-analysis: dλ from sensitivity.eigen_sensitivities
+  summed per parameter group, dλ/dlnE = λ, dλ/dlnm = −λ; shape
+  derivatives by modal expansion over the computed modes plus a
+  static correction for the rest (back-substitutions with the factor
+  already used by the eigen solve; E and mass factors leave the shapes
+  unchanged)
+- trust-region least squares (scipy TRF, bounded); the eigen solution
+  is cached per parameter vector so residuals and Jacobian of one
+  iterate share a single eigen solve
+
+The fitted factors are written to data/model_calibration.json, which
+frame_model.load_model(version, calibrated=True) applies.
+
+Usage:
+    python scripts/stiffness_calibration.py [version] [--measured=test.json]
+"""
+
+import json
+import sys
+import time as timer
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import least_squares
+
+import frame_model as fm
+import static_checks as sc
+from sensitivity import eigen_sensitivities, property_matrices
+
+ROOT = Path(__file__).parent.parent
+
+PARAMS = fm.CALIBRATION_KEYS
+# prior (centre, σ of the log factor) and bounds per parameter
+PRIOR = {'E_factor': (1.0, 1.0), 'joint_factor': (1.0, 0.5),
+         'brace_factor': (1.0, 0.5), 'mass_factor': (1.0, 0.02)}
+BOUNDS = {'E_factor': (0.01, 2.0), 'joint_factor': (0.01, 2.0),
+          'brace_factor': (0.05, 2.0), 'mass_factor': (0.8, 1.2)}
+SIGMA_T = 0.01             # ln T
+SIGMA_SHAPE = 0.05         # amplitude ratio
+N_MODES = 12
+
+# free-vibration test of modal_analysis_calibrated.py
+DEFAULT_TEST = {'source': 'free vibration test (modal_analysis_calibrated.py)',
+                'modes': [{'T': 0.20}]}                     # fundamental mode
+
+
+# ============================================================
+# MODEL
+# ============================================================
+
+class Calibration:
+    """Residuals and Jacobian of a measured modal data set."""
+
+    def __init__(self, model, measured, n_modes=N_MODES, prior=PRIOR):
+        self.model, self.n_modes = model, n_modes
+        self.measured = measured['modes']
+        self.kes = property_matrices(model)
+        self.free = fm.free_dofs(model)
+        self.m_diag = fm.mass_diagonal(model)[self.free]
+        self.ops = {d: fm.floor_operator(model, self.free, dof=k) for k, d in enumerate('XY')}
+        self.theta0 = np.log([prior[p][0] for p in PARAMS])
+        self.sigma0 = np.array([prior[p][1] for p in PARAMS])
+        self.n_solves = 0
+        self._cache = (None, None)
+
+    def factors(self, theta):
+        """Element factors on the EA, EI and GJ matrices, and the mass factor."""
+        e, j, b, mu = np.exp(theta)
+        t = self.model.truss
+        return {'EA': e * np.where(t, b, 1.0), 'EI': e * np.where(t, 1.0, j),
+                'GJ': np.full(len(t), e)}, mu
+
+    def solve(self, theta):
+        """
+        Modal solution at theta, the model mode matched to each
+        measurement, the element factors and a K⁻¹ solve.
+        """
+        key = np.asarray(theta, float).tobytes()
+        if self._cache[0] == key:
+            return self._cache[1]
+        f, mu = self.factors(theta)
+        K = sum(fm.assemble(self.model, self.kes[p], f[p]) for p in f)
+        K = K[self.free][:, self.free].tocsc()
+        op = fm.banded_inverse(K)
+        modes = fm.modal(self.model, self.n_modes, K, self.m_diag * mu, self.free, OPinv=op)
+        self.n_solves += 1
+        out = (modes, self.match(modes), f, op.matvec if op is not None else sc.factorize(K))
+        self._cache = (key, out)
+        return out
+
+    def match(self, modes):
+        """Model mode index per measured mode (k-th measured X mode = k-th X mode)."""
+        mr = modes['mass_ratio']
+        cand = {'X': np.flatnonzero((mr[:, 0] >= mr[:, 1]) & (mr[:, 0] > 0.01)),
+                'Y': np.flatnonzero((mr[:, 1] > mr[:, 0]) & (mr[:, 1] > 0.01))}
+        cand[None] = np.flatnonzero(mr.max(axis=1) > 0.01)
+        seen, idx = {}, []
+        for m in self.measured:
+            d = m.get('direction')
+            k = seen.get(d, 0)
+            seen[d] = k + 1
+            if k >= len(cand[d]):
+                raise ValueError(f"no model mode for measured mode {m} — increase n_modes")
+            idx.append(int(cand[d][k]))
+        return np.array(idx)
+
+    def shape_ratios(self, modes, n, m, phi=None):
+        """Floor/roof amplitude ratios of mode n for a measured mode's floors."""
+        op = self.ops[m.get('direction') or 'XY'[int(modes['mass_ratio'][n].argmax())]]
+        u = op @ (modes['phi'][:, n] if phi is None else phi)
+        floors = list(self.model.floors)
+        r = np.array([u[floors.index(int(f))] for f in m['shape']])
+        return r, u[-1]
+
+    def residuals(self, theta):
+        modes, idx = self.solve(theta)[:2]
+        r = []
+        for m, n in zip(self.measured, idx):
+            r.append(np.log(modes['T'][n] / m['T']) / SIGMA_T)
+        for m, n in zip(self.measured, idx):
+            if m.get('shape'):
+                u, roof = self.shape_ratios(modes, n, m)
+                r.extend((u / roof - np.array(list(m['shape'].values()))) / SIGMA_SHAPE)
+        r.extend((np.asarray(theta) - self.theta0) / self.sigma0)
+        return np.array(r)
+
+    def jacobian(self, theta):
+        modes, idx, f, solve = self.solve(theta)
+        t = self.model.truss
+        lam = modes['omega']**2
+        dlam, _ = eigen_sensitivities(self.model, modes, self.kes)
+        w = {'joint_factor': ('EI', np.where(t, 0.0, f['EI'])),
+             'brace_factor': ('EA', np.where(t, f['EA'], 0.0))}
+        D = np.column_stack([lam, w['joint_factor'][1] @ dlam['EI'],
+                             w['brace_factor'][1] @ dlam['EA'], -lam])       # (n_modes, 4)
+        J = [-D[n] / (2 * lam[n]) / SIGMA_T for n in idx]
+
+        shaped = [(m, n) for m, n in zip(self.measured, idx) if m.get('shape')]
+        if shaped:
+            phi, m_diag = modes['phi'], modes['m_diag']
+            dK = {p: fm.assemble(self.model, self.kes[k], wt)[self.free][:, self.free]
+                  for p, (k, wt) in w.items()}
+            for m, n in shaped:
+                u, roof = self.shape_ratios(modes, n, m)
+                rows = np.zeros((len(u), len(PARAMS)))
+                gap = lam[n] - lam
+                gap[n] = np.inf
+                for p, dKp in dK.items():
+                    f_n = dKp @ phi[:, n]
+                    c = phi.T @ f_n
+                    # computed modes by expansion, the rest to first order in λ_n/λ_m
+                    res = solve(f_n) - phi @ (c / lam)
+                    dphi = phi @ (c / gap) - res - lam[n] * solve(m_diag * res)
+                    du, droof = self.shape_ratios(modes, n, m, dphi)
+                    rows[:, PARAMS.index(p)] = (du - u / roof * droof) / roof
+                J.extend(rows / SIGMA_SHAPE)
+        J.extend(np.diag(1.0 / self.sigma0))
+        return np.array(J)
+
+    def fit(self, theta=None):
+        """Trust-region least squares; returns (factors, scipy result, covariance)."""
+        lb = np.log([BOUNDS[p][0] for p in PARAMS])
+        ub = np.log([BOUNDS[p][1] for p in PARAMS])
+        theta = np.clip(self.theta0 if theta is None else theta, lb + 1e-9, ub - 1e-9)
+        res = least_squares(self.residuals, theta, jac=self.jacobian, bounds=(lb, ub),
+                            method='trf', x_scale=1.0, xtol=1e-10, ftol=1e-12)
+        cov = np.linalg.pinv(res.jac.T @ res.jac)                            # log-factor covariance
+        return dict(zip(PARAMS, np.exp(res.x))), res, cov
+
+
+# ============================================================
+# I/O
+# ============================================================
+
+def load_measurements(path=None):
+    """Measured modes from a JSON file (DEFAULT_TEST if none is given)."""
+    if path is None:
+        return DEFAULT_TEST
+    data = json.loads(Path(path).read_text())
+    data.setdefault('source', str(path))
+    return data
+
+
+def write_calibration(version, factors, **info):
+    """Store a version's factors in fm.CALIBRATION_FILE (other versions kept)."""
+    f = fm.CALIBRATION_FILE
+    data = json.loads(f.read_text()) if f.exists() else {}
+    data[version or 'base'] = dict({k: round(float(v), 6) for k, v in factors.items()}, **info)
+    f.write_text(json.dumps(data, indent=2) + '\n')
+    return f
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    measured = load_measurements(opt.get('measured'))
+
+    print("=" * 70)
+    print(f"STIFFNESS CALIBRATION — {version}")
+    print("=" * 70)
+    print(f"  Measurements: {measured['source']}, {len(measured['modes'])} modes")
+    model = fm.load_model(version)
+    cal = Calibration(model, measured, n_modes=int(opt.get('modes', N_MODES)))
+    t0 = timer.time()
+    modes0, idx0 = cal.solve(cal.theta0)[:2]
+    factors, res, cov = cal.fit()
+    modes, idx = cal.solve(res.x)[:2]
+    dt = timer.time() - t0
+    print(f"  {res.nfev} residual / {res.njev} Jacobian evaluations, {cal.n_solves} eigen "
+          f"solves in {dt:.2f}s — {res.message}")
+
+    print(f"\n  {'parameter':<14} {'factor':>8} {'±1σ':>8}")
+    for k, p in enumerate(PARAMS):
+        s = np.sqrt(cov[k, k])
+        print(f"  {p:<14} {factors[p]:>8.4f} {factors[p] * (np.exp(s) - 1):>8.4f}")
+    print(f"  E = {fm.E_LONG / 1000 * factors['E_factor']:.0f} MPa "
+          f"(nominal {fm.E_LONG / 1000:.0f} MPa)")
+
+    print(f"\n  {'mode':>4} {'dir':>4} {'T_meas':>8} {'T_nominal':>10} {'T_calib':>8}")
+    for m, n0, n in zip(measured['modes'], idx0, idx):
+        print(f"  {n + 1:>4} {m.get('direction') or '-':>4} {m['T']:>8.4f} "
+              f"{modes0['T'][n0]:>10.4f} {modes['T'][n]:>8.4f}")
+        if m.get('shape'):
+            u, roof = cal.shape_ratios(modes, n, m)
+            for (f, r), v in zip(m['shape'].items(), u / roof):
+                print(f"       floor {f}: ratio measured {r:.3f}, calibrated {v:.3f}")
+
+    out = write_calibration(
+        version, factors, source=measured['source'],
+        T_calibrated=[round(float(modes['T'][n]), 5) for n in idx],
+        T_measured=[m['T'] for m in measured['modes']])
+    print(f"\n  Saved: {out.relative_to(ROOT)} (load_model('{version}', calibrated=True))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+GAUSSIAN-PROCESS SURROGATE FOR PEAK RESPONSES
+=============================================
+Microsecond predictions of peak time-history responses over the V9-V13
+families, material samples and record intensity, trained on stored
+analysis results and grown by active learning:
+
+- inputs: version, record (KYH1-3), direction, record scale, E [MPa],
+  damping ξ; mapped to features: ln T1 (nominal T1 of the version
+  scaled by √(E_nom/E)), ln Sa(T1, ξ) and ln PGA of the scaled record,
+  D5-95, ξ, member weight and brace count of the version, direction
+- outputs: peak story drift ratio, peak absolute roof acceleration [g],
+  ratio of the peak edge drifts (Δmax/Δavg, no accidental eccentricity
+  — not the A1a η_bi, which is an ESL check per version and has no
+  limit here), max member DCR (uncertainty.member_dcr, η_j = 0.35)
+- one GP per output on the log response: ARD Matérn-5/2 kernel,
+  hyperparameters by maximum marginal likelihood, closed-form
+  leave-one-out errors as the error estimate
+- the "full analysis" is a modal FRF time history (frequency_response)
+  with element forces from the modal coordinates; stored job-queue
+  frf_th results can be added as drift-only training rows
+- active learning: candidates from a Latin hypercube; next analyses by
+  maximum predictive variance, or with limits by the U criterion
+  |μ − ln limit|/σ (runs where the sign of the margin is uncertain);
+  batches are spread by conditioning σ on the points already picked
+- guarded queries: predictions with U < 2 near a limit fall back to a
+  full analysis
+
+Sa(T, ξ) of each record is tabulated once on a (ln T, ξ) grid, so a
+prediction needs no time stepping.
+
+Output: results/surrogate_train.csv (inputs and analysed responses,
+appended by every training run).
+
+Usage:
+    python scripts/surrogate.py train [--init=30] [--iter=6] [--batch=5] [--campaign=<name>]
+    python scripts/surrogate.py predict version=v10 record=KYH2 direction=X scale=1 E_MPa=3500 xi=0.05
+"""
+
+import sys
+import time as timer
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import fft, linalg
+from scipy.interpolate import RegularGridInterpolator
+from scipy.optimize import minimize
+from scipy.stats import qmc
+
+import frame_model as fm
+import static_checks as sc
+from frequency_response import ModalEngine, modal_frf, padded_length
+from ground_motion_im import G, GM_DASK, intensity_measures, load_dask_record, trim_record
+from sdof_response import response_spectrum
+from tex_export import edge_nodes
+from uncertainty import FORCE_COLS, member_dcr
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+TRAIN_FILE = RESULTS / 'surrogate_train.csv'
+
+VERSIONS = ('v9', 'v10', 'v11', 'v12', 'v13')
+RECORDS = ('KYH1', 'KYH2', 'KYH3')
+DIRECTIONS = ('X', 'Y')
+# continuous inputs: name -> (distribution, low, high)
+RANGES = {
+    'scale': ('loguniform', 0.25, 2.0),
+    'E_MPa': ('loguniform', 200.0, 3500.0),
+    'xi': ('uniform', 0.02, 0.05),
+}
+INPUTS = ('version', 'record', 'direction') + tuple(RANGES)
+OUTPUTS = ('max_drift', 'roof_acc_g', 'edge_ratio', 'max_dcr')
+LIMITS = {'max_drift': sc.DRIFT_LIMIT, 'max_dcr': 1.0}
+JOINT_EFF = 0.35
+U_GUARD = 2.0            # |margin|/σ below which a query is re-analysed
+MIN_MASS_RATIO = 1e-4
+N_PEAKS = 200            # per mode, instants at which member forces are evaluated
+
+
+# ============================================================
+# FEATURES
+# ============================================================
+
+@lru_cache(maxsize=None)
+def record_data(record):
+    """Trimmed record (acc [g], dt), IMs and the ln Sa(ln T, ξ) interpolant."""
+    _, a, dt = load_dask_record(GM_DASK / f'{record}.txt')
+    a, _, _ = trim_record(a, dt, T1=0.5, xi=0.02)          # longest period, lowest ξ sampled
+    T = np.exp(np.linspace(np.log(0.03), np.log(1.5), 60))
+    xis = np.linspace(0.02, 0.05, 4)
+    sa = response_spectrum(a, dt, T, xis)['PSA']           # (nξ, nT) in g
+    interp = RegularGridInterpolator((xis, np.log(T)), np.log(sa), bounds_error=False,
+                                     fill_value=None)
+    return a, dt, intensity_measures(a, dt, housner=False), interp
+
+
+@lru_cache(maxsize=None)
+def design_data(version):
+    """Nominal T1, member weight and brace count of a version."""
+    model = fm.load_model(version)
+    T1 = fm.modal(model, 1)['T'][0]
+    return {'T1_nom': T1, 'weight_kg': sc.member_weight_kg(model),
+            'n_brace': int(np.isin(model.etype, ['brace_xz', 'brace_yz']).sum())}
+
+
+def features(X):
+    """Numeric feature matrix (n, 8) for a DataFrame of INPUTS."""
+    d = pd.DataFrame([design_data(v) for v in X['version']])
+    xi, scale = X['xi'].to_numpy(float), X['scale'].to_numpy(float)
+    T1 = d['T1_nom'].to_numpy() * np.sqrt(fm.E_LONG / 1000.0 / X['E_MPa'].to_numpy(float))
+    ln_sa, pga, d595 = np.empty(len(X)), np.empty(len(X)), np.empty(len(X))
+    for rec, idx in X.groupby('record').indices.items():
+        _, _, ims, interp = record_data(rec)
+        ln_sa[idx] = interp(np.column_stack([xi[idx], np.log(T1[idx])]))
+        pga[idx], d595[idx] = ims['PGA_g'], ims['D5_95_s']
+    return np.column_stack([np.log(T1), ln_sa + np.log(scale), np.log(pga * scale), d595,
+                            xi, d['weight_kg'], d['n_brace'] / 1000.0,
+                            (X['direction'] == 'Y').to_numpy(float)])
+
+
+def sample_inputs(n, seed=0):
+    """Latin hypercube over the continuous inputs, categories by stratum."""
+    U = qmc.LatinHypercube(3 + len(RANGES), seed=seed).random(n)
+    X = pd.DataFrame({'version': np.array(VERSIONS)[(U[:, 0] * len(VERSIONS)).astype(int)],
+                      'record': np.array(RECORDS)[(U[:, 1] * len(RECORDS)).astype(int)],
+                      'direction': np.array(DIRECTIONS)[(U[:, 2] * 2).astype(int)]})
+    for k, (name, (dist, lo, hi)) in enumerate(RANGES.items()):
+        u = U[:, 3 + k]
+        X[name] = np.exp(np.log(lo) + u * np.log(hi / lo)) if dist == 'loguniform' \
+            else lo + u * (hi - lo)
+    return X
+
+
+# ============================================================
+# FULL ANALYSIS (ORACLE)
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _engine(version):
+    """Nominal modal engine, edge drift operators and modal member forces."""
+    model = fm.load_model(version)
+    eng = ModalEngine(model, n_modes=24)
+    free, phi = eng.modes['free'], eng.modes['phi']
+    edges = {}
+    for k, d in enumerate(DIRECTIONS):
+        ops = [fm.floor_operator(model, free, dof=k, nodes_by_floor=e)
+               for e in edge_nodes(model, axis=1 - k)]
+        edges[d] = np.stack([np.diff(op @ phi, axis=0) for op in ops])       # (2, ns, nm)
+    full = np.zeros((model.ndof, phi.shape[1]))
+    full[free] = phi
+    T = model.cache.get('T')
+    T = fm.transformation(model) if T is None else T
+    TK = np.einsum('eij,ejk->eik', T, fm.element_stiffness(model))[:, FORCE_COLS]
+    F_modes = np.einsum('eik,ekm->eim', TK, full[model.elem_dofs])           # (ne, 5, nm)
+    return eng, edges, F_modes
+
+
+def peak_instants(q, n_peaks=N_PEAKS):
+    """Time steps where some modal coordinate has one of its n_peaks largest |q|."""
+    return np.unique(np.argpartition(-np.abs(q), n_peaks, axis=1)[:, :n_peaks])
+
+
+def analyze(p, chunk=256, n_peaks=N_PEAKS):
+    """
+    Peak responses of one input row (dict-like) by modal FRF time history.
+    Stiffness ∝ E (G/E fixed): mode shapes are the nominal ones, ω ∝ √E.
+    Member DCRs are evaluated at the peak instants of the modal
+    coordinates only (n_peaks=None: every step).
+    """
+    eng, edges, F_modes = _engine(p['version'])
+    model, modes = eng.model, eng.modes
+    a, dt, _, _ = record_data(p['record'])
+    k = DIRECTIONS.index(p['direction'])
+    s = p['E_MPa'] * 1000.0 / fm.E_LONG
+    sel = modes['mass_ratio'][:, k] >= MIN_MASS_RATIO
+    om = modes['omega'][sel] * np.sqrt(s)
+    acc = a * p['scale'] * G
+    npts = len(acc)
+    nfft = padded_length(npts, dt, om[0], p['xi'])
+    w = 2 * np.pi * fft.rfftfreq(nfft, dt)
+    AH = fft.rfft(acc, n=nfft) * (-modes['gamma'][sel, k, None] * modal_frf(om, np.full(len(om), p['xi']), w))
+    q = fft.irfft(AH, n=nfft)[:, :npts]                                      # (n_sel, npts)
+    qa = fft.irfft(-w**2 * AH, n=nfft)[:, :npts]
+
+    phi_out = eng.ops[p['direction']] @ modes['phi'][:, sel]
+    drift = np.abs(np.diff(phi_out, axis=0) @ q / eng.dz[:, None]).max(axis=1)
+    roof_acc = np.abs(phi_out[-1] @ qa + acc).max() / G
+    edge = np.abs(edges[p['direction']][:, :, sel] @ q).max(axis=-1)        # (2, ns)
+    eta = edge.max(axis=0) / np.where(edge.mean(axis=0) > 0, edge.mean(axis=0), 1.0)
+
+    Fm = F_modes[:, :, sel] * s
+    if n_peaks and n_peaks < npts:
+        q = q[:, peak_instants(q, n_peaks)]
+    A, Wel = model.A, model.A * np.sqrt(model.A) / 6
+    dcr = 0.0
+    for e0 in range(0, len(Fm), chunk):
+        F = Fm[e0:e0 + chunk] @ q                                            # (c, 5, npts)
+        sl = slice(e0, e0 + chunk)
+        dcr = max(dcr, member_dcr(F, A[sl, None], Wel[sl, None], JOINT_EFF).max())
+    return {'max_drift': float(drift.max()), 'roof_acc_g': float(roof_acc),
+            'edge_ratio': float(eta.max()), 'max_dcr': float(dcr)}
+
+
+def analyze_all(X, oracle=analyze, log=print):
+    rows = []
+    for i, (_, p) in enumerate(X.iterrows()):
+        rows.append(oracle(p))
+        if log and (i + 1) % 10 == 0:
+            log(f"    {i + 1}/{len(X)} analyses")
+    return pd.concat([X.reset_index(drop=True), pd.DataFrame(rows)], axis=1)
+
+
+def from_job_queue(campaign):
+    """Drift-only training rows from finished frf_th jobs (E = nominal)."""
+    from job_queue import JobQueue
+    q = JobQueue()
+    rows = [dict(version=p['version'], record=p['record'], direction=p['direction'],
+                 scale=p.get('scale', 1.0), E_MPa=fm.E_LONG / 1000.0, xi=p.get('xi', 0.05),
+                 max_drift=r['max_drift_pct'] / 100)
+            for p, r in q.results(campaign) if p.get('record') in RECORDS]
+    q.close()
+    return pd.DataFrame(rows, columns=list(INPUTS) + list(OUTPUTS))
+
+
+# ============================================================
+# GAUSSIAN PROCESS
+# ============================================================
+
+def matern52(X1, X2, ls):
+    r = np.sqrt(np.maximum(((X1[:, None, :] - X2[None, :, :]) / ls)**2, 0).sum(-1)) * np.sqrt(5)
+    return (1 + r + r**2 / 3) * np.exp(-r)
+
+
+class GaussianProcess:
+    """
+    GP on standardized inputs: linear trend (ridge least squares) plus
+    an ARD Matérn-5/2 + white-noise GP on the trend residual.
+    """
+
+    def fit(self, X, y, restarts=2, seed=0, ridge=1e-3):
+        self.xm, self.xs = X.mean(0), np.where(X.std(0) > 0, X.std(0), 1.0)
+        Z = (X - self.xm) / self.xs
+        H = np.column_stack([np.ones(len(Z)), Z])
+        self.beta = linalg.solve(H.T @ H + ridge * np.eye(H.shape[1]), H.T @ y, assume_a='pos')
+        res = y - H @ self.beta
+        self.ys = res.std() or 1.0
+        t = res / self.ys
+        d = X.shape[1]
+        rng = np.random.default_rng(seed)
+        best = None
+        for x0 in [np.r_[np.zeros(d), 0.0, -4.0]] + \
+                [np.r_[rng.uniform(-1, 1.5, d), 0.0, -4.0] for _ in range(restarts)]:
+            r = minimize(self._nll, x0, args=(Z, t), method='L-BFGS-B',
+                         bounds=[(-3, 4)] * d + [(-3, 3), (-12, 0)])
+            if best is None or r.fun < best.fun:
+                best = r
+        self.theta = best.x
+        self._setup(Z, t)
+        return self
+
+    def _parts(self, theta):
+        d = len(theta) - 2
+        return np.exp(theta[:d]), np.exp(theta[d]), np.exp(theta[d + 1])
+
+    def _nll(self, theta, Z, t):
+        ls, s2, noise = self._parts(theta)
+        K = s2 * matern52(Z, Z, ls) + (noise + 1e-8) * np.eye(len(Z))
+        try:
+            L = linalg.cholesky(K, lower=True)
+        except linalg.LinAlgError:
+            return 1e10
+        a = linalg.cho_solve((L, True), t)
+        return 0.5 * t @ a + np.log(np.diag(L)).sum()
+
+    def _setup(self, Z, t):
+        self.Z = Z
+        ls, s2, noise = self._parts(self.theta)
+        K = s2 * matern52(Z, Z, ls) + (noise + 1e-8) * np.eye(len(Z))
+        self.L = linalg.cholesky(K, lower=True)
+        self.alpha = linalg.cho_solve((self.L, True), t)
+        Kinv = linalg.cho_solve((self.L, True), np.eye(len(Z)))
+        self.loo = self.alpha / np.diag(Kinv) * self.ys           # LOO residuals (y units)
+
+    def predict(self, X, extra=None):
+        """Mean and std (y units); `extra` = inputs to condition σ on as well."""
+        ls, s2, noise = self._parts(self.theta)
+        Zq = (X - self.xm) / self.xs
+        Ks = s2 * matern52(Zq, self.Z, ls)
+        mu = np.column_stack([np.ones(len(Zq)), Zq]) @ self.beta + self.ys * Ks @ self.alpha
+        v = linalg.solve_triangular(self.L, Ks.T, lower=True)
+        var = s2 - (v**2).sum(0)
+        if extra is not None and len(extra):
+            Ze = np.vstack([self.Z, (extra - self.xm) / self.xs])
+            Ke = s2 * matern52(Ze, Ze, ls) + (noise + 1e-8) * np.eye(len(Ze))
+            Kq = s2 * matern52(Zq, Ze, ls)
+            var = s2 - (Kq * linalg.solve(Ke, Kq.T, assume_a='pos').T).sum(1)
+        return mu, self.ys * np.sqrt(np.maximum(var, 1e-12))
+
+
+# ============================================================
+# SURROGATE
+# ============================================================
+
+class Surrogate:
+    """One GP per output on ln(response); training rows may miss outputs."""
+
+    def __init__(self, data=None):
+        self.data = pd.DataFrame(columns=list(INPUTS) + list(OUTPUTS)) if data is None else data
+        self.gps = {}
+
+    def add(self, rows):
+        rows = rows.reindex(columns=self.data.columns)
+        self.data = rows.reset_index(drop=True) if self.data.empty else \
+            pd.concat([self.data, rows], ignore_index=True)
+
+    def fit(self):
+        F = features(self.data)
+        for out in OUTPUTS:
+            ok = self.data[out].notna().to_numpy() & (self.data[out].to_numpy(float) > 0)
+            if ok.sum() >= 5:
+                self.gps[out] = GaussianProcess().fit(F[ok], np.log(self.data[out].to_numpy(float)[ok]))
+        return self
+
+    def predict_features(self, F, extra=None):
+        """{output: (ln mean, ln std)} for a feature matrix — the fast path."""
+        return {o: gp.predict(F, extra) for o, gp in self.gps.items()}
+
+    def predict(self, X):
+        """DataFrame: predicted output (median) and its log-std per output."""
+        pred = self.predict_features(features(X))
+        out = pd.DataFrame(index=X.index)
+        for o, (mu, sd) in pred.items():
+            out[o], out[f'{o}_lnstd'] = np.exp(mu), sd
+        return out
+
+    def u_margin(self, pred, limits=LIMITS):
+        """Smallest |ln μ − ln limit|/σ over the constrained outputs."""
+        u = [np.abs(pred[o][0] - np.log(lim)) / pred[o][1]
+             for o, lim in limits.items() if o in pred]
+        return np.min(u, axis=0)
+
+    def loo_errors(self):
+        """Leave-one-out RMSE of ln(response) per output (≈ relative error)."""
+        return {o: float(np.sqrt(np.mean(gp.loo**2))) for o, gp in self.gps.items()}
+
+    def select(self, pool, k, limits=None):
+        """k pool rows to analyse next (max σ, or min U with limits), spread by conditioning."""
+        F = features(pool)
+        picked = []
+        for _ in range(k):
+            pred = self.predict_features(F, F[picked] if picked else None)
+            if limits:
+                score = -self.u_margin(pred, limits)
+            else:
+                score = np.mean([sd / gp.ys for (_, sd), gp in zip(pred.values(), self.gps.values())],
+                                axis=0)
+            score[picked] = -np.inf
+            picked.append(int(np.argmax(score)))
+        return pool.iloc[picked]
+
+    def guarded(self, X, limits=LIMITS, u_min=U_GUARD, oracle=analyze):
+        """Predictions, with full analyses (and retraining data) where U < u_min."""
+        pred = self.predict_features(features(X))
+        out = self.predict(X)
+        out['source'] = 'surrogate'
+        near = np.flatnonzero(self.u_margin(pred, limits) < u_min)
+        if len(near):
+            rows = analyze_all(X.iloc[near], oracle, log=None)
+            self.add(rows)
+            for o in OUTPUTS:
+                out.loc[X.index[near], o] = rows[o].to_numpy()
+                out.loc[X.index[near], f'{o}_lnstd'] = 0.0
+            out.loc[X.index[near], 'source'] = 'analysis'
+        return out
+
+
+def active_learning(sur, n_iter=6, batch=5, pool_size=2000, limits=None, seed=1, log=print):
+    for it in range(n_iter):
+        pool = sample_inputs(pool_size, seed=seed + it)
+        nxt = sur.select(pool, batch, limits)
+        sur.add(analyze_all(nxt, log=None))
+        sur.fit()
+        if log:
+            err = sur.loo_errors()
+            log(f"  AL {it + 1}: {len(sur.data)} runs, LOO ln-RMSE " +
+                ", ".join(f"{o} {e:.3f}" for o, e in err.items()))
+    return sur
+
+
+def main():
+    args = sys.argv[1:]
+    cmd = args[0] if args and not args[0].startswith('-') else 'train'
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    print("=" * 70)
+    print(f"GP SURROGATE — {cmd}")
+    print("=" * 70)
+    data = pd.read_csv(TRAIN_FILE).rename(columns={'eta_bi': 'edge_ratio'}) \
+        if TRAIN_FILE.exists() else None
+
+    if cmd == 'predict':
+        if data is None:
+            print(f"  No training data ({TRAIN_FILE}); run 'train' first")
+            return
+        p = dict(a.split('=', 1) for a in args[1:] if '=' in a and not a.startswith('--'))
+        X = pd.DataFrame([{k: (float(v) if k in RANGES else v) for k, v in p.items()}])
+        sur = Surrogate(data).fit()
+        print(sur.guarded(X).T.to_string())
+        return
+
+    t0 = timer.time()
+    sur = Surrogate(data)
+    if 'campaign' in opt:
+        rows = from_job_queue(opt['campaign'])
+        print(f"  {len(rows)} drift-only rows from campaign '{opt['campaign']}'")
+        sur.add(rows)
+    n_init = int(opt.get('init', 30))
+    if len(sur.data) < n_init:
+        print(f"  Initial design: {n_init - len(sur.data)} analyses (Latin hypercube)")
+        sur.add(analyze_all(sample_inputs(n_init - len(sur.data), seed=len(sur.data))))
+    sur.fit()
+    active_learning(sur, int(opt.get('iter', 6)), int(opt.get('batch', 5)),
+                    limits=LIMITS if '--boundary' in args else None)
+    print(f"  Training: {len(sur.data)} runs, {timer.time() - t0:.1f}s")
+
+    # hold-out check and query speed
+    test = analyze_all(sample_inputs(10, seed=999), log=None)
+    pred = sur.predict(test)
+    for o in OUTPUTS:
+        e = np.log(pred[o] / test[o])
+        print(f"    {o:<11} hold-out ln-RMSE {np.sqrt(np.mean(e**2)):.3f}, "
+              f"LOO {sur.loo_errors()[o]:.3f}, mean pred. ln-std {pred[f'{o}_lnstd'].mean():.3f}")
+    F = features(sample_inputs(10000, seed=7))
+    t1 = timer.perf_counter()
+    sur.predict_features(F)
+    print(f"  Query: {(timer.perf_counter() - t1) / len(F) * 1e6:.1f} µs per prediction "
+          f"(batch of {len(F)}, all outputs)")
+
+    RESULTS.mkdir(exist_ok=True)
+    sur.data.to_csv(TRAIN_FILE, index=False)
+    print(f"  Saved: {TRAIN_FILE}")
+
+
+if __name__ == "__main__":
+    main()
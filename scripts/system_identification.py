@@ -0,0 +1,388 @@
+"""
+OUTPUT-ONLY SYSTEM IDENTIFICATION FROM ACCELEROMETER LOGS
+=========================================================
+Identified frequencies, damping ratios and mode shapes of the physical
+model from ambient / free-vibration accelerometer logs (the roof sensor
+is part of the 2.22 kg roof mass), replacing the read-off-the-plot T of
+modal_analysis_calibrated.py:
+
+- streaming input: CSV (optional time column), .npy or raw binary
+  (float32 interleaved channels) read in chunks, so hour-long logs
+  never sit in memory; optional anti-alias filter + decimation with
+  filter state carried across chunks
+- Welch cross-spectral density matrix G(f) (Hann, 50% overlap) and
+  output covariances R_k, both accumulated chunk by chunk (carry-over
+  buffers for the open segment and the last lags)
+- peak picking on the first singular value of G(f) (frequency-domain
+  decomposition): half-power bandwidth damping ξ = (f2 − f1)/(2 f0),
+  mode shape = first singular vector at the peak
+- covariance-driven SSI (ERA on the output covariance Hankel matrix):
+  one SVD, all model orders from its leading blocks, and a
+  stabilization diagram (Δf < 1%, Δξ < 5%, MAC > 0.98 between
+  consecutive orders); stable poles are clustered into modes
+
+Output: results/identified_modes_<log>.csv in the data/modal_results_v*.csv
+layout (mode, T, freq, type) plus xi, method and one shape column per
+channel; --model=<version> compares against data/modal_results_<version>.csv.
+
+Channel names ending in x / y (e.g. roof_x) set the direction used for
+the SWAY X / SWAY Y label.
+
+Usage:
+    python scripts/system_identification.py <log> [--fs=1000] [--decimate=5]
+        [--channels=2] [--df=0.05] [--fmax=60] [--order=40] [--model=v10]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+RESULTS = ROOT / 'results'
+
+CHUNK = 2**16              # samples per read
+DF = 0.05                  # Welch resolution target [Hz]
+FMAX = 60.0                # identification band [Hz]
+MAX_ORDER = 40             # SSI model orders 2..MAX_ORDER
+PEAK_PROMINENCE = 1.0      # log10 units on the first singular value
+STABLE = {'df': 0.01, 'dxi': 0.05, 'mac': 0.98}
+TIME_COLUMNS = {'t', 'time', 'time_s', 'time [sec]', 'timestamp'}
+
+
+# ============================================================
+# STREAMING INPUT
+# ============================================================
+
+def open_log(path, fs=None, n_channels=1, dtype='<f4', chunk=CHUNK):
+    """
+    (fs, channel names, iterator of (n, n_channels) float blocks) for a
+    CSV, .npy or raw binary log. CSV time columns give fs; binary logs
+    need fs.
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.csv', '.txt'):
+        head = pd.read_csv(path, nrows=1024, sep=None, engine='python')
+        tcol = [c for c in head.columns if str(c).strip().lower() in TIME_COLUMNS]
+        names = [str(c) for c in head.columns if c not in tcol]
+        if fs is None:
+            if not tcol:
+                raise ValueError(f"{path.name}: no time column, pass fs")
+            fs = 1.0 / np.median(np.diff(head[tcol[0]].to_numpy(float)))
+        with open(path, errors='ignore') as fh:
+            sep = ',' if ',' in fh.read(4096) else r'\s+'
+        blocks = (b[names].to_numpy(float)
+                  for b in pd.read_csv(path, sep=sep, chunksize=chunk, usecols=names))
+        return float(fs), names, blocks
+    if fs is None:
+        raise ValueError(f"{path.name}: binary log, pass fs")
+    if path.suffix.lower() == '.npy':
+        arr = np.load(path, mmap_mode='r')
+        arr = arr.reshape(len(arr), -1)
+    else:
+        arr = np.memmap(path, dtype=dtype, mode='r').reshape(-1, n_channels)
+    names = [f'ch{k + 1}' for k in range(arr.shape[1])]
+    blocks = (np.asarray(arr[i:i + chunk], dtype=float) for i in range(0, len(arr), chunk))
+    return float(fs), names, blocks
+
+
+class Decimator:
+    """Anti-alias low-pass (8th-order Butterworth at 0.8·new Nyquist) and downsampling."""
+
+    def __init__(self, q, n_channels):
+        self.q, self.offset = int(q), 0
+        if self.q > 1:
+            self.sos = signal.butter(8, 0.8 / self.q, output='sos')
+            self.zi = np.zeros((self.sos.shape[0], 2, n_channels))
+
+    def __call__(self, block):
+        if self.q <= 1:
+            return block
+        y, self.zi = signal.sosfilt(self.sos, block, axis=0, zi=self.zi)
+        out = y[self.offset::self.q]
+        self.offset = (self.offset - len(block)) % self.q
+        return out
+
+
+class SpectralAccumulator:
+    """Welch cross-spectral matrix and output covariances, fed block by block."""
+
+    def __init__(self, fs, n_channels, nperseg, n_lags):
+        self.fs, self.nc, self.nperseg, self.n_lags = fs, n_channels, nperseg, n_lags
+        self.window = signal.get_window('hann', nperseg)
+        self.f = np.fft.rfftfreq(nperseg, 1 / fs)
+        self.G = np.zeros((len(self.f), n_channels, n_channels), complex)
+        self.R = np.zeros((n_lags + 1, n_channels, n_channels))
+        self.n_seg = self.n = 0
+        self.sum = np.zeros(n_channels)
+        self._seg = np.zeros((0, n_channels))
+        self._lag = np.zeros((n_lags, n_channels))
+
+    def feed(self, y):
+        y = np.asarray(y, float)
+        if not len(y):
+            return
+        # Welch: complete segments of the buffered samples, 50% overlap
+        buf = np.vstack([self._seg, y])
+        step = self.nperseg // 2
+        if len(buf) >= self.nperseg:
+            seg = sliding_window_view(buf, self.nperseg, axis=0)[::step]      # (s, nc, nperseg)
+            seg = seg - seg.mean(axis=-1, keepdims=True)
+            X = np.fft.rfft(seg * self.window, axis=-1)                      # (s, nc, nf)
+            self.G += np.einsum('sif,sjf->fij', X, X.conj(), optimize=True)
+            self.n_seg += len(seg)
+            buf = buf[len(seg) * step:]
+        self._seg = buf
+        # covariances R_k = Σ y_{t+k} y_tᵀ over all lags at once
+        z = np.vstack([self._lag, y])
+        L, n = self.n_lags, len(y)
+        for k in range(L + 1):
+            self.R[k] += z[L:].T @ z[L - k:L - k + n]
+        self._lag = z[-L:]
+        self.n += n
+        self.sum += y.sum(axis=0)
+
+    def csd(self):
+        """One-sided cross-spectral density matrices (nf, nc, nc)."""
+        scale = 2.0 / (self.fs * (self.window**2).sum() * max(self.n_seg, 1))
+        return self.G * scale
+
+    def covariances(self):
+        """Mean-removed output covariances R_0..R_L (L+1, nc, nc)."""
+        mu = self.sum / self.n
+        return self.R / self.n - np.outer(mu, mu)
+
+
+# ============================================================
+# FREQUENCY DOMAIN: PEAK PICKING + HALF-POWER
+# ============================================================
+
+def half_power(f, s, k):
+    """Half-power frequencies around peak k of a PSD (linear interpolation)."""
+    h = s[k] / 2
+    lo = k - np.argmax(s[k::-1] < h)
+    hi = k + np.argmax(s[k:] < h)
+    if lo == k or hi == k:
+        return np.nan, np.nan
+    f1 = np.interp(h, [s[lo], s[lo + 1]], [f[lo], f[lo + 1]])
+    f2 = np.interp(h, [s[hi], s[hi - 1]], [f[hi], f[hi - 1]])
+    return f1, f2
+
+
+def real_shape(v):
+    """Complex shape(s) (..., nc) rotated to their best real fit, max |φ| = 1."""
+    v = np.asarray(v)
+    ang = 0.5 * np.angle((v**2).sum(axis=-1, keepdims=True))
+    r = np.real(v * np.exp(-1j * ang))
+    k = np.abs(r).argmax(axis=-1)[..., None]
+    return r / np.take_along_axis(r, k, axis=-1)
+
+
+def peak_picking(f, G, fmax=FMAX, prominence=PEAK_PROMINENCE):
+    """
+    FDD peaks of the first singular value: DataFrame of freq, xi
+    (half-power) and real mode shapes; also returns s1 for plotting.
+    """
+    U, S, _ = np.linalg.svd(G)                                              # batched over f
+    s1 = S[:, 0]
+    band = (f > 0) & (f <= fmax)
+    idx = np.flatnonzero(band)
+    pk, _ = signal.find_peaks(np.log10(s1[idx]), prominence=prominence)
+    rows = []
+    for k in idx[pk]:
+        f1, f2 = half_power(f, s1, k)
+        # parabolic refinement of the peak frequency on log s1
+        a, b, c = np.log(s1[k - 1:k + 2])
+        f0 = f[k] + 0.5 * (a - c) / (a - 2 * b + c) * (f[1] - f[0])
+        rows.append({'freq': f0, 'xi': (f2 - f1) / (2 * f0), 'shape': real_shape(U[k, :, 0])})
+    return pd.DataFrame(rows), s1
+
+
+# ============================================================
+# TIME DOMAIN: COVARIANCE-DRIVEN SSI
+# ============================================================
+
+def block_hankel(R, i, shift=1):
+    """(i·nc, i·nc) Hankel matrix of R_{r+c+shift}."""
+    nc = R.shape[1]
+    k = np.arange(i)[:, None] + np.arange(i)[None, :] + shift               # (i, i)
+    return R[k].transpose(0, 2, 1, 3).reshape(i * nc, i * nc)
+
+
+def ssi_poles(R, fs, max_order=MAX_ORDER):
+    """
+    Poles for model orders 2, 4, ..., max_order from one SVD of the
+    covariance Hankel matrix (ERA): list of (freq, xi, shapes) per order.
+    """
+    nc = R.shape[1]
+    i = (R.shape[0] - 2) // 2
+    H0, H1 = block_hankel(R, i, 1), block_hankel(R, i, 2)
+    U, S, Vt = np.linalg.svd(H0)
+    out = []
+    for n in range(2, min(max_order, len(S)) + 1, 2):
+        s = np.sqrt(S[:n])
+        A = (U[:, :n] / s).T @ H1 @ (Vt[:n].T / s)
+        C = (U[:nc, :n] * s)
+        mu, psi = np.linalg.eig(A)
+        lam = np.log(mu.astype(complex)) * fs
+        keep = (lam.imag > 0) & (-lam.real / np.abs(lam) > 0) & (-lam.real / np.abs(lam) < 0.2)
+        lam, psi = lam[keep], psi[:, keep]
+        out.append((np.abs(lam) / (2 * np.pi), -lam.real / np.abs(lam), (C @ psi).T))
+    return out
+
+
+def mac(a, b):
+    """Modal assurance criterion matrix between shape sets (na, nc), (nb, nc)."""
+    num = np.abs(a.conj() @ b.T)**2
+    return num / np.outer((np.abs(a)**2).sum(1), (np.abs(b)**2).sum(1))
+
+
+def stabilization(poles, crit=STABLE):
+    """
+    Stabilization diagram: DataFrame of all poles (order, freq, xi) with
+    a 'stable' flag against the previous order, and the shapes.
+    """
+    rows, shapes = [], []
+    for k, (f, xi, phi) in enumerate(poles):
+        stable = np.zeros(len(f), bool)
+        if k and len(f) and len(poles[k - 1][0]):
+            fp, xp, pp = poles[k - 1]
+            d_f = np.abs(f[:, None] - fp[None, :]) / fp[None, :]
+            j = d_f.argmin(axis=1)
+            stable = ((d_f[np.arange(len(f)), j] < crit['df'])
+                      & (np.abs(xi - xp[j]) / xp[j] < crit['dxi'])
+                      & (mac(phi, pp)[np.arange(len(f)), j] > crit['mac']))
+        rows.append(pd.DataFrame({'order': 2 * (k + 1), 'freq': f, 'xi': xi, 'stable': stable}))
+        shapes.append(phi)
+    return pd.concat(rows, ignore_index=True), np.vstack(shapes)
+
+
+def ssi_modes(diagram, shapes, fmax=FMAX, min_fraction=0.3, tol=0.02):
+    """Cluster stable poles by frequency; clusters seen at enough orders become modes."""
+    n_orders = diagram['order'].nunique()
+    st = diagram[diagram['stable'] & (diagram['freq'] <= fmax)].sort_values('freq')
+    if st.empty:
+        return pd.DataFrame(columns=['freq', 'xi', 'shape'])
+    f = st['freq'].to_numpy()
+    cluster = np.concatenate([[0], np.cumsum(np.diff(f) / f[:-1] > tol)])
+    rows = []
+    for c in np.unique(cluster):
+        g = st[cluster == c]
+        if g['order'].nunique() < min_fraction * n_orders:
+            continue
+        best = g.loc[(g['freq'] - g['freq'].median()).abs().idxmin()]
+        rows.append({'freq': g['freq'].median(), 'xi': g['xi'].median(),
+                     'shape': real_shape(shapes[best.name])})
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+
+def mode_type(shape, names):
+    """SWAY X / SWAY Y from the channel directions; opposite same-direction channels → torsion."""
+    d = np.array([str(n).strip().lower()[-1:] for n in names])
+    x, y = np.abs(shape[d == 'x']), np.abs(shape[d == 'y'])
+    for sel in (d == 'x', d == 'y'):
+        if sel.sum() > 1 and np.ptp(np.sign(shape[sel])) > 0:
+            return 'Torsion/Local'
+    if not len(x) and not len(y):
+        return 'Unknown'
+    return 'SWAY X' if (x.max() if len(x) else 0) >= (y.max() if len(y) else 0) else 'SWAY Y'
+
+
+def identify(path, fs=None, n_channels=1, decimate=1, df=DF, fmax=FMAX,
+             max_order=MAX_ORDER, chunk=CHUNK):
+    """
+    Stream a log through the Welch / covariance accumulators and run
+    peak picking and SSI. Returns (table, info) with info holding f,
+    s1, the stabilization diagram and the sample count.
+    """
+    fs, names, blocks = open_log(path, fs, n_channels, chunk=chunk)
+    dec = Decimator(decimate, len(names))
+    fs_d = fs / max(int(decimate), 1)
+    nperseg = 2**int(np.ceil(np.log2(fs_d / df)))
+    n_lags = 2 * max(int(np.ceil(max_order / len(names))) + 1, int(np.ceil(4 * fs_d / fmax))) + 2
+    acc = SpectralAccumulator(fs_d, len(names), nperseg, n_lags)
+    for b in blocks:
+        acc.feed(dec(b))
+    if acc.n_seg == 0:
+        raise ValueError(f"log shorter than one Welch segment ({nperseg} samples at {fs_d:g} Hz)")
+
+    fdd, s1 = peak_picking(acc.f, acc.csd(), fmax)
+    diagram, shapes = stabilization(ssi_poles(acc.covariances(), fs_d, max_order))
+    ssi = ssi_modes(diagram, shapes, fmax)
+    tables = []
+    for method, t in (('SSI-cov', ssi), ('FDD/half-power', fdd)):
+        if t.empty:
+            continue
+        t = t.sort_values('freq').reset_index(drop=True)
+        tab = pd.DataFrame({'mode': np.arange(1, len(t) + 1), 'T': 1 / t['freq'],
+                            'freq': t['freq'], 'xi': t['xi'],
+                            'type': [mode_type(s, names) for s in t['shape']],
+                            'method': method})
+        tab[[f'phi_{n}' for n in names]] = np.vstack(t['shape'])
+        tables.append(tab)
+    info = {'fs': fs_d, 'names': names, 'f': acc.f, 's1': s1, 'diagram': diagram,
+            'n_samples': acc.n, 'nperseg': nperseg}
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(), info
+
+
+def compare(identified, version='v10'):
+    """Pair identified SSI modes with data/modal_results_<version>.csv by type and order."""
+    model = pd.read_csv(DATA / f'modal_results_{version}.csv')
+    model = model.rename(columns={'T_s': 'T', 'f_Hz': 'freq'})
+    test = identified[identified['method'] == identified['method'].iloc[0]]
+    rows = []
+    for typ, g in test.groupby('type', sort=False):
+        m = model[model['type'].str.upper() == typ.upper()].sort_values('T', ascending=False)
+        for (_, a), (_, b) in zip(g.sort_values('T', ascending=False).iterrows(), m.iterrows()):
+            rows.append({'type': typ, 'mode_test': a['mode'], 'T_test': a['T'],
+                         'mode_model': b['mode'], 'T_model': b['T'],
+                         'ratio': a['T'] / b['T']})
+    return pd.DataFrame(rows)
+
+
+def main():
+    args = sys.argv[1:]
+    logs = [a for a in args if not a.startswith('-')]
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    if not logs:
+        print(__doc__)
+        return
+    path = Path(logs[0])
+
+    print("=" * 70)
+    print(f"SYSTEM IDENTIFICATION — {path.name}")
+    print("=" * 70)
+    tab, info = identify(path, fs=float(opt['fs']) if 'fs' in opt else None,
+                         n_channels=int(opt.get('channels', 1)),
+                         decimate=int(opt.get('decimate', 1)), df=float(opt.get('df', DF)),
+                         fmax=float(opt.get('fmax', FMAX)),
+                         max_order=int(opt.get('order', MAX_ORDER)))
+    d = info['diagram']
+    print(f"  {info['n_samples']} samples at {info['fs']:g} Hz ({len(info['names'])} channels), "
+          f"Welch {info['nperseg']} pts (Δf = {info['f'][1]:.4f} Hz)")
+    print(f"  Stabilization: {d['stable'].sum()} stable of {len(d)} poles, "
+          f"orders 2-{d['order'].max()}")
+    if tab.empty:
+        print("  No modes identified")
+        return
+    print(tab.to_string(index=False, float_format='%.4f'))
+    if 'model' in opt:
+        cmp = compare(tab, opt['model'])
+        print(f"\n  Test vs data/modal_results_{opt['model']}.csv:")
+        print(cmp.to_string(index=False, float_format='%.4f'))
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f'identified_modes_{path.stem}.csv'
+    tab.to_csv(out, index=False)
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+SHAKE-TABLE TEST VS SIMULATION COMPARISON
+=========================================
+Batch comparison of measured roof response against run_time_history()
+output (a_roof_g, u_roof_cm in results/full_analysis_<version>_full.json
+or a CSV with a time column):
+
+- both signals resampled to a common rate (polyphase for uniform
+  signals — the simulation is stored at ~2000 points per record —
+  linear interpolation otherwise)
+- alignment by FFT cross-correlation (parabolic sub-sample refinement,
+  optional max lag); the test is shifted by the fractional part (FFT
+  phase shift) and the overlap after the integer shift is compared
+- simulated roof acceleration is relative (UniformExcitation), the
+  accelerometer measures absolute: the ground record of the case
+  (KYH1-3, BOL090, BOL090_scaled) is added back before comparing
+- metrics: peaks and peak ratio sim/test, RMS error and NRMSE
+  (/ RMS test), correlation, magnitude-squared coherence (band mean
+  weighted by the test PSD, and at the test's dominant frequency),
+  dominant frequencies of both, and a moving-RMS error envelope
+  (window 1 s, relative to the test's largest moving RMS)
+
+Pairs come from a manifest CSV with columns test, case and optionally
+sim, version, column (test signal), quantity (a_roof_g | u_roof_cm) and
+scale (test units → g or cm).
+
+Output: results/test_comparison_<version>.csv (one row per pair) and
+results/test_envelopes_<version>.npz (error envelopes per pair).
+
+Usage:
+    python scripts/test_comparison.py manifest.csv [--fs=100] [--max-lag=2]
+    python scripts/test_comparison.py test.csv --case=KYH1_X [--version=v10]
+"""
+
+import json
+import sys
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import fft, signal
+
+from full_analysis_v10 import GM_BOL, GM_DASK, parse_at2, parse_dask_gm
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+ENVELOPE_WINDOW = 1.0      # s
+MAX_LAG = 2.0              # s
+FMAX = 30.0                # coherence band [Hz]
+QUANTITIES = ('a_roof_g', 'u_roof_cm')
+TIME_COLUMNS = ('time', 't', 'time_s')
+
+# case prefix -> ground record (as main() of full_analysis_v10.py)
+RECORDS = {**{f'KYH{k}': (GM_DASK / f'KYH{k}.txt', parse_dask_gm) for k in (1, 2, 3)},
+           'BOL090': (GM_BOL / 'BOL090.AT2', parse_at2),
+           'BOL090_scaled': (GM_BOL / 'BOL090_scaled_1_50.AT2', parse_at2)}
+
+
+# ============================================================
+# SIGNALS
+# ============================================================
+
+def load_simulation(path, case=None):
+    """(time, {quantity: array}) of one case from a full-results JSON or a CSV."""
+    path = Path(path)
+    if path.suffix == '.json':
+        th = json.loads(path.read_text())['time_history'][case]
+        return np.asarray(th['time']), {q: np.asarray(th[q]) for q in QUANTITIES}
+    return load_csv(path)
+
+
+def load_csv(path):
+    """(time, {column: array}) from a CSV with a time column."""
+    df = pd.read_csv(path, sep=None, engine='python')
+    tcol = next(c for c in df.columns if str(c).strip().lower() in TIME_COLUMNS)
+    return df[tcol].to_numpy(float), {str(c): df[c].to_numpy(float)
+                                     for c in df.columns if c != tcol}
+
+
+def ground_acceleration(case):
+    """(t, a_g [g]) of the record behind a case name such as KYH1_X."""
+    name = case.rsplit('_', 1)[0]
+    path, parse = RECORDS[name]
+    t, a, _ = parse(path)
+    return t, a
+
+
+def to_rate(t, x, fs):
+    """Signal on a uniform fs grid starting at t[0]."""
+    t, x = np.asarray(t, float), np.asarray(x, float)
+    dt = np.diff(t)
+    if np.ptp(dt) < 1e-6 * dt.mean():
+        r = Fraction(fs * dt.mean()).limit_denominator(1000)
+        y = signal.resample_poly(x, r.numerator, r.denominator) if r != 1 else x
+    else:
+        y = np.interp(np.arange(t[0], t[-1], 1 / fs), t, x)
+    return t[0] + np.arange(len(y)) / fs, y
+
+
+def align(a, b, fs, max_lag=MAX_LAG):
+    """
+    Lag of a relative to b by FFT cross-correlation: a[i + lag] ≈ b[i].
+    Returns (integer lag, refined lag [s], normalized correlation).
+    """
+    n = fft.next_fast_len(len(a) + len(b) - 1, real=True)
+    c = fft.irfft(fft.rfft(a, n) * np.conj(fft.rfft(b, n)), n)
+    c /= np.linalg.norm(a) * np.linalg.norm(b)
+    lags = np.arange(-(len(b) - 1), len(a))
+    if max_lag is not None:
+        lags = lags[np.abs(lags) <= int(round(max_lag * fs))]
+    k = int(lags[np.argmax(c[lags % n])])
+    y0, y1, y2 = c[(k - 1) % n], c[k % n], c[(k + 1) % n]
+    den = y0 - 2 * y1 + y2
+    frac = 0.5 * (y0 - y2) / den if den < 0 else 0.0
+    return k, (k + frac) / fs, float(y1)
+
+
+def fractional_shift(x, d):
+    """x(i + d) for a sub-sample d: FFT phase shift of the zero-padded, de-meaned signal."""
+    n = fft.next_fast_len(2 * len(x), real=True)
+    m = x.mean()
+    X = fft.rfft(x - m, n) * np.exp(2j * np.pi * fft.rfftfreq(n) * d)
+    return fft.irfft(X, n)[:len(x)] + m
+
+
+def overlap(a, b, lag):
+    """Common part of a and b after shifting a by lag samples."""
+    a, b = (a[lag:], b) if lag >= 0 else (a, b[-lag:])
+    n = min(len(a), len(b))
+    return a[:n], b[:n]
+
+
+def moving_rms(x, w):
+    """Centered moving RMS over w samples (cumulative sums)."""
+    c = np.concatenate([[0.0], np.cumsum(x**2)])
+    h = w // 2
+    i = np.arange(len(x))
+    lo, hi = np.maximum(i - h, 0), np.minimum(i + w - h, len(x))
+    return np.sqrt((c[hi] - c[lo]) / (hi - lo))
+
+
+# ============================================================
+# METRICS
+# ============================================================
+
+def metrics(test, sim, fs, window=ENVELOPE_WINDOW, fmax=FMAX):
+    """Error metrics of two aligned equal-length signals; also the error envelope."""
+    err = sim - test
+    rms_t = np.sqrt(np.mean(test**2))
+    nper = min(len(test), 2**int(np.log2(max(8 * fs, 16))))
+    f, coh = signal.coherence(test, sim, fs, nperseg=nper)
+    _, p_t = signal.welch(test, fs, nperseg=nper)
+    _, p_s = signal.welch(sim, fs, nperseg=nper)
+    band = (f > 0) & (f <= fmax)
+    k = np.flatnonzero(band)[np.argmax(p_t[band])]
+    w = max(int(round(window * fs)), 1)
+    mr_t = moving_rms(test, w)
+    env = moving_rms(err, w) / mr_t.max()
+    out = {
+        'peak_test': float(np.abs(test).max()), 'peak_sim': float(np.abs(sim).max()),
+        'rms_error': float(np.sqrt(np.mean(err**2))),
+        'nrmse': float(np.sqrt(np.mean(err**2)) / rms_t),
+        'corr': float(np.corrcoef(test, sim)[0, 1]),
+        'coherence': float((coh[band] * p_t[band]).sum() / p_t[band].sum()),
+        'coh_peak': float(coh[k]),
+        'f_test_hz': float(f[k]),
+        'f_sim_hz': float(f[band][np.argmax(p_s[band])]),
+        'env_max': float(env.max()), 'env_mean': float(env.mean()),
+        't_env_max': float(env.argmax() / fs),
+    }
+    out['peak_ratio'] = out['peak_sim'] / out['peak_test']
+    return out, env
+
+
+def compare(t_test, x_test, t_sim, x_sim, fs=None, max_lag=MAX_LAG, **kw):
+    """Resample, align and score one test/simulation pair."""
+    if fs is None:
+        fs = min(1 / np.median(np.diff(t_test)), 1 / np.median(np.diff(t_sim)))
+    t_a, a = to_rate(t_test, x_test, fs)
+    t_b, b = to_rate(t_sim, x_sim, fs)
+    lag, lag_s, rho = align(a - a.mean(), b - b.mean(), fs, max_lag)
+    a, b = overlap(fractional_shift(a, lag_s * fs - lag), b, lag)
+    m, env = metrics(a, b, fs, **kw)
+    m.update(fs=fs, lag_s=lag_s + t_a[0] - t_b[0], xcorr=rho, duration_s=len(a) / fs)
+    return m, env
+
+
+def compare_pairs(pairs, fs=None, max_lag=MAX_LAG, log=print):
+    """
+    Batch comparison of manifest rows (dicts). Loaded files are cached,
+    so many tests against one results JSON parse it once. Returns
+    (table, {pair name: envelope}).
+    """
+    files, rows, envs = {}, [], {}
+
+    def cached(key, loader):
+        if key not in files:
+            files[key] = loader()
+        return files[key]
+
+    for p in pairs:
+        version = p.get('version') or 'v10'
+        case = p['case']
+        q = p.get('quantity') or 'a_roof_g'
+        sim = p.get('sim') or RESULTS / f'full_analysis_{version}_full.json'
+        t_s, sig = cached((str(sim), case), lambda: load_simulation(sim, case))
+        x_s = sig[q]
+        if q == 'a_roof_g' and Path(sim).suffix == '.json':
+            t_g, a_g = cached(case.rsplit('_', 1)[0], lambda: ground_acceleration(case))
+            x_s = x_s + np.interp(t_s, t_g, a_g, left=0.0, right=0.0)
+        t_t, cols = cached(str(p['test']), lambda: load_csv(p['test']))
+        x_t = cols[p.get('column') or q] * float(p.get('scale') or 1.0)
+        m, env = compare(t_t, x_t, t_s, x_s, fs, max_lag)
+        name = f"{Path(p['test']).stem}:{case}:{q}"
+        rows.append(dict(version=version, test=Path(p['test']).name, case=case,
+                         quantity=q, **m))
+        envs[name] = env
+        if log:
+            log(f"  {name:<40} peak ratio {m['peak_ratio']:.3f}, NRMSE {m['nrmse']:.3f}, "
+                f"coherence {m['coherence']:.3f}, lag {m['lag_s'] * 1000:+.1f} ms")
+    return pd.DataFrame(rows), envs
+
+
+def main():
+    args = sys.argv[1:]
+    files = [a for a in args if not a.startswith('-')]
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    if not files:
+        print(__doc__)
+        return
+    head = pd.read_csv(files[0], nrows=0, sep=None, engine='python')
+    if 'test' in head.columns:
+        pairs = pd.read_csv(files[0]).replace({np.nan: None}).to_dict('records')
+    else:
+        pairs = [{'test': files[0], 'case': opt['case'], 'version': opt.get('version'),
+                  'sim': opt.get('sim'), 'column': opt.get('column'),
+                  'quantity': opt.get('quantity'), 'scale': opt.get('scale')}]
+
+    print("=" * 70)
+    print(f"TEST VS SIMULATION — {len(pairs)} pairs")
+    print("=" * 70)
+    tab, envs = compare_pairs(pairs, fs=float(opt['fs']) if 'fs' in opt else None,
+                              max_lag=float(opt.get('max-lag', MAX_LAG)))
+    RESULTS.mkdir(exist_ok=True)
+    cols = ['test', 'case', 'quantity', 'peak_ratio', 'nrmse', 'corr', 'coherence',
+            'f_test_hz', 'f_sim_hz', 'env_max', 'lag_s']
+    for version, g in tab.groupby('version'):
+        print(f"\n  {version}:")
+        print(g[cols].to_string(index=False, float_format='%.4f'))
+        out = RESULTS / f'test_comparison_{version}.csv'
+        g.to_csv(out, index=False)
+        names = [f"{Path(r.test).stem}:{r.case}:{r.quantity}" for r in g.itertuples()]
+        np.savez_compressed(RESULTS / f'test_envelopes_{version}.npz',
+                            **{n: envs[n] for n in names})
+        print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
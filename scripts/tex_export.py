@@ -0,0 +1,408 @@
+"""
+LATEX / PGFPLOTS DATA EXPORT (VECTORIZED)
+=========================================
+Builds every tex/data/<version>/*.tsv table for one model version from
+arrays (the report's own tex/data tables are export_tex_data.py's):
+
+- elevation views (nodes, columns, beams, braces of one tower face)
+  selected with boolean masks over the connectivity arrays — no
+  node_lookup dict, no per-element loop
+- AFAD DD-2 design spectrum and its key points
+- modal table from frame_model.modal (cached per model content under
+  results/modal_cache, so re-exports skip the eigen solve)
+- drift and edge-drift ratio tables and roof time histories from the
+  modal FRF engine (frequency_response.py), KYH1-3 records; the edge
+  ratio of the record envelopes has no accidental eccentricity and is
+  not the TBDY A1a η_bi (static_checks.drift_check)
+
+Tables are formatted column-wise and written in one call each. Long
+time histories go through a peak-preserving downsampler (first, min,
+max, last sample of each bucket) so pgfplots stays inside TeX memory
+while every local extreme — in particular the peak — survives.
+
+Usage:
+    python scripts/tex_export.py [version] [out_dir]   # v9 -> tex/data/v9
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+import sys
+import time as timer
+from pathlib import Path
+
+import frame_model as fm
+from frequency_response import ModalEngine, modal_transfer, batch_response, padded_length
+from ground_motion_im import load_dask_record
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+TEX_DATA = ROOT / 'tex' / 'data'
+GM_DASK = ROOT / 'ground_motion_dask'
+MODAL_CACHE = ROOT / 'results' / 'modal_cache'
+
+G = 9.81
+
+# AFAD DD-2, Afyon Dinar (export_tex_data.py)
+SS, S1, FS, F1 = 0.877, 0.243, 1.149, 2.114
+TL = 6.0
+
+# plane -> (in-plane axis, out-of-plane axis, beam type, brace types)
+PLANES = {
+    'xz': (0, 1, 'beam_x', ('brace_xz', 'shear_wall_xz')),
+    'yz': (1, 0, 'beam_y', ('brace_yz', 'shear_wall_yz')),
+}
+
+MAX_POINTS = 2000     # per exported time history
+
+
+# ============================================================
+# BULK TSV WRITER
+# ============================================================
+
+def format_column(values, fmt):
+    """Vectorized printf of one column into a string array."""
+    return np.char.mod(fmt, np.asarray(values))
+
+
+def write_tsv(path, table, fmts):
+    """
+    Tab-separated table with per-column printf formats, one write.
+    table: DataFrame or {name: array}; fmts: one format per column.
+    """
+    cols = list(table.keys())
+    lines = format_column(table[cols[0]], fmts[0])
+    for c, f in zip(cols[1:], fmts[1:]):
+        lines = np.char.add(np.char.add(lines, '\t'), format_column(table[c], f))
+    text = '\t'.join(cols) + '\n'
+    if len(lines):
+        text += '\n'.join(lines.tolist()) + '\n'
+    Path(path).write_text(text)
+    return path
+
+
+def pgf_coordinates(x, y, fmt='%.4f'):
+    """pgfplots `coordinates {...}` body: '(x,y) (x,y) ...'."""
+    pts = np.char.add(np.char.add('(' + format_column(x, fmt), ','),
+                      np.char.add(format_column(y, fmt), ')'))
+    return ' '.join(pts.tolist())
+
+
+# ============================================================
+# PEAK-PRESERVING DOWNSAMPLING
+# ============================================================
+
+def downsample_peaks(y, max_points=MAX_POINTS):
+    """
+    Sample indices keeping the first, min, max and last point of each
+    bucket for every series in y (npts,) or (n_series, npts).
+
+    The union over series is returned sorted, so one shared time column
+    serves all series; at most 4·n_series points per bucket are kept.
+    """
+    y = np.atleast_2d(y)
+    n_ser, npts = y.shape
+    n_b = max(1, max_points // (4 * n_ser))
+    if npts <= max_points or npts <= 4 * n_b:
+        return np.arange(npts)
+    w = -(-npts // n_b)                              # bucket width
+    n_full = npts // w
+    head = y[:, :n_full * w].reshape(n_ser, n_full, w)
+    start = np.arange(n_full) * w
+    idx = [start, start + w - 1,
+           (start + head.argmin(axis=-1)).ravel(),
+           (start + head.argmax(axis=-1)).ravel()]
+    if n_full * w < npts:                            # partial last bucket
+        tail = y[:, n_full * w:]
+        idx += [n_full * w + tail.argmin(axis=-1), n_full * w + tail.argmax(axis=-1),
+                np.array([npts - 1])]
+    return np.unique(np.concatenate(idx))
+
+
+# ============================================================
+# ELEVATION VIEWS (BOOLEAN MASKS)
+# ============================================================
+
+def model_arrays(pos, conn):
+    """Node/element arrays for masking: coordinates gathered per element end."""
+    idx = pd.Series(np.arange(len(pos)), index=pos['node_id'].to_numpy())
+    ni = idx.loc[conn['node_i'].to_numpy()].to_numpy()
+    nj = idx.loc[conn['node_j'].to_numpy()].to_numpy()
+    xyz = pos[['x', 'y', 'z']].to_numpy(dtype=float)
+    return {
+        'node_id': pos['node_id'].to_numpy(),
+        'xyz': xyz,
+        'floor': pos['floor'].to_numpy(dtype=int),
+        'tower': pos['tower'].astype(str).to_numpy(),
+        'ni': ni, 'nj': nj,
+        'pi': xyz[ni], 'pj': xyz[nj],
+        'type': conn['element_type'].astype(str).to_numpy(),
+    }
+
+
+def elevation_view(arr, tower='1', plane='xz'):
+    """
+    One tower seen in elevation: tables for nodes on the two outer faces,
+    all columns (projected), and beams/braces on the front face.
+    """
+    a, o, beam, braces = PLANES[plane]
+    in_tower = arr['tower'] == str(tower)
+    faces = arr['xyz'][in_tower, o]
+    front, back = faces.min(), faces.max()
+
+    node = in_tower & np.isin(arr['xyz'][:, o], (front, back))
+    elem = in_tower[arr['ni']] & in_tower[arr['nj']]
+    on_front = (arr['pi'][:, o] == front) & (arr['pj'][:, o] == front)
+    f_lo = np.minimum(arr['floor'][arr['ni']], arr['floor'][arr['nj']])
+
+    def members(mask, floor):
+        return {'x1': arr['pi'][mask, a], 'z1': arr['pi'][mask, 2],
+                'x2': arr['pj'][mask, a], 'z2': arr['pj'][mask, 2], 'floor': floor[mask]}
+
+    col = elem & (arr['type'] == 'column')
+    bm = elem & (arr['type'] == beam) & on_front
+    br = elem & np.isin(arr['type'], braces) & on_front
+    brace_tab = members(br, f_lo)
+    brace_tab = {**{k: brace_tab[k] for k in ('x1', 'z1', 'x2', 'z2')},
+                 'type': arr['type'][br], 'floor': brace_tab['floor']}
+    return {
+        'nodes': {'node_id': arr['node_id'][node], 'x': arr['xyz'][node, a],
+                  'z': arr['xyz'][node, 2], 'floor': arr['floor'][node]},
+        'columns': members(col, f_lo),
+        'beams': members(bm, arr['floor'][arr['ni']]),
+        'braces': brace_tab,
+    }
+
+
+def write_elevation(view, out_dir, prefix='tower1', plane='xz'):
+    """tower1_nodes_xz / _columns / _beams / _braces.tsv"""
+    out_dir = Path(out_dir)
+    seg = ['%.1f'] * 4 + ['%d']
+    return [
+        write_tsv(out_dir / f'{prefix}_nodes_{plane}.tsv', view['nodes'],
+                  ['%d', '%.1f', '%.1f', '%d']),
+        write_tsv(out_dir / f'{prefix}_columns.tsv', view['columns'], seg),
+        write_tsv(out_dir / f'{prefix}_beams.tsv', view['beams'], seg),
+        write_tsv(out_dir / f'{prefix}_braces.tsv', view['braces'],
+                  ['%.1f'] * 4 + ['%s', '%d']),
+    ]
+
+
+# ============================================================
+# DESIGN SPECTRUM
+# ============================================================
+
+def spectrum_params(ss=SS, s1=S1, fs=FS, f1=F1, tl=TL):
+    """SDS, SD1, TA, TB, TL of the TBDY 2018 horizontal spectrum."""
+    sds, sd1 = ss * fs, s1 * f1
+    return sds, sd1, 0.2 * sd1 / sds, sd1 / sds, tl
+
+
+def design_spectrum(T, params=None):
+    """Sae(T) [g], vectorized over T."""
+    sds, sd1, ta, tb, tl = params or spectrum_params()
+    T = np.asarray(T, dtype=float)
+    Ts = np.where(T > 0, T, 1.0)
+    return np.select([T < ta, T <= tb, T <= tl],
+                     [(0.4 + 0.6 * T / ta) * sds, sds, sd1 / Ts],
+                     sd1 * tl / Ts**2)
+
+
+def spectrum_tables(T1, params=None):
+    """Spectrum curve (same sampling as export_tex_data.py) and key points."""
+    sds, sd1, ta, tb, tl = params or spectrum_params()
+    T = np.concatenate([np.linspace(0, ta, 20), np.linspace(ta, tb, 30),
+                        np.linspace(tb, tl, 50), np.linspace(tl, 10, 20)])
+    # segment ends repeat the next segment's start; evaluate per segment
+    seg = np.repeat(np.arange(4), [20, 30, 50, 20])
+    Sae = np.choose(seg, [(0.4 + 0.6 * T / ta) * sds, np.full_like(T, sds),
+                          sd1 / np.where(T > 0, T, 1.0),
+                          sd1 * tl / np.where(T > 0, T, 1.0)**2])
+    keys = {'name': np.array(['T1', 'TA', 'TB', 'TL']),
+            'T': np.array([T1, ta, tb, tl]),
+            'Sae': np.concatenate([design_spectrum([T1], (sds, sd1, ta, tb, tl)),
+                                   [sds, sds, sd1 / tl]])}
+    return {'T': T, 'Sae': Sae}, keys
+
+
+def write_spectrum(T1, out_dir, params=None):
+    curve, keys = spectrum_tables(T1, params)
+    out_dir = Path(out_dir)
+    return [write_tsv(out_dir / 'afad_spectrum_dd2.tsv', curve, ['%.4f', '%.4f']),
+            write_tsv(out_dir / 'spectrum_key_points.tsv', keys, ['%s', '%.4f', '%.4f'])]
+
+
+# ============================================================
+# MODAL / RESPONSE TABLES
+# ============================================================
+
+ORDINAL = {1: '', 2: '2nd', 3: '3rd'}
+
+
+def mode_labels(mass_ratio, min_ratio=0.01):
+    """
+    'X-Translation', 'Y-Translation', 'X-2nd mode', ... from the X/Y
+    effective mass ratios; modes below min_ratio in both are 'Torsion'.
+    """
+    labels, seen = [], {'X': 0, 'Y': 0}
+    for mx, my in mass_ratio:
+        if max(mx, my) < min_ratio:
+            labels.append('Torsion')
+            continue
+        d = 'X' if mx >= my else 'Y'
+        seen[d] += 1
+        n = seen[d]
+        labels.append(f'{d}-Translation' if n == 1
+                      else f"{d}-{ORDINAL.get(n, f'{n}th')} mode")
+    return np.array(labels)
+
+
+def modal_table(modes, n=5):
+    T = modes['T'][:n]
+    return {'mode': np.arange(1, len(T) + 1), 'period': T, 'frequency': 1 / T,
+            'direction': mode_labels(modes['mass_ratio'][:n])}
+
+
+def edge_nodes(model, axis=1):
+    """Per floor: node indices on the two plan edges (min / max of axis)."""
+    lo, hi = {}, {}
+    for f in model.floors:
+        nodes = model.floor_nodes(f)
+        c = model.xyz[nodes, axis]
+        lo[f], hi[f] = nodes[c == c.min()], nodes[c == c.max()]
+    return lo, hi
+
+
+def torsion_response(eng, acc, dt, direction='X'):
+    """
+    Peak story drifts [m] of the two plan edges normal to the excitation
+    (y edges for X, x edges for Y), (n_rec, 2, n_floors − 1), through one
+    modal FRF.
+    """
+    model, modes = eng.model, eng.modes
+    k = 'XY'.index(direction)
+    lo, hi = edge_nodes(model, axis=1 - k)
+    ops = [fm.floor_operator(model, modes['free'], dof=k, nodes_by_floor=e)
+           for e in (lo, hi)]
+    phi_d = np.concatenate([np.diff(op @ modes['phi'], axis=0) for op in ops])
+    nfft = padded_length(acc.shape[-1], dt, modes['omega'][0], eng.xi[0])
+    res = batch_response(acc * G, dt, lambda w: modal_transfer(
+        phi_d, modes['gamma'][:, k], modes['omega'], eng.xi, w), nfft)
+    return res['peak'].reshape(len(acc), 2, -1)
+
+
+def torsion_table(eng, acc, dt, direction='X'):
+    """
+    Dynamic edge-drift ratio Δmax / Δavg per story from the independent
+    record-envelope peaks of the two edges [cm]. No accidental
+    eccentricity, so ≈ 1 for a symmetric plan — the TBDY A1a η_bi is
+    static_checks.drift_check (ESL, ±5% eccentricity).
+    """
+    edge = torsion_response(eng, acc, dt, direction).max(axis=0) * 100
+    d_max, d_avg = edge.max(axis=0), edge.mean(axis=0)
+    return {'floor': np.asarray(eng.floors[1:]), 'delta_max': d_max, 'delta_avg': d_avg,
+            'edge_ratio': d_max / np.where(d_avg > 0, d_avg, 1.0)}
+
+
+def response_tables(eng, acc, dt, names):
+    """drift_results, torsion_check and downsampled roof histories."""
+    floors = np.asarray(eng.floors[1:])
+    drift = np.zeros(len(floors))
+    roof = {}
+    for d in 'XY':
+        res = eng.run(acc, dt, direction=d, keep_history=True)
+        drift = np.maximum(drift, res['drift'].max(axis=0))
+        for i, nm in enumerate(names):
+            roof[f'{nm}_{d}'] = res['history'][i, -1] * 100          # cm
+
+    return {'drift': {'floor': floors, 'drift_ratio': drift},
+            'torsion': torsion_table(eng, acc, dt), 'roof': roof}
+
+
+def write_histories(roof, dt, out_dir, max_points=MAX_POINTS):
+    """roof_history.tsv: shared time column, peak-preserving downsample."""
+    keys = list(roof)
+    Y = np.stack([roof[k] for k in keys])
+    k = downsample_peaks(Y, max_points)
+    table = {'t': k * dt, **{nm: Y[i, k] for i, nm in enumerate(keys)}}
+    return write_tsv(Path(out_dir) / 'roof_history.tsv', table,
+                     ['%.3f'] + ['%.5f'] * len(keys)), len(k), Y.shape[1]
+
+
+def load_records(names=('KYH1', 'KYH2', 'KYH3')):
+    recs, found, dt = [], [], None
+    for nm in names:
+        fp = GM_DASK / f'{nm}.txt'
+        if fp.exists():
+            _, a, dt = load_dask_record(fp)
+            recs.append(a)
+            found.append(nm)
+    if not recs:
+        return [], None, None
+    n = min(len(r) for r in recs)
+    return found, np.stack([r[:n] for r in recs]), dt
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def cached_modes(model, files, n_modes, cache_dir=MODAL_CACHE):
+    """
+    frame_model.modal keyed by the model CSV bytes and n_modes, so a
+    report regenerated for an unchanged model skips the eigen solve.
+    """
+    h = hashlib.sha1(str(n_modes).encode())
+    for f in files:
+        h.update(Path(f).read_bytes())
+    path = Path(cache_dir) / f'{model.version}_{h.hexdigest()[:16]}.npz'
+    if path.exists():
+        with np.load(path) as z:
+            return dict(z)
+    modes = fm.modal(model, n_modes)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **modes)
+    return modes
+
+
+def export_version(version='v9', out_dir=None, n_modes=24):
+    """Write all tables for one model version (default tex/data/<version>); returns written paths."""
+    out_dir = TEX_DATA / version if out_dir is None else Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pos_f, conn_f = fm.model_files(version)
+    pos, conn = pd.read_csv(pos_f), pd.read_csv(conn_f)
+    written = write_elevation(elevation_view(model_arrays(pos, conn)), out_dir)
+
+    model = fm.from_frames(pos, conn, version=version)
+    eng = ModalEngine(model, modes=cached_modes(model, (pos_f, conn_f), n_modes))
+    written += write_spectrum(eng.modes['T'][0], out_dir)
+    written.append(write_tsv(out_dir / 'modal_results.tsv', modal_table(eng.modes),
+                             ['%d', '%.4f', '%.2f', '%s']))
+
+    names, acc, dt = load_records()
+    if names:
+        tabs = response_tables(eng, acc, dt, names)
+        written.append(write_tsv(out_dir / 'drift_results.tsv', tabs['drift'],
+                                 ['%d', '%.6f']))
+        written.append(write_tsv(out_dir / 'torsion_check.tsv', tabs['torsion'],
+                                 ['%d', '%.4f', '%.4f', '%.3f']))
+        path, kept, npts = write_histories(tabs['roof'], dt, out_dir)
+        written.append(path)
+        print(f"  roof histories: {npts} -> {kept} samples ({len(tabs['roof'])} series)")
+    return written
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else 'v9'
+    out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else TEX_DATA / version
+    print("=" * 70)
+    print(f"LaTeX data export — {version} -> {out_dir}")
+    print("=" * 70)
+    t0 = timer.time()
+    for p in export_version(version, out_dir):
+        print(f"  Exported: {p}")
+    print(f"  Total: {timer.time() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+SPARSE ADJACENCY & TOPOLOGY VALIDATION
+======================================
+CSR node adjacency for the twin-tower models (replaces the dense 0/1
+twin_adjacency_matrix.csv / adjacency_matrix.csv text files) and a fast
+validation pass to run before any expensive analysis:
+
+- dangling element references, duplicate node ids
+- connected components: whole model (must be one piece) and towers
+  without the bridges (reported)
+- duplicate / coincident nodes via a spatial hash (cell = tolerance,
+  27-neighbour lookup on sorted cell keys)
+- zero-length members, duplicate members, collinear overlapping members
+  sharing a node
+- free nodes (no members) and components without a support
+- mechanisms: for every level L, the stiffness of the members that
+  carry level-L nodes from below or within the level (lower levels
+  held fixed) must be positive definite (sparse symmetric LU pivots);
+  the zero-energy modes of a failing level name the nodes involved
+
+Usage:
+    python scripts/topology_check.py v10            # validate data/ CSVs
+    python scripts/topology_check.py v10 save       # + data/twin_adjacency_v10.npz
+"""
+
+import sys
+import time as timer
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+import frame_model as fm
+
+ROOT = Path(__file__).parent.parent
+DATA = ROOT / 'data'
+
+COINCIDENT_TOL = 1e-3    # cm
+ZERO_LENGTH_TOL = 1e-3   # cm
+COLLINEAR_TOL = 1e-9     # 1 - cos between member directions
+PIVOT_TOL = 1e-10        # scaled Cholesky pivot for a zero-energy mode
+
+
+class TopologyError(ValueError):
+    """Raised by check_model() when a model has topology errors."""
+
+
+@dataclass
+class Issue:
+    severity: str        # 'error' | 'warning' | 'info'
+    check: str
+    message: str
+    ids: tuple = ()
+
+
+# ============================================================
+# SPARSE ADJACENCY
+# ============================================================
+
+def adjacency(pos_df, conn_df):
+    """
+    Symmetric CSR adjacency (n_nodes × n_nodes, uint8 member counts) in
+    position-matrix row order, and the element end indices (ei, ej).
+    """
+    lookup = pd.Index(pos_df['node_id'].to_numpy())
+    ei = lookup.get_indexer(conn_df['node_i'].to_numpy())
+    ej = lookup.get_indexer(conn_df['node_j'].to_numpy())
+    ok = (ei >= 0) & (ej >= 0)
+    n = len(lookup)
+    r = np.concatenate([ei[ok], ej[ok]])
+    c = np.concatenate([ej[ok], ei[ok]])
+    A = sparse.csr_matrix((np.ones(len(r), dtype=np.uint8), (r, c)), shape=(n, n))
+    A.sum_duplicates()
+    return A, ei, ej
+
+
+def save_adjacency(A, path):
+    """Write a CSR adjacency as .npz (scipy.sparse.save_npz)."""
+    sparse.save_npz(path, sparse.csr_matrix(A), compressed=True)
+
+
+def load_adjacency(path):
+    return sparse.load_npz(path).tocsr()
+
+
+# ============================================================
+# CHECKS
+# ============================================================
+
+def _ids(values, limit=20):
+    return tuple(int(v) for v in np.asarray(values).ravel()[:limit])
+
+
+def check_references(pos_df, conn_df, ei, ej):
+    issues = []
+    dup = pos_df['node_id'].duplicated(keep=False)
+    if dup.any():
+        issues.append(Issue('error', 'duplicate_node_id',
+                            f"{dup.sum()} rows share node ids",
+                            _ids(pos_df.loc[dup, 'node_id'].unique())))
+    bad = (ei < 0) | (ej < 0)
+    if bad.any():
+        issues.append(Issue('error', 'missing_node',
+                            f"{bad.sum()} elements reference unknown nodes",
+                            _ids(conn_df.loc[bad, 'element_id'])))
+    return issues
+
+
+def check_components(A, pos_df, conn_df, ei, ej, supports):
+    """One connected model; every component has a support."""
+    issues = []
+    n_comp, label = connected_components(A, directed=False)
+    deg = np.diff(A.indptr)
+    free = np.flatnonzero(deg == 0)
+    if len(free):
+        issues.append(Issue('error', 'free_node',
+                            f"{len(free)} nodes have no members",
+                            _ids(pos_df['node_id'].to_numpy()[free])))
+    comps = np.setdiff1d(np.unique(label), label[free])
+    if len(comps) > 1:
+        sizes = np.bincount(label)[comps]
+        issues.append(Issue('error', 'components',
+                            f"model splits into {len(comps)} parts (sizes {sorted(sizes)[::-1]})"))
+    unsupported = np.setdiff1d(comps, np.unique(label[supports]))
+    for c in unsupported:
+        nodes = np.flatnonzero(label == c)
+        issues.append(Issue('error', 'unsupported_part',
+                            f"part of {len(nodes)} nodes has no support",
+                            _ids(pos_df['node_id'].to_numpy()[nodes])))
+
+    # towers without bridges (information only)
+    if 'tower' in conn_df:
+        keep = (conn_df['tower'].astype(str) != 'bridge').to_numpy() & (ei >= 0) & (ej >= 0)
+        n = A.shape[0]
+        T = sparse.csr_matrix((np.ones(keep.sum()), (ei[keep], ej[keep])), shape=(n, n))
+        tower_nodes = np.unique(np.concatenate([ei[keep], ej[keep]]))
+        _, tl = connected_components(T, directed=False)
+        issues.append(Issue('info', 'towers',
+                            f"{len(np.unique(tl[tower_nodes]))} tower parts without bridges"))
+    return issues
+
+
+def coincident_pairs(xyz, tol=COINCIDENT_TOL):
+    """
+    Node index pairs closer than tol (spatial hash: integer cells of
+    size tol, candidate pairs from the 27 neighbouring cells).
+    """
+    cell = np.floor(xyz / tol).astype(np.int64)
+    cell -= cell.min(axis=0)
+    dims = cell.max(axis=0) + 3
+    key = ((cell[:, 0] + 1) * dims[1] + cell[:, 1] + 1) * dims[2] + cell[:, 2] + 1
+    order = np.argsort(key, kind='stable')
+    sk = key[order]
+    pairs = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                off = (dx * dims[1] + dy) * dims[2] + dz
+                if off < 0:
+                    continue
+                lo = np.searchsorted(sk, key + off, 'left')
+                hi = np.searchsorted(sk, key + off, 'right')
+                cnt = hi - lo
+                if not cnt.any():
+                    continue
+                a = np.repeat(np.arange(len(key)), cnt)
+                b = order[np.concatenate([np.arange(l, h) for l, h in
+                                          zip(lo[cnt > 0], hi[cnt > 0])])]
+                sel = a < b if off == 0 else a != b
+                pairs.append(np.stack([a[sel], b[sel]], axis=1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=int)
+    p = np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+    d = np.linalg.norm(xyz[p[:, 0]] - xyz[p[:, 1]], axis=1)
+    return p[d < tol]
+
+
+def check_nodes(pos_df, tol=COINCIDENT_TOL):
+    xyz = pos_df[['x', 'y', 'z']].to_numpy(dtype=float)
+    p = coincident_pairs(xyz, tol)
+    if not len(p):
+        return []
+    ids = pos_df['node_id'].to_numpy()
+    return [Issue('error', 'coincident_nodes',
+                  f"{len(p)} node pairs closer than {tol} cm", _ids(ids[p]))]
+
+
+def check_members(pos_df, conn_df, ei, ej, tol=ZERO_LENGTH_TOL):
+    issues = []
+    ok = (ei >= 0) & (ej >= 0)
+    xyz = pos_df[['x', 'y', 'z']].to_numpy(dtype=float)
+    eid = conn_df['element_id'].to_numpy()
+    i, j, eid = ei[ok], ej[ok], eid[ok]
+    d = xyz[j] - xyz[i]
+    L = np.linalg.norm(d, axis=1)
+
+    zero = L < tol
+    if zero.any():
+        issues.append(Issue('error', 'zero_length',
+                            f"{zero.sum()} members shorter than {tol} cm", _ids(eid[zero])))
+
+    pair = np.sort(np.stack([i, j], axis=1), axis=1)
+    _, inv, count = np.unique(pair, axis=0, return_inverse=True, return_counts=True)
+    if (count > 1).any():
+        dup = count[inv.ravel()] > 1
+        issues.append(Issue('error', 'duplicate_member',
+                            f"{(count > 1).sum()} node pairs carry more than one member",
+                            _ids(eid[dup])))
+
+    # collinear members leaving the same node in the same direction overlap
+    nz = ~zero
+    u = d[nz] / L[nz, None]
+    node = np.concatenate([i[nz], j[nz]])
+    dirs = np.concatenate([u, -u])
+    elem = np.concatenate([eid[nz], eid[nz]])
+    order = np.lexsort([elem, node])
+    node, dirs, elem = node[order], dirs[order], elem[order]
+    deg = np.bincount(node).max() if len(node) else 0
+    hits = []
+    for k in range(1, deg):
+        same = node[k:] == node[:-k]
+        cos = np.einsum('ij,ij->i', dirs[k:], dirs[:-k])
+        m = same & (cos > 1 - COLLINEAR_TOL) & (elem[k:] != elem[:-k])
+        hits.append(np.stack([elem[:-k][m], elem[k:][m]], axis=1))
+    hits = np.unique(np.sort(np.concatenate(hits), axis=1), axis=0) if hits else []
+    if len(hits):                       # exact duplicates are reported above
+        key = pd.Series(pair[:, 0] * len(xyz) + pair[:, 1], index=eid)
+        key = key[~key.index.duplicated()]
+        hits = hits[key.loc[hits[:, 0]].to_numpy() != key.loc[hits[:, 1]].to_numpy()]
+    if len(hits):
+        issues.append(Issue('error', 'overlapping_members',
+                            f"{len(hits)} collinear member pairs overlap at a shared node",
+                            _ids(hits)))
+    return issues
+
+
+def _level_stiffness_ok(model, ke, level, lvl):
+    """
+    Positive-definiteness of level `level`: members whose upper end is
+    on this level, lower-level nodes fixed. Returns (ok, null node idx).
+
+    Sparse LDLᵀ-style check: SuperLU with symmetric ordering and no
+    off-diagonal pivoting on the diagonally scaled, slightly shifted K,
+    so the U pivots are the scaled Cholesky pivots. Pivots below
+    PIVOT_TOL mark a zero-energy mode; its nodes are the ones moved by
+    inverse iteration (same factor) started at the weak DOFs.
+    """
+    hi = np.maximum(lvl[model.ei], lvl[model.ej])
+    sel = np.flatnonzero(hi == level)
+    nodes = np.flatnonzero(lvl == level)
+    if not len(sel) or not len(nodes):
+        return True, np.zeros(0, dtype=int)
+
+    # element DOFs -> level-local DOFs (-1: fixed lower-level node)
+    pos = np.full(model.n_nodes, -1)
+    pos[nodes] = np.arange(len(nodes))
+    ends = np.repeat(pos[np.stack([model.ei[sel], model.ej[sel]], axis=1)], fm.NDF, axis=1)
+    local = np.where(ends >= 0, ends * fm.NDF + np.tile(np.arange(fm.NDF), 2), -1)
+    n = len(nodes) * fm.NDF
+    rows = np.repeat(local, 12, axis=1).ravel()
+    cols = np.tile(local, (1, 12)).ravel()
+    m = (rows >= 0) & (cols >= 0)
+    K = sparse.csc_matrix((ke[sel].ravel()[m], (rows[m], cols[m])), shape=(n, n))
+
+    diag = np.abs(K.diagonal())
+    live = diag > 1e-12 * max(diag.max(), 1e-300)
+    # a translation without stiffness is a mechanism; rotations that only
+    # trusses touch are not
+    dead_nodes = np.flatnonzero(~live.reshape(-1, fm.NDF)[:, :3].all(axis=1))
+    if not live.any():
+        return False, nodes
+    idx = np.flatnonzero(live)
+    s = sparse.diags(1.0 / np.sqrt(diag[idx]))
+    Ks = (s @ K[idx][:, idx] @ s).tocsc()
+    eye = sparse.identity(len(idx), format='csc')
+    lu = _symmetric_lu(Ks + PIVOT_TOL * 1e-2 * eye)
+    piv = np.zeros(len(idx)) if lu is None else lu.U.diagonal()
+    weak = np.flatnonzero(piv < PIVOT_TOL)
+    if not len(weak) and not len(dead_nodes):
+        return True, np.zeros(0, dtype=int)
+
+    bad = dead_nodes
+    if len(weak):
+        if lu is None:
+            null = np.ones((len(idx), 1))
+        else:
+            # inverse iteration from the weak DOFs with the shifted factor:
+            # the zero-energy components grow by 1/shift per step
+            dofs = lu.perm_c[weak]
+            null = np.zeros((len(idx), len(dofs)))
+            null[dofs, np.arange(len(dofs))] = 1.0
+            for _ in range(2):
+                null = lu.solve(null)
+                null /= np.abs(null).max(axis=0)
+            # pivots after a tiny one are contaminated: keep true zero-energy vectors
+            rq = (null * (Ks @ null)).sum(axis=0) / (null**2).sum(axis=0)
+            null = null[:, rq < PIVOT_TOL * abs(Ks).sum(axis=1).max()]
+        amp = np.zeros(n)
+        amp[idx] = np.abs(null).max(axis=1, initial=0.0)
+        node_amp = amp.reshape(-1, fm.NDF).max(axis=1)
+        bad = np.union1d(np.flatnonzero(node_amp > 1e-3), dead_nodes)
+    return not len(bad), nodes[bad]
+
+
+def _symmetric_lu(A):
+    """SuperLU of a symmetric matrix with diagonal pivots only (None if singular)."""
+    try:
+        return splu(A, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                    options={'SymmetricMode': True})
+    except RuntimeError:
+        return None
+
+
+def level_mechanisms(model, ke):
+    """
+    Level-by-level zero-energy mode check of a model with element
+    matrices ke (zero for members that are absent). Returns a list of Issue.
+    """
+    lvl = np.unique(model.xyz[:, 2].round(6), return_inverse=True)[1].ravel()
+    issues = []
+    for level in range(1, lvl.max() + 1):
+        ok, bad = _level_stiffness_ok(model, ke, level, lvl)
+        if not ok:
+            issues.append(Issue('error', 'mechanism',
+                                f"level {level}: {len(bad)} nodes with zero-energy modes",
+                                _ids(model.node_ids[bad])))
+    return issues
+
+
+def check_mechanisms(pos_df, conn_df, pin_types=fm.PIN_TYPES):
+    """Level-by-level zero-energy mode check on the frame stiffness."""
+    model = fm.from_frames(pos_df, conn_df, pin_types=pin_types)
+    return level_mechanisms(model, fm.element_stiffness(model))
+
+
+def validate(pos_df, conn_df, mechanisms=True):
+    """All checks. Returns a list of Issue."""
+    A, ei, ej = adjacency(pos_df, conn_df)
+    z = pos_df['z'].to_numpy(dtype=float)
+    supports = np.flatnonzero(np.isclose(z, z.min()))
+    issues = check_references(pos_df, conn_df, ei, ej)
+    issues += check_nodes(pos_df)
+    issues += check_members(pos_df, conn_df, ei, ej)
+    issues += check_components(A, pos_df, conn_df, ei, ej, supports)
+    if mechanisms and not any(i.severity == 'error' for i in issues):
+        issues += check_mechanisms(pos_df, conn_df)
+    return issues
+
+
+def check_model(pos_df, conn_df, label='model', mechanisms=True):
+    """Validate and raise TopologyError listing the errors, if any."""
+    issues = validate(pos_df, conn_df, mechanisms)
+    errors = [i for i in issues if i.severity == 'error']
+    if errors:
+        lines = [f"  [{i.check}] {i.message}" + (f" ids={list(i.ids)}" if i.ids else '')
+                 for i in errors]
+        raise TopologyError(f"{label}: {len(errors)} topology errors\n" + "\n".join(lines))
+    return issues
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    args = sys.argv[1:] or ['v10']
+    version = args[0]
+    pos_file, conn_file = fm.model_files(version)
+    pos_df, conn_df = pd.read_csv(pos_file), pd.read_csv(conn_file)
+
+    t0 = timer.time()
+    A, _, _ = adjacency(pos_df, conn_df)
+    issues = validate(pos_df, conn_df)
+    elapsed = timer.time() - t0
+
+    print("=" * 70)
+    print(f"  TOPOLOGY CHECK — {version}: {len(pos_df)} nodes, {len(conn_df)} elements")
+    print("=" * 70)
+    for i in issues:
+        ids = f"  ids={list(i.ids)}" if i.ids else ''
+        print(f"  {i.severity.upper():<8} {i.check:<20} {i.message}{ids}")
+    n_err = sum(i.severity == 'error' for i in issues)
+    print(f"\n  {n_err} errors  ({elapsed*1000:.0f} ms)")
+    print(f"  Adjacency: {A.nnz} stored entries (dense would be {A.shape[0]**2})")
+
+    if 'save' in args[1:]:
+        out = DATA / f'twin_adjacency_{version}.npz'
+        save_adjacency(A, out)
+        print(f"  Saved: {out.relative_to(ROOT)}")
+    sys.exit(1 if n_err else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+GROUND-STRUCTURE BRACE TOPOLOGY / SIZING OPTIMIZATION
+=====================================================
+Where to add, double up or remove braces, as one continuous problem
+instead of trial versions (create_v10b … create_v13):
+
+- ground structure: both diagonals of every story panel of the tower
+  grid (xz and yz planes, all grid lines, both towers) — about 3200
+  candidates on V10; braces of the base model that coincide with a
+  candidate become variables too, all other members stay fixed
+- variable x_c ∈ [0, 2] = member multiplicity of candidate c
+  (0 = absent, 1 = one 6×6 stick, 2 = doubled); weight is linear in x,
+  stiffness ∝ x³ below one member (SIMP penalty, so partial braces do
+  not pay) and linear above
+- minimize weight subject to T1 ≤ target, ESL story drift ≤ 0.8% and
+  η_bi ≤ 1.4 (static_checks.py), gradients from sensitivity.py
+  (eigenvector formula for T1, adjoint solves for drifts and η_bi)
+- MMA (method of moving asymptotes) from the full ground structure:
+  each iteration is one banded factorization, one eigen solve and ~30
+  adjoint solves; the reciprocal MMA approximations follow the 1/k
+  behaviour of drifts and periods, where plain linearizations of 3200
+  simultaneous changes overshoot
+- rounding: x → {0, 1, 2}, then greedy repair (add the member with the
+  best constraint gain per gram) until the discrete layout is feasible
+
+Output: results/topology_<version>.csv (candidate node pairs, continuous
+and discrete multiplicity).
+
+Usage:
+    python scripts/topology_optimization.py [version] [--T1=<s>] [--iter=40]
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+import time as timer
+from pathlib import Path
+from scipy import sparse
+from scipy.optimize import minimize
+
+import frame_model as fm
+import sensitivity as se
+import static_checks as sc
+from tex_export import edge_nodes
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+X_MAX = 2.0
+SIMP_P = 3.0          # stiffness ∝ x^p below one member (penalizes partial braces)
+TOP_DRIFTS = 12       # drift constraints per direction (worst stories)
+
+
+# ============================================================
+# GROUND STRUCTURE
+# ============================================================
+
+def ground_structure(pos_df, conn_df):
+    """
+    Connectivity with every candidate panel diagonal appended.
+    Returns (conn, cand): cand = element rows (in conn) that are variables,
+    x0 = 1 for base braces on a candidate position, 0 for new ones.
+    """
+    t = pos_df[pos_df['zone'] == 'tower']
+    key = pd.Series(t['node_id'].to_numpy(),
+                    index=pd.MultiIndex.from_arrays([t['tower'], t['floor'],
+                                                     t['x'].round(2), t['y'].round(2)]))
+    rows = []
+    for (tower, f), g in t.groupby(['tower', 'floor']):
+        if f == 0:
+            continue
+        xs, ys = np.unique(g['x'].round(2)), np.unique(g['y'].round(2))
+        for etype, lines, steps, plane in (('brace_xz', ys, xs, 'xz'), ('brace_yz', xs, ys, 'yz')):
+            for c in lines:
+                for a, b in zip(steps[:-1], steps[1:]):
+                    pts = [(a, c), (b, c)] if plane == 'xz' else [(c, a), (c, b)]
+                    try:
+                        lo = [key[(tower, f - 1) + p] for p in pts]
+                        hi = [key[(tower, f) + p] for p in pts]
+                    except KeyError:
+                        continue
+                    rows += [(lo[0], hi[1], etype, tower), (lo[1], hi[0], etype, tower)]
+    cand = pd.DataFrame(rows, columns=['node_i', 'node_j', 'element_type', 'tower'])
+
+    pair = lambda i, j: np.minimum(i, j) * 10**6 + np.maximum(i, j)
+    base_pair = pd.Series(np.arange(len(conn_df)),
+                          index=pair(conn_df['node_i'].to_numpy(), conn_df['node_j'].to_numpy()))
+    base_pair = base_pair[~base_pair.index.duplicated()]
+    cp = pair(cand['node_i'].to_numpy(), cand['node_j'].to_numpy())
+    exists = np.isin(cp, base_pair.index)
+    is_brace = conn_df['element_type'].isin(['brace_xz', 'brace_yz']).to_numpy()
+    existing = base_pair.loc[cp[exists]].to_numpy()
+    existing = existing[is_brace[existing]]
+
+    new = cand[~exists].copy()
+    new['element_id'] = conn_df['element_id'].max() + 1 + np.arange(len(new))
+    new['tower'] = 'tower' + new['tower'].astype(str)
+    new['connection'] = 'pin'
+    xyz = pos_df.set_index('node_id')[['x', 'y', 'z']]
+    new['length'] = np.linalg.norm(xyz.loc[new['node_i']].to_numpy()
+                                   - xyz.loc[new['node_j']].to_numpy(), axis=1)
+    conn = pd.concat([conn_df, new[conn_df.columns]], ignore_index=True)
+    var = np.concatenate([existing, len(conn_df) + np.arange(len(new))])
+    x0 = np.concatenate([np.ones(len(existing)), np.zeros(len(new))])
+    return conn, var, x0
+
+
+# ============================================================
+# ANALYSIS + GRADIENTS
+# ============================================================
+
+class GroundStructure:
+    """Model with candidates; analysis and constraint gradients for a design x."""
+
+    def __init__(self, version='v10'):
+        pos_file, conn_file = fm.model_files(version)
+        pos_df, conn_df = pd.read_csv(pos_file), pd.read_csv(conn_file)
+        conn, self.var, self.x0 = ground_structure(pos_df, conn_df)
+        self.model = fm.from_frames(pos_df, conn, version=version)
+        self.conn = conn
+        self.ke = fm.element_stiffness(self.model)
+        self.free = fm.free_dofs(self.model, fm.assemble(self.model, self.ke))
+        self.m_diag = fm.mass_diagonal(self.model)[self.free]
+        self.w = self.model.length * self.model.A * sc.BALSA_DENSITY      # kg per unit x
+        self.fixed = np.ones(self.model.n_elem, dtype=bool)
+        self.fixed[self.var] = False
+        self.w_fixed = self.w[self.fixed].sum()
+        self.w_var = self.w[self.var]
+        self.n_analyses = 0
+
+    @staticmethod
+    def stiffness(x, p=SIMP_P):
+        """Stiffness multiple of x members: x^p below one member, linear above."""
+        return np.where(x < 1, np.maximum(x, 0)**p, x)
+
+    @staticmethod
+    def dstiffness(x, p=SIMP_P):
+        return np.where(x < 1, p * np.maximum(x, 0)**(p - 1), 1.0)
+
+    def factors(self, x, p=SIMP_P):
+        f = self.fixed.astype(float)
+        f[self.var] = self.stiffness(x, p)
+        return f
+
+    def weight(self, x):
+        return self.w_fixed + self.w_var @ x
+
+    def analyze(self, x, T_target, gradients=True, p=SIMP_P):
+        """
+        Normalized constraints g (≤ 0 is feasible) and their gradients
+        (n_con, n_var): T1, the worst story drifts and η_bi per direction.
+        """
+        m, free = self.model, self.free
+        self.n_analyses += 1
+        K = fm.assemble(m, self.ke, self.factors(x, p))[free][:, free].tocsc()
+        op = fm.banded_inverse(K)
+        solve = op.matvec if op is not None else sc.factorize(K)
+        modes = fm.modal(m, 1, K, self.m_diag, free, OPinv=op)
+        T1 = modes['T'][0]
+        V = sc.base_shear(m, T1)
+        kes = {'K': self.ke}
+        info = {'T1': T1, 'drift': 0.0, 'eta': 0.0}
+        g, G = [T1 / T_target - 1], []
+        if gradients:
+            dlam, _ = se.eigen_sensitivities(m, modes, kes)
+            G.append(se.period_sensitivity(modes, dlam['K'])[self.var, 0] / T_target)
+
+        z = np.array([m.xyz[m.floor_nodes(f), 2].max() for f in m.floors])
+        h = np.diff(z)
+        for d in 'XY':
+            # drift: worst stories of the governing edge / eccentricity case
+            k = 'XY'.index(d)
+            ops = [fm.floor_operator(m, free, dof=k, nodes_by_floor=e)
+                   for e in edge_nodes(m, axis=1 - k)]
+            cases = []
+            for e in (sc.ECC, -sc.ECC):
+                P = sc.lateral_loads(m, free, d, e, V)
+                u = solve(P)
+                cases += [(np.abs(np.diff(op @ u)) / h, P, op) for op in ops]
+            R, P, op = max(cases, key=lambda c: c[0].max())
+            worst = np.argsort(R)[::-1][:TOP_DRIFTS]
+            info['drift'] = max(info['drift'], R.max())
+            g += list(R[worst] / sc.DRIFT_LIMIT - 1)
+            t = se.torsion_sensitivity(m, solve, free, kes, d, V=V)
+            info['eta'] = max(info['eta'], t['eta_bi'])
+            g.append(t['eta_bi'] / sc.ETA_MAX - 1)
+            if gradients:
+                C = sparse.vstack([op[s + 1] - op[s] for s in worst])
+                D, dD = se.adjoint_sensitivities(m, solve, free, kes, P, C)
+                dr = dD['K'][self.var] * np.sign(D) / h[worst] / sc.DRIFT_LIMIT
+                G += list(dr.T)
+                G.append(t['d_eta']['K'][self.var] / sc.ETA_MAX)
+        if gradients:
+            G = np.array(G) * self.dstiffness(x, p)
+        return np.array(g), (G if gradients else None), info
+
+
+# ============================================================
+# MMA
+# ============================================================
+
+def mma_step(x, f0, df0, g, dg, low, upp, lo=0.0, hi=X_MAX, c=1e3):
+    """
+    One MMA subproblem (Svanberg 1987), solved through its dual in the
+    n_con multipliers: reciprocal approximations about the asymptotes
+    low/upp, elastic y_i ≥ 0 per constraint (cost c·y + ½y²).
+    """
+    span = hi - lo
+    alpha = np.maximum(lo, np.maximum(low + 0.1 * (x - low), x - 0.5 * span))
+    beta = np.minimum(hi, np.minimum(upp - 0.1 * (upp - x), x + 0.5 * span))
+    ux, xl = (upp - x)**2, (x - low)**2
+    eps = 1e-5 / span
+
+    def pq(d):
+        return (ux * (1.001 * np.maximum(d, 0) + 0.001 * np.maximum(-d, 0) + eps),
+                xl * (0.001 * np.maximum(d, 0) + 1.001 * np.maximum(-d, 0) + eps))
+
+    p0, q0 = pq(df0)
+    P, Q = pq(dg)
+    r = g - (P / (upp - x)).sum(axis=1) - (Q / (x - low)).sum(axis=1)
+
+    def primal(lam):
+        pj, qj = p0 + lam @ P, q0 + lam @ Q
+        sp, sq = np.sqrt(pj), np.sqrt(qj)
+        xs = np.clip((sp * low + sq * upp) / (sp + sq), alpha, beta)
+        return xs, pj, qj
+
+    def neg_dual(lam):
+        xs, pj, qj = primal(lam)
+        gi = r + P @ (1 / (upp - xs)) + Q @ (1 / (xs - low))
+        y = np.maximum(0, lam - c)
+        w = (pj / (upp - xs) + qj / (xs - low)).sum() + lam @ r + c * y.sum() \
+            + 0.5 * y @ y - lam @ y
+        return -w, -(gi - y)
+
+    res = minimize(neg_dual, np.ones(len(g)), jac=True, method='L-BFGS-B',
+                   bounds=[(0, None)] * len(g))
+    return primal(res.x)[0]
+
+
+def mma(gs, T_target, x=None, n_iter=40, tol=1e-3, log=print):
+    """
+    Continuous design by MMA, starting from the full ground structure.
+    Returns the last design and whether it satisfies all constraints.
+    """
+    x = np.ones(len(gs.x0)) if x is None else x.copy()
+    w_ref = gs.weight(x)
+    df0 = gs.w_var / w_ref
+    span = X_MAX
+    low, upp = x - 0.5 * span, x + 0.5 * span
+    hist = [x, x]
+    for it in range(n_iter):
+        g, G, info = gs.analyze(x, T_target)
+        if log:
+            log(f"  it {it:>2}: W = {gs.weight(x)*1000:7.1f} g, T1 = {info['T1']:.4f}s, "
+                f"drift = {info['drift']*100:.3f}%, η = {info['eta']:.3f}, "
+                f"max g = {g.max():+.4f}")
+        if it >= 2:
+            # asymptotes: contract where x oscillates, relax where it moves steadily
+            sgn = (x - hist[-1]) * (hist[-1] - hist[-2])
+            gamma = np.where(sgn < 0, 0.7, np.where(sgn > 0, 1.2, 1.0))
+            low = np.clip(x - gamma * (hist[-1] - low), x - 10 * span, x - 0.01 * span)
+            upp = np.clip(x + gamma * (upp - hist[-1]), x + 0.01 * span, x + 10 * span)
+        x_new = mma_step(x, gs.weight(x) / w_ref, df0, g, G, low, upp)
+        hist = [hist[-1], x]
+        change = np.abs(x_new - x).max()
+        x = x_new
+        if change < tol:
+            break
+    g, _, info = gs.analyze(x, T_target, gradients=False)
+    return x, bool(np.all(g <= 1e-6))
+
+
+def round_design(gs, x, T_target, log=print, max_add=200):
+    """Round to {0, 1, 2}; add members greedily until feasible."""
+    xd = np.clip(np.round(x), 0, X_MAX)
+    for _ in range(max_add):
+        g, G, info = gs.analyze(xd, T_target, p=1.0)
+        if np.all(g <= 1e-9):
+            break
+        bad = g > 0
+        gain = -(G[bad].sum(axis=0)) / gs.w_var          # constraint gain per kg
+        gain[xd >= X_MAX] = -np.inf
+        xd[int(np.argmax(gain))] += 1
+    if log:
+        log(f"  rounded: W = {gs.weight(xd)*1000:.1f} g, T1 = {info['T1']:.4f}s, "
+            f"drift = {info['drift']*100:.3f}%, η = {info['eta']:.3f}, "
+            f"feasible = {bool(np.all(g <= 1e-9))}")
+    return xd, info
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+
+    print("=" * 70)
+    print(f"GROUND-STRUCTURE BRACE OPTIMIZATION — {version}")
+    print("=" * 70)
+    t0 = timer.time()
+    gs = GroundStructure(version)
+    _, _, base = gs.analyze(gs.x0, 1.0, gradients=False)
+    T_target = float(opt.get('T1', base['T1']))
+    print(f"  {len(gs.var)} candidates ({int(gs.x0.sum())} in the base layout), "
+          f"base W = {gs.weight(gs.x0)*1000:.1f} g, T1 = {base['T1']:.4f}s, "
+          f"target T1 ≤ {T_target:.4f}s")
+    x, ok = mma(gs, T_target, n_iter=int(opt.get('iter', 40)))
+    print(f"  Continuous: W = {gs.weight(x)*1000:.1f} g, feasible = {ok}, "
+          f"{int((x > 0.01).sum())} candidates with x > 0.01")
+    xd, info = round_design(gs, x, T_target)
+
+    added = int(((xd > 0) & (gs.x0 == 0)).sum())
+    removed = int(((xd == 0) & (gs.x0 > 0)).sum())
+    doubled = int((xd >= 2).sum())
+    print(f"  Layout: {int((xd > 0).sum())} braces ({added} added, {removed} removed, "
+          f"{doubled} doubled), ΔW = {(gs.weight(xd) - gs.weight(gs.x0))*1000:+.1f} g")
+    print(f"  {gs.n_analyses} analyses in {timer.time() - t0:.1f}s")
+
+    out = gs.conn.iloc[gs.var][['element_id', 'node_i', 'node_j', 'element_type', 'tower',
+                                'length']].copy()
+    out['x_base'], out['x_continuous'], out['n'] = gs.x0, x, xd.astype(int)
+    RESULTS.mkdir(exist_ok=True)
+    path = RESULTS / f'topology_{version}.csv'
+    out.to_csv(path, index=False)
+    print(f"  Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+MONTE CARLO UNCERTAINTY PROPAGATION
+===================================
+Periods, ESL drifts, η_bi and member DCRs as distributions instead of
+single numbers, for the uncertain balsa inputs:
+
+- E: log-uniform between the calibrated 200 MPa (free-vibration test,
+  modal_analysis_calibrated.py) and the nominal 3500 MPa (config.py);
+  G/E is held at the model's ratio
+- brace_ratio: stiffness of pin-connected members (braces, glued-end
+  trusses) relative to the frame members, 0.7-1.3
+- joint_eff: PVA glue-joint efficiency 0.30-0.40 (fragility_advanced.py),
+  joint moment capacity = η_j·f_b·W
+- mass_factor: all lumped masses ×0.95-1.05
+- xi: damping ratio 2-5%, through the spectrum scaling √(10/(5+ξ%))
+
+Samples come from a Latin hypercube (distributions, quantiles) or a
+Sobol sequence with Saltelli's A/B/AB_i design (first-order and total
+Sobol indices, N·(d+2) evaluations).
+
+Every sample is evaluated on a reduced model instead of a full
+re-analysis: the stiffness is K = (E/E0)·(K_frame + r·K_brace), so a
+Ritz basis of the nominal modes, the ESL static shapes and their
+brace-stiffness derivatives (≈32 vectors) spans the response of every
+sample. Per sample that is one 32×32 eigenproblem and one 32×32 solve;
+member forces are one batched matrix product for all samples.
+A few samples are checked against full sparse re-analyses.
+
+DCR = P/(f_b·A) + M/(η_j·f_b·W), real balsa f_b = 35 MPa
+(sap_bracing/compute_report_data.py), ESL load at T1 of the sample.
+
+Output: results/uncertainty_<version>.csv (samples and responses),
+results/uncertainty_sobol_<version>.csv (with --sobol).
+
+Usage:
+    python scripts/uncertainty.py [version] [--n=2000] [--sobol] [--seed=0]
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+import time as timer
+from pathlib import Path
+from scipy import linalg
+from scipy.stats import qmc
+
+import frame_model as fm
+import static_checks as sc
+from tex_export import design_spectrum, edge_nodes
+
+ROOT = Path(__file__).parent.parent
+RESULTS = ROOT / 'results'
+
+# name -> (distribution, low, high)
+PARAMS = {
+    'E_MPa': ('loguniform', 200.0, 3500.0),
+    'brace_ratio': ('uniform', 0.7, 1.3),
+    'joint_eff': ('uniform', 0.30, 0.40),
+    'mass_factor': ('uniform', 0.95, 1.05),
+    'xi': ('uniform', 0.02, 0.05),
+}
+RESPONSES = ('T1', 'T2', 'T3', 'drift_X', 'drift_Y', 'eta_X', 'eta_Y', 'DCR')
+
+F_B = 35e3                 # kPa, real balsa bending strength
+N_MODES = 24
+CASES = [('X', sc.ECC), ('X', -sc.ECC), ('Y', sc.ECC), ('Y', -sc.ECC)]
+FORCE_COLS = [0, 4, 5, 10, 11]     # local N_i, My_i, Mz_i, My_j, Mz_j
+
+
+# ============================================================
+# SAMPLING
+# ============================================================
+
+def to_physical(U, params=PARAMS):
+    """Map unit-cube samples (n, d) to parameter values."""
+    X = np.empty_like(U)
+    for k, (dist, lo, hi) in enumerate(params.values()):
+        if dist == 'loguniform':
+            X[:, k] = np.exp(np.log(lo) + U[:, k] * np.log(hi / lo))
+        else:
+            X[:, k] = lo + U[:, k] * (hi - lo)
+    return pd.DataFrame(X, columns=list(params))
+
+
+def latin_hypercube(n, params=PARAMS, seed=0):
+    return to_physical(qmc.LatinHypercube(len(params), seed=seed).random(n), params)
+
+
+def saltelli(n, params=PARAMS, seed=0):
+    """
+    Sobol-sequence A, B and AB_i blocks stacked: rows [A; B; AB_1 … AB_d],
+    n each (n rounded up to a power of two).
+    """
+    d = len(params)
+    m = int(np.ceil(np.log2(n)))
+    AB = qmc.Sobol(2 * d, seed=seed).random_base2(m)
+    A, B = AB[:, :d], AB[:, d:]
+    blocks = [A, B]
+    for i in range(d):
+        Ci = A.copy()
+        Ci[:, i] = B[:, i]
+        blocks.append(Ci)
+    return to_physical(np.vstack(blocks), params), 2**m
+
+
+def sobol_indices(y, n, names):
+    """First-order (Saltelli 2010) and total (Jansen) indices from a saltelli() run."""
+    fA, fB = y[:n], y[n:2 * n]
+    var = np.var(np.concatenate([fA, fB]))
+    rows = []
+    for i, name in enumerate(names):
+        fC = y[(2 + i) * n:(3 + i) * n]
+        rows.append({'parameter': name,
+                     'S1': np.mean(fB * (fC - fA)) / var,
+                     'ST': 0.5 * np.mean((fA - fC)**2) / var})
+    return pd.DataFrame(rows)
+
+
+def member_dcr(F, A, Wel, joint_eff):
+    """
+    P–M DCR from local end forces F (ne, 5, ...) in FORCE_COLS order;
+    A, Wel and joint_eff broadcast against F[:, 0].
+    """
+    N = np.abs(F[:, 0])
+    M = np.maximum(np.hypot(F[:, 1], F[:, 2]), np.hypot(F[:, 3], F[:, 4]))
+    return N / (F_B * A) + M / (joint_eff * F_B * Wel)
+
+
+def damping_factor(xi):
+    """Spectral scaling for damping other than 5%: √(10/(5+ξ%)) ≥ 0.55."""
+    return np.maximum(np.sqrt(10.0 / (5.0 + 100.0 * np.asarray(xi))), 0.55)
+
+
+# ============================================================
+# REDUCED MODEL
+# ============================================================
+
+class ReducedModel:
+    """
+    Ritz projection of a model for K = (E/E0)(K_frame + r·K_brace),
+    M = μ·M0: nominal modes + ESL shapes + their d/dr.
+    """
+
+    def __init__(self, model, n_modes=N_MODES):
+        self.model = model
+        m = model
+        ke = fm.element_stiffness(m)
+        brace = m.truss.astype(float)
+        free = fm.free_dofs(m)
+        Kf = fm.assemble(m, ke, 1 - brace)[free][:, free].tocsc()
+        Kt = fm.assemble(m, ke, brace)[free][:, free].tocsc()
+        K0 = (Kf + Kt).tocsc()
+        op = fm.banded_inverse(K0)
+        solve = op.matvec if op is not None else sc.factorize(K0)
+        m_diag = fm.mass_diagonal(m)[free]
+        modes = fm.modal(m, n_modes, K0, m_diag, free, OPinv=op)
+
+        P = np.column_stack([sc.lateral_loads(m, free, d, e, 1.0) for d, e in CASES])
+        U = np.column_stack([solve(p) for p in P.T])
+        dU = np.column_stack([solve(Kt @ u) for u in U.T])
+        B, _ = np.linalg.qr(np.column_stack([modes['phi'], U, dU]))
+        self.B, self.free, self.modes0, self.E0 = B, free, modes, m.E[0]
+
+        self.Kf, self.Kt = B.T @ (Kf @ B), B.T @ (Kt @ B)
+        self.M = B.T @ (m_diag[:, None] * B)
+        self.P = B.T @ P                                            # (nb, 4), V = 1
+        self.W = m.mass.sum() * sc.G                                # kN
+
+        # story drift operators per direction: (2 edges, n_story, nb)
+        z = np.array([m.xyz[m.floor_nodes(f), 2].max() for f in m.floors])
+        self.h = np.diff(z)
+        self.drift_ops = {}
+        for d in 'XY':
+            k = 'XY'.index(d)
+            ops = [fm.floor_operator(m, free, dof=k, nodes_by_floor=e)
+                   for e in edge_nodes(m, axis=1 - k)]
+            self.drift_ops[d] = np.stack([np.diff(op @ B, axis=0) for op in ops])
+
+        # local end forces per basis vector, frame and brace parts
+        full = np.zeros((m.ndof, B.shape[1]))
+        full[free] = B
+        Be = full[m.elem_dofs]                                       # (ne, 12, nb)
+        T = m.cache.get('T')
+        T = fm.transformation(m) if T is None else T
+        TK = np.einsum('eij,ejk->eik', T, ke)[:, FORCE_COLS]
+        Ff = np.einsum('eik,ekb->eib', TK, Be) * (1 - brace)[:, None, None]
+        Ft = np.einsum('eik,ekb->eib', TK, Be) * brace[:, None, None]
+        self.Ff, self.Ft = Ff, Ft                                    # (ne, 5, nb)
+        self.A = m.A
+        self.Wel = m.A * np.sqrt(m.A) / 6
+
+    def evaluate(self, X, chunk=128):
+        """Responses for a DataFrame of parameter samples."""
+        E = X['E_MPa'].to_numpy() * 1000.0 / self.E0
+        r = X['brace_ratio'].to_numpy()
+        mu = X['mass_factor'].to_numpy()
+        n, nb = len(X), self.B.shape[1]
+        T = np.empty((n, 3))
+        Q = np.empty((n, nb, len(CASES)))
+        for s in range(n):
+            Kr = self.Kf + r[s] * self.Kt
+            lam = linalg.eigh(Kr, self.M, eigvals_only=True, subset_by_index=[0, 2])
+            T[s] = 2 * np.pi / np.sqrt(lam * E[s] / mu[s])
+            Q[s] = linalg.solve(Kr, self.P, assume_a='pos') / E[s]
+        V = mu * self.W * design_spectrum(T[:, 0]) * damping_factor(X['xi'].to_numpy())
+        Q *= V[:, None, None]
+
+        out = {'T1': T[:, 0], 'T2': T[:, 1], 'T3': T[:, 2]}
+        for d in 'XY':
+            c = [j for j, (cd, _) in enumerate(CASES) if cd == d]
+            D = np.abs(np.einsum('lsb,nbc->nlsc', self.drift_ops[d], Q[:, :, c]))
+            out[f'drift_{d}'] = (D.max(axis=1) / self.h[None, :, None]).max(axis=(1, 2))
+            out[f'eta_{d}'] = (D.max(axis=1) / D.mean(axis=1)).max(axis=(1, 2))
+
+        # member forces: E cancels (K·u = P), only r enters
+        ne = len(self.A)
+        Ff = self.Ff.reshape(-1, nb)
+        Ft = self.Ft.reshape(-1, nb)
+        eta_j = X['joint_eff'].to_numpy()
+        dcr = np.empty(n)
+        for s0 in range(0, n, chunk):
+            sl = slice(s0, s0 + chunk)
+            q = (Q[sl] * E[sl, None, None]).transpose(1, 0, 2).reshape(nb, -1)  # (nb, c·4)
+            rr = np.repeat(r[sl], len(CASES))
+            F = (Ff @ q + (Ft @ q) * rr).reshape(ne, 5, -1)
+            d = member_dcr(F, self.A[:, None], self.Wel[:, None],
+                           np.repeat(eta_j[sl], len(CASES)))
+            dcr[sl] = d.max(axis=0).reshape(-1, len(CASES)).max(axis=1)
+        out['DCR'] = dcr
+        return pd.DataFrame(out)
+
+
+def full_check(model, row):
+    """T1, drift and η_bi envelopes from a full sparse re-analysis of one sample."""
+    m = model
+    E = row['E_MPa'] * 1000.0 / m.E[0]
+    ke = fm.element_stiffness(m)
+    f = E * np.where(m.truss, row['brace_ratio'], 1.0)
+    free = fm.free_dofs(m)
+    K = fm.assemble(m, ke, f)[free][:, free].tocsc()
+    T1 = fm.modal(m, 1, K, fm.mass_diagonal(m)[free] * row['mass_factor'], free)['T'][0]
+    V = row['mass_factor'] * sc.base_shear(m, T1) * float(damping_factor(row['xi']))
+    solve = sc.factorize(K)
+    chk = [sc.drift_check(m, solve, free, d, V=V) for d in 'XY']
+    return {'T1': T1, 'drift_X': chk[0]['drift_ratio'].max(),
+            'drift_Y': chk[1]['drift_ratio'].max(),
+            'eta_X': chk[0]['eta_bi'].max(), 'eta_Y': chk[1]['eta_bi'].max()}
+
+
+def summary(Y, quantiles=(0.05, 0.5, 0.95)):
+    q = Y.quantile(list(quantiles)).T
+    q.columns = [f'q{int(p * 100):02d}' for p in quantiles]
+    return pd.concat([Y.mean().rename('mean'), Y.std().rename('std'), q], axis=1)
+
+
+def main():
+    args = sys.argv[1:]
+    version = next((a for a in args if not a.startswith('-')), 'v10')
+    opt = dict(a[2:].split('=', 1) for a in args if a.startswith('--') and '=' in a)
+    n, seed = int(opt.get('n', 2000)), int(opt.get('seed', 0))
+
+    print("=" * 70)
+    print(f"MONTE CARLO UNCERTAINTY — {version}")
+    print("=" * 70)
+    t0 = timer.time()
+    model = fm.load_model(version)
+    rm = ReducedModel(model)
+    print(f"  Reduced basis: {rm.B.shape[1]} vectors ({len(rm.free)} DOFs), "
+          f"{timer.time() - t0:.1f}s")
+    for name, (dist, lo, hi) in PARAMS.items():
+        print(f"    {name:<12} {dist:<10} [{lo:g}, {hi:g}]")
+
+    if '--sobol' in args:
+        X, n = saltelli(n, seed=seed)
+    else:
+        X = latin_hypercube(n, seed=seed)
+    t1 = timer.time()
+    Y = rm.evaluate(X)
+    dt = timer.time() - t1
+    print(f"\n  {len(X)} samples in {dt:.1f}s ({len(X) / dt:.0f} samples/s)")
+
+    # reduced vs full re-analysis
+    for i in np.linspace(0, len(X) - 1, 3).astype(int):
+        ref = full_check(model, X.iloc[i])
+        err = {k: abs(Y[k].iloc[i] / v - 1) for k, v in ref.items()}
+        print(f"  Check sample {i}: " + ", ".join(f"{k} {ref[k]:.4g} (err {err[k]*100:.2f}%)"
+                                                for k in ref))
+
+    print("\n  Response distributions:")
+    print(summary(Y).to_string(float_format='%.4g'))
+    print(f"  P(drift > {sc.DRIFT_LIMIT*100:.1f}%) = "
+          f"{(Y[['drift_X', 'drift_Y']].max(axis=1) > sc.DRIFT_LIMIT).mean():.3f}, "
+          f"P(η_bi > {sc.ETA_LIMIT}) = {(Y[['eta_X', 'eta_Y']].max(axis=1) > sc.ETA_LIMIT).mean():.3f}, "
+          f"P(DCR > 1) = {(Y['DCR'] > 1).mean():.3f}")
+
+    RESULTS.mkdir(exist_ok=True)
+    if '--sobol' in args:
+        tabs = []
+        for resp in RESPONSES:
+            t = sobol_indices(Y[resp].to_numpy(), n, list(PARAMS))
+            t.insert(0, 'response', resp)
+            tabs.append(t)
+        sob = pd.concat(tabs, ignore_index=True)
+        for idx in ('S1', 'ST'):
+            print(f"\n  Sobol indices {idx}:")
+            print(sob.pivot(index='parameter', columns='response', values=idx)
+                  [list(RESPONSES)].round(3).to_string())
+        out = RESULTS / f'uncertainty_sobol_{version}.csv'
+        sob.to_csv(out, index=False)
+        print(f"  Saved: {out}")
+    out = RESULTS / f'uncertainty_{version}.csv'
+    pd.concat([X, Y], axis=1).to_csv(out, index=False)
+    print(f"  Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()